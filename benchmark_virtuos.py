@@ -0,0 +1,66 @@
+"""
+Durchsatzmessung der Virtuos-Zugriffe gegen die In-Process-Fake-DLL (lib/services/fake_virtuos.py).
+Laeuft ohne Virtuos, z.B. unter Linux:
+
+    python benchmark_virtuos.py --latency 0.0005 --axes 6
+"""
+import argparse
+import os
+import time
+
+os.environ["envVirtuosBackend"] = "fake"
+
+from lib.services import remote, Virtuos_tool
+from lib.services.port_io import PortSet
+from lib.services.fake_virtuos import FakeVirtuosInterface, FakeBlockModel
+
+BLOCK = "[Block Diagram].[RobotController]"
+
+
+def setup(latency, axes, trafo_params, signals=0):
+    model = FakeBlockModel.robot_controller(BLOCK, axes, trafo_params)
+    for i in range(signals):
+        model.add_port(f"[Block Diagram].[Signals].[S_{i}]", "REAL64", float(i))
+    vz = remote.VirtuosZugriff()
+    vz.virtuosDLL()
+    vz.vi = FakeVirtuosInterface(model, latency)
+    vz.corbaInfo()
+    vz.startConnectionCorba()
+    return vz
+
+
+def bench_ports(vz, repeat):
+    ports = [p for p in vz.vi.model.ports]
+    status, value_ids = vz.readValueID(ports)
+    data_types = [remote.VIODataType.V_IO_TYPE_REAL64] * len(ports)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        vz.readValue(value_ids, data_types)
+    elapsed = time.perf_counter() - start
+    print(f"[BENCH] readValue: {len(ports)} ports x {repeat}, {elapsed / repeat * 1000:.3f} ms per set")
+
+    port_set = PortSet(vz, ports)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        port_set.read()
+    elapsed = time.perf_counter() - start
+    print(f"[BENCH] PortSet.read: {len(ports)} ports x {repeat}, {elapsed / repeat * 1000:.3f} ms per set")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.0005, help="seconds per DLL call")
+    parser.add_argument("--axes", type=int, default=6)
+    parser.add_argument("--trafo-params", type=int, default=32)
+    parser.add_argument("--signals", type=int, default=0, help="extra REAL64 ports for the port benchmarks")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    vz = setup(args.latency, args.axes, args.trafo_params, args.signals)
+    Virtuos_tool.benchmark_param_read(vz, BLOCK, repeat=args.repeat)
+    bench_ports(vz, args.repeat * 30)
+    print(f"[INFO] DLL calls: {sum(vz.vi.calls.values())}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,26 +2,27 @@ from opcua import Server, ua
 from dotenv import load_dotenv
 import os
 import json
-from lib.services import remote
 from lib.services import Virtuos_tool, server
+from lib.services.virtuos_session import virtuos_session
 from nicegui import ui
 import asyncio
 from lib.screens.state import kanal_inputs_virtuos
 from lib.services.opcua_tool import ConfigChangeHandler
-from lib.services.client import connect_opcua_client, read_modifier_info, format_modifier_source
+from lib.services.client import format_modifier_source
 from lib.utils.save_to_file import save_opcua_data_to_file
 from datetime import datetime
 
 skip_write_back_in_virtuos = None
 
 def show_virtuos_server():
-    global vz_env, vz, opc_server_instance, initialized, opc_client
+    global vz_env, vz, avz, opc_server_instance, initialized, opc_listener_handles
     vz_env = None
     vz = None
+    avz = None  # worker thread for all Virtuos DLL calls, borrowed from virtuos_session
     opc_server_instance = None
     initialized = False
     opc_subscription_started = False
-    opc_client = None
+    opc_listener_handles = []  # [(kanal, param_type, handle)] der In-Process-Subscription
 
     def show_kanal_paths():
         kanal_paths_container.clear()
@@ -44,17 +45,7 @@ def show_virtuos_server():
 
         block_map = Virtuos_tool.load_block_map()
 
-        def find_controller_blocks(block_map: dict, keyword: str = "Controller") -> list:
-            seen = set()
-            filtered = []
-            for name in block_map:
-                plain_name = name.strip('[]')
-                if keyword.lower() in plain_name.lower() and plain_name not in seen:
-                    seen.add(plain_name)
-                    filtered.append(plain_name)
-            return sorted(filtered)
-
-        controller_block_names = find_controller_blocks(block_map, "Controller")
+        controller_block_names = Virtuos_tool.find_blocks("Controller")
 
         if not controller_block_names:
             controller_block_names = ["<No Controller Found>"]
@@ -122,7 +113,7 @@ def show_virtuos_server():
 
         def apply_search_keyword():
             keyword = search_keyword_input.value.strip()
-            new_block_names = find_controller_blocks(block_map, keyword)
+            new_block_names = Virtuos_tool.find_blocks(keyword)
             if not new_block_names:
                 new_block_names = ["<No Match>"]
 
@@ -157,17 +148,34 @@ def show_virtuos_server():
             return False
         return True
 
+    def borrow_session():
+        global vz_env, vz, avz, initialized
+        vz_env, vz, avz = virtuos_session.env, virtuos_session.vz, virtuos_session.avz
+        initialized = True
+
+    def return_session():
+        global initialized
+        # Seite getrennt: Referenz zurueckgeben, die Verbindung bleibt fuer die anderen Seiten offen
+        if initialized:
+            virtuos_session.release()
+            initialized = False
+
+    ui.context.client.on_disconnect(return_session)
+
     async def connect_to_existing_virtuos_before_start():
-        global initialized, vz_env, vz
+        global initialized
         try:
             if initialized:
                 await append_log("[INFO] Virtuos already initialized.")
                 return
 
-            vz_env = Virtuos_tool.VirtuosEnv()
-            vz = vz_env.connect_to_virtuos()
-            if vz:
-                initialized = True
+            # Shared with the other Virtuos pages, connects only if no page did yet
+            state = await virtuos_session.acquire(start_virtuos=True)
+            if state == "shared":
+                borrow_session()
+                await append_log("[OK] Using the Virtuos connection of the other page.")
+            elif state:
+                borrow_session()
                 await append_log("[OK] Connected to Virtuos.")
             else:
                 await append_log("[ERROR] Failed to connect to Virtuos.")
@@ -176,33 +184,31 @@ def show_virtuos_server():
             await append_log(f"[EXCEPTION] Failed to connect to Virtuos: {e}")
 
     async def connect_to_existing_virtuos_after_start():
-        global initialized, vz_env, vz
+        global initialized
         try:
             if not initialized:
-                dotenv_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "config", ".env"))
-                load_dotenv(dotenv_path)
-                project_path = os.getenv("project_path")
-                vz_env = Virtuos_tool.VirtuosEnv()
-                vz = vz_env.vz
-                vz.virtuosDLL()
-                vz.corbaInfo()
-                vz.startConnectionCorba()
-                if vz.isOpen() == vz.V_SUCCD:
+                state = await virtuos_session.acquire(start_virtuos=False)
+                if state == "open":
                     await append_log("[OK] Connected to already open Virtuos project.")
+                elif state == "loaded":
+                    await append_log("[OK] Project loaded and connected.")
+                elif state == "shared":
+                    await append_log("[OK] Using the Virtuos connection of the other page.")
+                elif state == "reconnected":
+                    await append_log("[OK] Virtuos connection restored.")
                 else:
-                    status = vz.getProject(project_path)
-                    if status == vz.V_SUCCD:
-                        await append_log("[OK] Project loaded and connected.")
-                    else:
-                        await append_log("[ERROR] No open project and failed to load.")
-                        return
-                initialized = True
+                    await append_log("[ERROR] No open project and failed to load.")
+                    return
+                borrow_session()
                 
             else:
                 await append_log("[INFO] Already initialized.")
         except Exception as e:
             await append_log(f"[EXCEPTION] Connection failed: {e}")
 
+    async def log_read_progress(done, total, kanal):
+        await append_log(f"[INFO] {kanal} read from Virtuos ({done}/{total})")
+
     async def refresh_all_on_server():
         global vz, opc_server_instance, skip_write_back_in_virtuos
 
@@ -226,25 +232,26 @@ def show_virtuos_server():
                 await append_log("[ERROR] OPC UA Server is not running.")
                 return
 
-            for kanal, input_field in kanal_inputs_virtuos.items():
-                path = input_field.value.strip()
-
-                trafo_names, trafo_values = Virtuos_tool.extract_trafo_param_list(vz, path)
-                server.update_trafo_config(opc_server_instance, kanal, trafo_names, trafo_values)
+            kanal_paths = {kanal: input_field.value.strip() for kanal, input_field in kanal_inputs_virtuos.items()}
+            kanal_params = await avz.read_blocks(kanal_paths, progress=log_read_progress)
 
-                axis_params = Virtuos_tool.read_Value_Model_json(vz, path)[1]
-                axis_names, axis_values = Virtuos_tool.extract_axis_param_list(axis_params)
-                server.update_kanal_axis_config(opc_server_instance, kanal, "AxisConfigJSON", axis_names, axis_values)
+            changed = server.update_all_kanal_configs(opc_server_instance, kanal_params)
+            for kanal, path in kanal_paths.items():
+                if kanal in changed:
+                    await append_log(f"[OK] {kanal} refreshed from block {path}")
+                elif kanal in kanal_params:
+                    await append_log(f"[INFO] {kanal} unchanged, nothing published.")
 
+            if changed:
                 server.update_modifier_info(
                     opc_server_instance,
                     "Server",
                     "Refresh_TrafoConfigJSON & AxisConfigJSON",
                     "Refresh_byVirtuos"
                 )
-                await append_log(f"[OK] {kanal} refreshed from block {path}")
-            
-            await append_log("[OK] All Kanals refreshed.")
+                await append_log(f"[OK] All Kanals refreshed, {len(changed)} changed.")
+            else:
+                await append_log("[OK] All Kanals refreshed, no changes.")
 
         except Exception as e:
             await append_log(f"[EXCEPTION] {e}")
@@ -264,20 +271,21 @@ def show_virtuos_server():
             return
 
         try:
+            block_data = {}
             for kanal, input_field in kanal_inputs_virtuos.items():
                 block_path = input_field.value.strip()
-                kanal_data = server.read_kanal_data_from_server_instance(opc_server_instance, kanal)
-
-                Virtuos_tool.write_params_to_virtuos(
-                    vz,
-                    block_path,
-                    kanal_data["trafo_names"],
-                    kanal_data["trafo_values"],
-                    kanal_data["axis_names"],
-                    kanal_data["axis_values"]
-                )
+                block_data[kanal] = (block_path, server.read_kanal_data_from_server_instance(opc_server_instance, kanal))
+
+            write_results = await avz.write_blocks(block_data, force_full=force_full_write_checkbox.value)
 
-                await append_log(f"[OK] {kanal} → Virtuos written from server variables.")
+            for kanal, (results, skipped) in write_results.items():
+                failed = [name for name, ok in results.items() if not ok]
+                if failed:
+                    await append_log(f"[ERROR] {kanal} → Virtuos: {len(failed)} of {len(results)} parameters failed: {', '.join(failed)}")
+                elif not results:
+                    await append_log(f"[INFO] {kanal}: no changed parameters, nothing written.")
+                else:
+                    await append_log(f"[OK] {kanal} → Virtuos: {len(results)} parameters written, {skipped} unchanged skipped.")
 
             save_opcua_data(opc_server_instance)
 
@@ -296,20 +304,12 @@ def show_virtuos_server():
 
 
         try:
+            if not vz:
+                await append_log("[ERROR] Virtuos is not initialized.")
+                return
 
-            for kanal, input_field in kanal_inputs_virtuos.items():
-                block_path = input_field.value.strip()
-
-                trafo_names, trafo_values = Virtuos_tool.extract_trafo_param_list(vz, block_path)
-                axis_params = Virtuos_tool.read_Value_Model_json(vz, block_path)[1]
-                axis_names, axis_values = Virtuos_tool.extract_axis_param_list(axis_params)
-
-                kanal_data_dict[kanal] = {
-                    "trafo_names": trafo_names,
-                    "trafo_values": trafo_values,
-                    "axis_names": axis_names,
-                    "axis_values": axis_values,
-                }
+            kanal_paths = {kanal: input_field.value.strip() for kanal, input_field in kanal_inputs_virtuos.items()}
+            kanal_data_dict = await avz.read_blocks(kanal_paths, progress=log_read_progress)
 
             opc_server_instance = server.start_opc_server_multi_kanal(kanal_data_dict)
             if opc_server_instance:
@@ -333,6 +333,8 @@ def show_virtuos_server():
         global opc_server_instance
         try:
             if opc_server_instance:
+                if opc_subscription_started:
+                    await stop_opcua_listener()
 
                 # 记录停止操作的修改者信息
                 server.update_modifier_info(
@@ -362,7 +364,7 @@ def show_virtuos_server():
             return
 
         # read modifier info
-        modifier_info = read_modifier_info(opc_client)
+        modifier_info = server.read_modifier_info(opc_server_instance)
 
         if modifier_info and modifier_info.get('operation') in ['Refresh_byVirtuos', 'Start_OPC_Server_Virtuos']:
             await append_log(f"[INFO] Skipping server internal operation: {modifier_info.get('operation')}")
@@ -437,30 +439,22 @@ def show_virtuos_server():
         }
 
     async def start_opcua_server_listener():
-        global opc_client
+        global opc_listener_handles
         nonlocal opc_subscription_started
         if opc_subscription_started:
             await append_log("[INFO] OPC UA listener already started.")
             return
+        if not opc_server_instance:
+            await append_log("[ERROR] OPC UA server is not running.")
+            return
         try:
-            loop = asyncio.get_event_loop()
-            username = "server_inter" if "server_inter" in server.users_db else list(server.users_db.keys())[0]
-            password = server.users_db[username]
-            opc_client = connect_opcua_client(username, password)
-            if not opc_client:
-                await append_log("[ERROR] Failed to connect OPC UA client.")
-                return
-            opc_subscription = opc_client.create_subscription(
-                100,
-                ConfigChangeHandler(callback=confirming_on_change, loop=asyncio.get_running_loop(), delay_sec=1.0)
+            # 直接在服务器地址空间上订阅，不再经过本地加密客户端会话
+            handler = ConfigChangeHandler(callback=confirming_on_change, loop=asyncio.get_running_loop(), delay_sec=1.0)
+            opc_listener_handles = opc_server_instance.subscribe_data_change(
+                handler, [kanal for kanal in kanal_inputs_virtuos.keys() if kanal in opc_server_instance.json_vars]
             )
-
-            for kanal in kanal_inputs_virtuos.keys():
-                kanal_node = opc_client.get_objects_node().get_child([f"2:{kanal}"])
-                for var_name in ["TrafoConfigJSON", "AxisConfigJSON"]:
-                    var_node = kanal_node.get_child([f"2:{var_name}"])
-                    opc_subscription.subscribe_data_change(var_node)
-                    await append_log(f"[LISTENING] {kanal}/{var_name}")
+            for kanal, var_name, _ in opc_listener_handles:
+                await append_log(f"[LISTENING] {kanal}/{var_name}")
             opc_subscription_started = True
             listener_status_label.text = "Listener : Active"
             listener_status_label.style('color: green; font-weight: bold;')
@@ -469,10 +463,13 @@ def show_virtuos_server():
             await append_log(f"[Error] OPC UA Server Listener failed: {e}")
 
     async def stop_opcua_listener():
+        global opc_listener_handles
         nonlocal opc_subscription_started
         if opc_subscription_started:
             try:
-                opc_subscription_started.delete()
+                if opc_server_instance:
+                    opc_server_instance.unsubscribe_data_change(opc_listener_handles)
+                opc_listener_handles = []
                 await append_log("[INFO] OPC UA listener stopped.")
             except Exception as e:
                 await append_log(f"[EXCEPTION] Failed to delete subscription: {e}")
@@ -498,6 +495,7 @@ def show_virtuos_server():
     ui.button("Stop OPC UA Server", on_click=stop_opc, color='red')
     ui.button("Refresh All on Virtuos Server", on_click=refresh_all_on_server, color='purple')
     ui.button("Write Back All from OPC UA Server", on_click=write_back_all_from_opcua_server, color='orange')
+    force_full_write_checkbox = ui.checkbox("Force full write-back (ignore unchanged check)", value=False)
     ui.button("Start OPC UA Server Listener", on_click=start_opcua_server_listener, color='teal')
     ui.button("Stop OPC UA Server Listener", on_click=stop_opcua_listener, color='grey')
     ui.button("Show Online Users", on_click=server.show_online_users, color='purple')
@@ -1,8 +1,6 @@
-from dotenv import load_dotenv
-import os
 import json
-from lib.services import remote
 from lib.services import Virtuos_tool
+from lib.services.virtuos_session import virtuos_session
 from nicegui import ui
 import asyncio
 from datetime import date
@@ -10,9 +8,10 @@ from datetime import date
 skip_write_back_in_virtuos = None
 
 def show_virtuos_robot():
-    global vz_env, vz, initialized
+    global vz_env, vz, avz, initialized
     vz_env = None
     vz = None
+    avz = None  # worker thread for all Virtuos DLL calls, borrowed from virtuos_session
     initialized = False
 
     param_data = {
@@ -33,17 +32,34 @@ def show_virtuos_robot():
 
     log_area = ui.textarea("Log Output").props('readonly').style('width: 100%; height: 200px')
 
+    def borrow_session():
+        global vz_env, vz, avz, initialized
+        vz_env, vz, avz = virtuos_session.env, virtuos_session.vz, virtuos_session.avz
+        initialized = True
+
+    def return_session():
+        global initialized
+        # Seite getrennt: Referenz zurueckgeben, die Verbindung bleibt fuer die anderen Seiten offen
+        if initialized:
+            virtuos_session.release()
+            initialized = False
+
+    ui.context.client.on_disconnect(return_session)
+
     async def connect_to_existing_virtuos_before_start():
-        global initialized, vz_env, vz
+        global initialized
         try:
             if initialized:
                 await append_log("[INFO] Virtuos already initialized.")
                 return
 
-            vz_env = Virtuos_tool.VirtuosEnv()
-            vz = vz_env.connect_to_virtuos()
-            if vz:
-                initialized = True
+            # Shared with the other Virtuos pages, connects only if no page did yet
+            state = await virtuos_session.acquire(start_virtuos=True)
+            if state == "shared":
+                borrow_session()
+                await append_log("[OK] Using the Virtuos connection of the other page.")
+            elif state:
+                borrow_session()
                 await append_log("[OK] Connected to Virtuos.")
             else:
                 await append_log("[ERROR] Failed to connect to Virtuos.")
@@ -52,27 +68,22 @@ def show_virtuos_robot():
             await append_log(f"[EXCEPTION] Failed to connect to Virtuos: {e}")
 
     async def connect_to_existing_virtuos_after_start():
-        global initialized, vz_env, vz
+        global initialized
         try:
             if not initialized:
-                dotenv_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "config", ".env"))
-                load_dotenv(dotenv_path)
-                project_path = os.getenv("project_path")
-                vz_env = Virtuos_tool.VirtuosEnv()
-                vz = vz_env.vz
-                vz.virtuosDLL()
-                vz.corbaInfo()
-                vz.startConnectionCorba()
-                if vz.isOpen() == vz.V_SUCCD:
+                state = await virtuos_session.acquire(start_virtuos=False)
+                if state == "open":
                     await append_log("[OK] Connected to already open Virtuos project.")
+                elif state == "loaded":
+                    await append_log("[OK] Project loaded and connected.")
+                elif state == "shared":
+                    await append_log("[OK] Using the Virtuos connection of the other page.")
+                elif state == "reconnected":
+                    await append_log("[OK] Virtuos connection restored.")
                 else:
-                    status = vz.getProject(project_path)
-                    if status == vz.V_SUCCD:
-                        await append_log("[OK] Project loaded and connected.")
-                    else:
-                        await append_log("[ERROR] No open project and failed to load.")
-                        return
-                initialized = True
+                    await append_log("[ERROR] No open project and failed to load.")
+                    return
+                borrow_session()
                 
             else:
                 await append_log("[INFO] Already initialized.")
@@ -83,17 +94,7 @@ def show_virtuos_robot():
         
         block_map = Virtuos_tool.load_block_map()
 
-        def find_controller_blocks(block_map: dict, keyword: str = "Controller") -> list:
-            seen = set()
-            filtered = []
-            for name in block_map:
-                plain_name = name.strip('[]')
-                if keyword.lower() in plain_name.lower() and plain_name not in seen:
-                    seen.add(plain_name)
-                    filtered.append(plain_name)
-            return sorted(filtered)
-
-        controller_block_names = find_controller_blocks(block_map, "Controller")
+        controller_block_names = Virtuos_tool.find_blocks("Controller")
 
         if not controller_block_names:
             controller_block_names = ["<No Controller Found>"]
@@ -102,7 +103,7 @@ def show_virtuos_robot():
 
         def apply_search_keyword():
             keyword = search_keyword_input.value.strip()
-            new_block_names = find_controller_blocks(block_map, keyword)
+            new_block_names = Virtuos_tool.find_blocks(keyword)
             if not new_block_names:
                 new_block_names = ["<No Match>"]
 
@@ -312,20 +313,16 @@ def show_virtuos_robot():
 
     async def read_all_param_from_block():
         block_path = selected_path_label.text
+        if not initialized or not vz:
+            await append_log("[ERROR] Not connected to Virtuos. Please connect first.")
+            return
 
         try:
-            trafo_names, trafo_values = Virtuos_tool.extract_trafo_param_list(vz, block_path)
-            axis_params = Virtuos_tool.read_Value_Model_json(vz, block_path)[1]
-            axis_names, axis_values = Virtuos_tool.extract_axis_param_list(axis_params)
-            
-            param_data["trafo_names"] = trafo_names
-            param_data["trafo_values"] = trafo_values
-            param_data["axis_names"] = axis_names
-            param_data["axis_values"] = axis_values
+            param_data.update(await avz.read_block_params(block_path))
 
             await append_log(f"[OK] Read all parameters from block '{block_path}':")
-            await append_log(f"Trafo parameters: {len(trafo_names)}")
-            await append_log(f"Axis parameters: {len(axis_names)}")
+            await append_log(f"Trafo parameters: {len(param_data['trafo_names'])}")
+            await append_log(f"Axis parameters: {len(param_data['axis_names'])}")
 
             await update_param_display()
             
@@ -360,15 +357,19 @@ def show_virtuos_robot():
 
             await append_log(f"[INFO] Writing parameters to Virtuos block '{block_path}'...")
             
-            # Use the provided write function
-            Virtuos_tool.write_params_to_virtuos(
-                vz, 
+            # Write the whole parameter set with one batched call
+            results = await avz.write_params(
                 block_path,
                 param_data["trafo_names"], 
                 modified_trafo_values,
                 param_data["axis_names"], 
                 modified_axis_values
             )
+
+            failed = [name for name, ok in results.items() if not ok]
+            if failed:
+                await append_log(f"[ERROR] {len(failed)} of {len(results)} parameters failed: {', '.join(failed)}")
+                return
             
             await append_log(f"[OK] Successfully wrote all parameters to Virtuos:")
             await append_log(f"    Trafo parameters: {len(param_data['trafo_names'])}")
@@ -1,13 +1,35 @@
 from . import remote
+from . import virtuos_js
+from .param_schema_cache import ParamSchemaCache
+from .block_index import BlockIndex
 import os
 from dotenv import load_dotenv
 import re
+import time
 
 dotenv_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "config", ".env"))
 load_dotenv(dotenv_path)
 
 project_path = os.getenv("project_path")
 controller_path = os.getenv("extract_controller_path")
+block_index = BlockIndex(controller_path)
+
+# Known parameter names per block, shared by all pages
+schema_cache = ParamSchemaCache()
+
+# Read whole blocks with one generated JavaScript call instead of one DLL call per parameter.
+# Switched off for the rest of the session as soon as scripting fails once.
+bulk_read_mode = os.getenv("virtuos_bulk_mode", "0") == "1"
+bulk_write_mode = bulk_read_mode
+# Result files of the scripts (VFileSystemInterface) checked once per session: None = not yet
+script_results_verified = None
+# Parameternamen aus dem Modellbaum lesen statt raten; wird abgeschaltet, wenn die DLL ihn nicht anbietet.
+# Standard aus: das Layout von remote.ModelIndex ist noch nicht gegen virtuos_interface.h geprueft,
+# ein falsches Layout bringt den Prozess zum Absturz statt einen Fehler zu liefern.
+model_tree_mode = os.getenv("virtuos_model_tree", "0") == "1"
+
+# Last values read from or written to Virtuos: {block_path: {param_name: normalized value}}
+param_snapshots = {}
 
 class VirtuosEnv:
     def __init__(self):
@@ -73,7 +95,62 @@ class VirtuosEnv:
             print(f"Exception occurred: {e}")
             return None
 
-    def disconnect(self):
+    def connect_to_open_virtuos(self):
+        """
+        Connects to a Virtuos instance that is already running.
+
+        Initializes the DLL and the CORBA connection. If no project is open in
+        Virtuos, the project from project_path is loaded.
+
+        Returns:
+            str: "open" if a project was already open, "loaded" if project_path
+            was loaded, None if no project could be opened.
+        """
+        self.vz.virtuosDLL()
+        self.vz.corbaInfo()
+        self.vz.startConnectionCorba()
+        if self.vz.isOpen() == self.vz.V_SUCCD:
+            return "open"
+        if self.vz.getProject(project_path) == self.vz.V_SUCCD:
+            return "loaded"
+        return None
+
+    def is_healthy(self) -> bool:
+        """
+        Cheap health check of an established connection: CORBA connected and
+        the simulation status can be queried.
+        """
+        try:
+            if self.vz.vi is None or self.vz.isConnected() != self.vz.V_SUCCD:
+                return False
+            status, _, _ = self.vz.simStatus()
+            return status == self.vz.V_SUCCD
+        except Exception as e:
+            print(f"[WARN] Virtuos health check failed: {e}")
+            return False
+
+    def reconnect(self):
+        """
+        Re-establishes the CORBA connection with the already loaded DLL.
+        ValueIDs resolved before are dropped. Only the connection is restored;
+        a project the user closed is not loaded again.
+
+        Returns:
+            str: "open" if a project is open, "connected" if not, None on failure.
+        """
+        try:
+            self.vz.stopConnect()
+        except Exception as e:
+            print(f"[INFO] stopConnect before reconnect failed (ignored): {e}")
+        self.vz.invalidateValueIDs()
+        self.vz.corbaInfo()
+        if self.vz.startConnectionCorba() != self.vz.V_SUCCD:
+            return None
+        if self.vz.isOpen() == self.vz.V_SUCCD:
+            return "open"
+        return "connected"
+
+    def disconnect(self, stop_virtuos=True):
         """
         Disconnects from the Virtuos environment and unloads the DLL.
 
@@ -83,11 +160,16 @@ class VirtuosEnv:
         Exceptions that are raised during the disconnect process are caught and printed to
         the console.
 
+        Args:
+            stop_virtuos (bool): Also stop the Virtuos program. False leaves a Virtuos the
+                user opened running, with its unsaved changes.
+
         Returns:
             None
         """
         try:
-            self.vz.stopVirtuosPrgm()
+            if stop_virtuos:
+                self.vz.stopVirtuosPrgm()
             self.vz.stopConnect()
             self.vz.unloadDLL()
             print("Virtuos disconnected successfully")
@@ -143,54 +225,296 @@ def read_value_model(vz, parameter_path: str):
     Parameter_Value = vz.getParameterBlock_New(parameter_path)
     return Parameter_Value
 
-def read_Value_Model_json(vz, parameter_path: str):
-    trafo_params = {}
-    axis_params = {}
+# Parameter groups probed per axis; extend here for further groups
+param_prefix_groups = {
+    "Axis": ["ratio", "s_min", "s_max", "s_init", "v_max", "a_max"],
+    "Ext":  ["ratio", "s_min", "s_max", "s_init", "v_max", "a_max"],
+}
+
+# Local names _split_block_params can sort into trafo/axis params
+_block_param_pattern = re.compile(
+    r"^(KinID|par_\d+|(" + "|".join(param_prefix_groups) + r")_\d+\.\w+)$"
+)
+
+def normalize_param_value(value) -> str:
+    """
+    Comparable form of a parameter value, so "90", "90.0" and 90 count as equal.
+    Expressions such as "PI/180" are compared as text.
+    """
+    text = str(value).strip()
+    try:
+        return repr(float(text))
+    except ValueError:
+        return text
+
+def _snapshot_key(name: str) -> str:
+    """
+    One key per parameter in param_snapshots, whether the caller uses the read-side
+    name ("trafo[0].param[3]") or the Virtuos name ("par_3").
+    """
+    return convert_param_name_for_read(convert_param_name_for_write(name))
+
+def _remember_read(parameter_path: str, params: tuple) -> tuple:
+    """
+    Replace the snapshot of a block with freshly read (trafo_params, axis_params).
+    """
+    trafo_params, axis_params = params
+    snapshot = {_snapshot_key(name): normalize_param_value(value) for name, value in trafo_params.items()}
+    snapshot.update({_snapshot_key(name): normalize_param_value(value) for name, value in axis_params.items()})
+    param_snapshots[parameter_path] = snapshot
+    return params
+
+def _remember_written(parameter_path: str, names, values, results: dict):
+    snapshot = param_snapshots.setdefault(parameter_path, {})
+    for name, value in zip(names, values):
+        if results.get(name):
+            snapshot[_snapshot_key(name)] = normalize_param_value(value)
+        else:
+            # Unknown state in Virtuos, make sure the next write-back sends it again
+            snapshot.pop(_snapshot_key(name), None)
+
+def _probe_block_params(vz, parameter_path: str) -> dict:
+    """
+    Find the parameters of a block by brute force. Returns {local_name: value},
+    e.g. {"KinID": "21", "par_0": "0", "Axis_1.ratio": "1"}.
+    """
+    values = {}
 
     # 读取 KinID
     try:
         kinid_path = f"{parameter_path}.[KinID]"
         kinid_value = vz.getParameterBlock_New(kinid_path)
         if kinid_value is not None:
-            trafo_params["trafo[0].id"] = kinid_value
+            values["KinID"] = kinid_value
         else:
             print(f"KinID not found at {kinid_path}")
     except Exception as e:
         print(f"Error reading KinID: {e}")
 
-
-        # 读取 trafo 参数
+    # 读取 trafo 参数
     for i in range(9999):
         full_path = f"{parameter_path}.[par_{i}]"
         try:
             Parameter_Value = vz.getParameterBlock_New(full_path)
             if Parameter_Value is None:
                 break
-            trafo_params[f"trafo[0].param[{i}]"] = Parameter_Value
+            values[f"par_{i}"] = Parameter_Value
         except Exception as e:
             print(f"Error reading parameter {full_path}: {e}")
             break
 
     # 读取 Axis 参数
-    param_prefix_groups = {
-            "Axis": ["ratio", "s_min", "s_max", "s_init", "v_max", "a_max"],
-            "Ext":  ["ratio", "s_min", "s_max", "s_init", "v_max", "a_max"],
-            # 可继续添加其他组
-        }
-
     for prefix, fields in param_prefix_groups.items():
         for index in range(1, 99):  # 假设最多99个
             for field in fields:
                 full_key = f"{parameter_path}.[{prefix}_{index}.{field}]"
                 try:
-                   value = vz.getParameterBlock_New(full_key)
-                   if value is not None:
-                      axis_params[f"{prefix}_{index}.{field}"] = value
+                    value = vz.getParameterBlock_New(full_key)
+                    if value is not None:
+                        values[f"{prefix}_{index}.{field}"] = value
                 except Exception as e:
                     print(f"Error reading {full_key}: {e}")
 
+    return values
+
+def _list_block_params(vz, parameter_path: str):
+    """
+    Parameter names of a block from the Virtuos model tree, in one traversal.
+
+    Returns:
+        list: Local names such as ["KinID", "par_0", "Axis_1.ratio"], or None if the
+        model tree is not available (the caller then probes the block).
+    """
+    global model_tree_mode
+    if not model_tree_mode:
+        return None
+    try:
+        status, names = vz.listModelChildren(parameter_path)
+    except (AttributeError, OSError) as e:
+        # DLL without index/rowCount/getData
+        print(f"[INFO] Model tree unavailable, falling back to probing: {e}")
+        model_tree_mode = False
+        return None
+    if status != vz.V_SUCCD:
+        print(f"[WARN] {parameter_path} not found in the model tree")
+        return None
+    names = [name for name in names if _block_param_pattern.match(name)]
+    return names or None
+
+def _read_known_params(vz, parameter_path: str, param_names: list) -> dict:
+    """
+    Read only the given parameter names. Names that cannot be read are left out.
+    """
+    values = {}
+    for name in param_names:
+        full_path = make_virtuos_param_path(parameter_path, name)
+        try:
+            value = vz.getParameterBlock_New(full_path)
+        except Exception as e:
+            print(f"Error reading {full_path}: {e}")
+            continue
+        if value is not None:
+            values[name] = value
+    return values
+
+def _split_block_params(values: dict):
+    """
+    Sort {local_name: value} into the trafo and axis dicts used by the OPC UA layer.
+    """
+    trafo_params = {}
+    axis_params = {}
+    if "KinID" in values:
+        trafo_params["trafo[0].id"] = values["KinID"]
+    for name, value in values.items():
+        if name == "KinID":
+            continue
+        if name.startswith("par_"):
+            trafo_params[convert_param_name_for_read(name)] = value
+        else:
+            axis_params[name] = value
     return trafo_params, axis_params
 
+def _script_results_available(vz) -> bool:
+    """
+    Check once per session, with a script that does not touch the model, that the
+    generated scripts can hand their result back through a file. If not, bulk
+    reads and writes are switched off before any of them runs.
+    """
+    global script_results_verified, bulk_read_mode, bulk_write_mode
+    if script_results_verified is None:
+        result_path = virtuos_js.make_result_path("probe")
+        try:
+            ran = vz.interpretJSCodeFn(virtuos_js.build_probe_script(result_path)) == vz.V_SUCCD
+        except Exception as e:
+            print(f"[WARN] Script probe failed: {e}")
+            ran = False
+        script_results_verified = ran and virtuos_js.load_result_file(result_path) is not None
+        if not script_results_verified:
+            print("[INFO] Virtuos scripts cannot return results, using per-parameter calls.")
+            bulk_read_mode = False
+            bulk_write_mode = False
+    return script_results_verified
+
+def _read_block_values_bulk(vz, parameter_path: str, param_names=None):
+    """
+    Read the parameters of a block with one interpretJSCode call.
+
+    Args:
+        param_names (list): Names to read. None lets the script probe the block.
+
+    Returns:
+        dict: {local_name: value}, or None if scripting failed.
+    """
+    result_path = virtuos_js.make_result_path("read")
+    script = virtuos_js.build_read_script(parameter_path, result_path, param_names, param_prefix_groups)
+    try:
+        if vz.interpretJSCodeFn(script) != vz.V_SUCCD:
+            print(f"[WARN] Bulk read script failed for {parameter_path}")
+            return None
+    except Exception as e:
+        print(f"[WARN] Bulk read script failed for {parameter_path}: {e}")
+        return None
+    return virtuos_js.load_result_file(result_path)
+
+def _read_block_values(vz, parameter_path: str, param_names, bulk: bool) -> dict:
+    """
+    Read the given names (or probe the block if None), in bulk if possible.
+    """
+    global bulk_read_mode
+    if bulk:
+        values = _read_block_values_bulk(vz, parameter_path, param_names) if _script_results_available(vz) else None
+        if values is not None:
+            return values
+        print("[INFO] Bulk read unavailable, falling back to per-parameter reads.")
+        bulk_read_mode = False
+    if param_names is None:
+        return _probe_block_params(vz, parameter_path)
+    return _read_known_params(vz, parameter_path, param_names)
+
+def read_Value_Model_json(vz, parameter_path: str, use_schema_cache: bool = True, bulk: bool = None):
+    """
+    Read all trafo and axis parameters of a block.
+
+    The parameter names of a block are taken from the model tree (or found by probing
+    every candidate if the tree is unavailable) and kept in the schema cache, so later
+    reads only query names that exist. If a cached name can no longer be read, the
+    block is looked up again.
+
+    Args:
+        bulk (bool): Read through one generated script. Defaults to bulk_read_mode.
+
+    Returns:
+        tuple: (trafo_params, axis_params) dicts.
+    """
+    if bulk is None:
+        bulk = bulk_read_mode
+
+    if use_schema_cache:
+        schema_cache.bind_project(getattr(vz, "projectVirtuos", None) or project_path)
+        known_names = schema_cache.get(parameter_path)
+        if known_names:
+            values = _read_block_values(vz, parameter_path, known_names, bulk and bulk_read_mode)
+            if len(values) == len(known_names):
+                return _remember_read(parameter_path, _split_block_params(values))
+            print(f"[INFO] Schema of {parameter_path} changed, probing again.")
+            schema_cache.invalidate(parameter_path)
+
+    # Erst die echten Parameter aus dem Modellbaum, nur ohne Baum alle Kandidaten probieren
+    tree_names = _list_block_params(vz, parameter_path)
+    values = _read_block_values(vz, parameter_path, tree_names, bulk and bulk_read_mode)
+    if use_schema_cache and values:
+        schema_cache.put(parameter_path, list(values.keys()))
+    return _remember_read(parameter_path, _split_block_params(values))
+
+def benchmark_param_read(vz, parameter_path: str, repeat: int = 3) -> dict:
+    """
+    Compare the per-call read path with the bulk script path for one block.
+    The schema cache is bypassed so both paths probe the full block.
+
+    Returns:
+        dict: {"per_call_s": best time, "bulk_s": best time or None, "params": count}
+    """
+    global bulk_read_mode
+    saved_mode = bulk_read_mode
+    timings = {"per_call_s": None, "bulk_s": None, "params": 0}
+    try:
+        for label, bulk in (("per_call_s", False), ("bulk_s", True)):
+            best = None
+            for _ in range(repeat):
+                bulk_read_mode = True
+                start = time.perf_counter()
+                values = _read_block_values(vz, parameter_path, None, bulk)
+                elapsed = time.perf_counter() - start
+                if bulk and not bulk_read_mode:
+                    best = None  # fell back, no bulk timing
+                    break
+                best = elapsed if best is None else min(best, elapsed)
+                timings["params"] = len(values)
+            timings[label] = best
+    finally:
+        bulk_read_mode = saved_mode
+
+    bulk_text = f"{timings['bulk_s']:.4f}s" if timings["bulk_s"] is not None else "unavailable"
+    print(f"[BENCH] {parameter_path}: {timings['params']} params, "
+          f"per-call {timings['per_call_s']:.4f}s, bulk {bulk_text}")
+    return timings
+
+def read_block_params(vz, parameter_path: str) -> dict:
+    """
+    Read trafo and axis parameters of a block in a single pass.
+
+    Returns:
+        dict: {"trafo_names", "trafo_values", "axis_names", "axis_values"},
+        the same layout used for a Kanal on the OPC UA server.
+    """
+    trafo_params, axis_params = read_Value_Model_json(vz, parameter_path)
+    return {
+        "trafo_names": list(trafo_params.keys()),
+        "trafo_values": list(trafo_params.values()),
+        "axis_names": list(axis_params.keys()),
+        "axis_values": list(axis_params.values()),
+    }
+
 def extract_trafo_param_list(vz, parameter_path):
     trafo_params, _ = read_Value_Model_json(vz, parameter_path)
     names = list(trafo_params.keys())
@@ -203,12 +527,121 @@ def extract_axis_param_list(axis_params: dict):
     return param_names, param_values
 
 def write_params_to_virtuos(vz, parameter_path, trafo_names, trafo_values, axis_names, axis_values):
+    """
+    Write trafo and axis parameters with one setParameter call each.
+
+    Returns:
+        dict: {param_name: bool} success per parameter.
+    """
+    results = {}
     for name, value in zip(trafo_names, trafo_values):
         converted_name = convert_param_name_for_write(name)
-        write_single_param_to_virtuos(vz, parameter_path, converted_name, value)
+        results[name] = write_single_param_to_virtuos(vz, parameter_path, converted_name, value)
     for name, value in zip(axis_names, axis_values):
         converted_name = convert_param_name_for_write(name)
-        write_single_param_to_virtuos(vz, parameter_path, converted_name, value)
+        results[name] = write_single_param_to_virtuos(vz, parameter_path, converted_name, value)
+    return results
+
+def _verify_written_params(vz, parameter_path, local_values: dict) -> dict:
+    """
+    After a batch write with unknown outcome: read every parameter back and write
+    only those that differ from the requested value.
+
+    Returns:
+        dict: {local_name: bool} like the script result.
+    """
+    current = _read_known_params(vz, parameter_path, list(local_values))
+    results = {}
+    for local, value in local_values.items():
+        if local in current and normalize_param_value(current[local]) == normalize_param_value(value):
+            results[local] = True
+        else:
+            results[local] = write_single_param_to_virtuos(vz, parameter_path, local, value)
+    return results
+
+def write_params_to_virtuos_batch(vz, parameter_path, trafo_names, trafo_values, axis_names, axis_values):
+    """
+    Write trafo and axis parameters with one generated setAndCheckParameter script.
+
+    Without script support the parameters are written one by one. If the script ran
+    but left no result, the parameters are read back and only those that do not
+    hold the requested value are written again.
+
+    Returns:
+        dict: {param_name: bool} success per parameter, parsed from the script result file.
+    """
+    global bulk_write_mode
+    names = list(trafo_names) + list(axis_names)
+    values = list(trafo_values) + list(axis_values)
+    if not names:
+        return {}
+
+    if bulk_write_mode and _script_results_available(vz):
+        local_names = {convert_param_name_for_write(name): name for name in names}
+        local_values = {convert_param_name_for_write(name): value for name, value in zip(names, values)}
+        result_path = virtuos_js.make_result_path("write")
+        script = virtuos_js.build_write_script(parameter_path, result_path, local_values)
+        script_results = None
+        try:
+            if vz.interpretJSCodeFn(script) == vz.V_SUCCD:
+                script_results = virtuos_js.load_result_file(result_path)
+            else:
+                print(f"[WARN] Batch write script failed for {parameter_path}")
+        except Exception as e:
+            print(f"[WARN] Batch write script failed for {parameter_path}: {e}")
+
+        if script_results is None:
+            # Das Skript kann Parameter schon gesetzt haben: Zustand unbekannt, zuruecklesen statt alles neu schreiben
+            print("[INFO] Batch write returned no result, reading the parameters back.")
+            bulk_write_mode = False
+            script_results = _verify_written_params(vz, parameter_path, local_values)
+        results = {local_names[local]: bool(script_results.get(local, False)) for local in local_values}
+        for name, ok in results.items():
+            if not ok:
+                print(f"[ERROR] Failed to write {make_virtuos_param_path(parameter_path, convert_param_name_for_write(name))}")
+        _remember_written(parameter_path, names, values, results)
+        return results
+
+    results = write_params_to_virtuos(vz, parameter_path, trafo_names, trafo_values, axis_names, axis_values)
+    _remember_written(parameter_path, names, values, results)
+    return results
+
+def diff_against_snapshot(parameter_path, names, values):
+    """
+    Select the parameters whose value differs from the last snapshot of the block.
+    Parameters without a snapshot entry always count as changed.
+
+    Returns:
+        tuple: (changed_names, changed_values)
+    """
+    snapshot = param_snapshots.get(parameter_path, {})
+    changed_names, changed_values = [], []
+    for name, value in zip(names, values):
+        if snapshot.get(_snapshot_key(name)) != normalize_param_value(value):
+            changed_names.append(name)
+            changed_values.append(value)
+    return changed_names, changed_values
+
+def write_changed_params_to_virtuos(vz, parameter_path, trafo_names, trafo_values, axis_names, axis_values,
+                                    force_full: bool = False):
+    """
+    Write only the parameters that changed since the last read from or write to Virtuos.
+
+    Args:
+        force_full (bool): Write every parameter regardless of the snapshot.
+
+    Returns:
+        tuple: ({param_name: bool} for the parameters sent, number of unchanged parameters skipped)
+    """
+    if not force_full:
+        total = len(trafo_names) + len(axis_names)
+        trafo_names, trafo_values = diff_against_snapshot(parameter_path, trafo_names, trafo_values)
+        axis_names, axis_values = diff_against_snapshot(parameter_path, axis_names, axis_values)
+        skipped = total - len(trafo_names) - len(axis_names)
+    else:
+        skipped = 0
+    results = write_params_to_virtuos_batch(vz, parameter_path, trafo_names, trafo_values, axis_names, axis_values)
+    return results, skipped
 
 def write_single_param_to_virtuos(vz, parameter_path: str, param_name: str, param_value):
     """
@@ -247,12 +680,24 @@ def convert_param_name_for_write(param_name: str) -> str:
     # Axis/Ext: 保持原样，如 Axis_1.s_max → Axis_1.s_max
     return param_name
 
+def convert_param_name_for_read(param_name: str) -> str:
+    # Inverse of convert_param_name_for_write
+    if param_name == "KinID":
+        return "trafo[0].id"
+
+    if param_name.startswith("par_"):
+        return f"trafo[0].param[{param_name[len('par_'):]}]"
+
+    return param_name
+
 def load_block_map() -> dict:
     """
     Load the block map from the file specified by the environment variable BLOCK_MAP_PATH.
 
     It parses only the 'Model uuids' section, and returns a dictionary that maps
     block names (with and without brackets) to their full block diagram paths.
+    The file is parsed once by block_index and cached in Temp_Datei until its
+    modification time or size changes.
 
     Example:
         "RobotController" -> "[Block Diagram].[RobotController]"
@@ -261,74 +706,38 @@ def load_block_map() -> dict:
     Returns:
         dict: {block_name: full_path}
     """
-    if not controller_path or not os.path.isfile(controller_path):
-        raise FileNotFoundError(f"BLOCK_MAP_PATH not found or invalid: {controller_path}")
-
-    block_path_dict = {}
-    in_model_section = False
-
-    content = safe_open(controller_path)
-    for line in content.splitlines():
-        line = line.strip()
-
-        # Start capturing from the "Model uuids" section
-        if line.startswith("//Model uuids"):
-            in_model_section = True
-            continue
-        elif line.startswith("//Port uuids"):  # stop when Port uuids start
-            break
-
-        if in_model_section:
-            # Match = [Block Diagram].[xxx].[yyy] ;
-            match = re.search(r'=\s*(\[[^\]]+\](?:\.\[[^\]]+\])*)\s*;', line)
-            if match:
-                full_path = match.group(1)
-                block_name = full_path.split('.')[-1].strip('[]')
-                block_path_dict[block_name] = full_path
-                block_path_dict[f'[{block_name}]'] = full_path  # with brackets
+    return block_index.load(controller_path).block_map
 
-    return block_path_dict
+def find_blocks(keyword: str = "Controller") -> list:
+    """
+    Sorted plain block names containing keyword (case-insensitive), from the block index.
+    """
+    return block_index.load(controller_path).find(keyword)
 
-def get_block_path(block_name: str, block_map: dict) -> str:
+def get_block_path(block_name: str, block_map: dict = None) -> str:
     """
     Get the full block path from a given block name.
 
     Args:
         block_name (str): The name of the block, with or without brackets.
-        block_map (dict): A dictionary returned by `load_block_map`.
+        block_map (dict): A dictionary returned by `load_block_map`, default the block index.
 
     Returns:
         str: The full block path, or "Not Found" if it does not exist.
     """
+    if block_map is None:
+        return block_index.load(controller_path).get_path(block_name)
     return block_map.get(block_name.strip(), "Not Found")
 
 def extract_controller_paths():
     """
-    Extracts paths containing 'Controller' from a given file, and returns a list of these paths, truncated to end at 'Controller'.
-    
-    Parameters:
-        file_path (str): The file path to the file to be processed.
-    
+    Returns the paths containing 'Controller' from the block map file, truncated to end at 'Controller'.
+    Collected in the same pass as the block map (see block_index).
+
     Returns:
         list: A list of paths containing 'Controller', truncated to end at 'Controller'.
     """
-    # Set to store unique paths
-    controller_paths = set()
-    
-    # Regex to find paths containing 'Controller'
-    pattern = re.compile(r'\[.*?Controller.*?\]')
-    
-    with open(controller_path, 'r') as file:
-        for line in file:
-            # Find all occurrences of 'Controller' in the line
-            matches = pattern.findall(line)
-            for match in matches:
-                # Split the path at the word 'Controller' and keep up to 'Controller'
-                truncated_path = match.split('.[Programs')[0]
-                controller_paths.add(truncated_path)
-    
-    # Convert the set back to a list if needed
-    return list(controller_paths)
+    return list(block_index.load(controller_path).controller_paths)
 
 def safe_open(filepath):
     for encoding in ['utf-8', 'latin1']:
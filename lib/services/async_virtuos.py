@@ -0,0 +1,196 @@
+import asyncio
+import queue
+import threading
+from . import Virtuos_tool
+
+
+class JobContext:
+    """
+    Handed to jobs running on the Virtuos worker thread, so long jobs can stop
+    early after a cancellation and report progress back to the event loop.
+    """
+
+    def __init__(self, loop, cancel_event, progress=None):
+        self._loop = loop
+        self._cancel_event = cancel_event
+        self._progress = progress
+
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def report(self, *args):
+        """
+        Call the progress callback on the event loop thread (never blocks the worker).
+        Async callbacks are scheduled as tasks.
+        """
+        if self._progress is None:
+            return
+
+        def deliver():
+            try:
+                result = self._progress(*args)
+                if asyncio.iscoroutine(result):
+                    asyncio.ensure_future(result)
+            except Exception as e:
+                print(f"[ERROR] Progress callback failed: {e}")
+
+        self._loop.call_soon_threadsafe(deliver)
+
+
+class AsyncVirtuos:
+    """
+    Awaitable facade for Virtuos_tool / remote.VirtuosZugriff.
+
+    The Virtuos interface DLL is not re-entrant, so every call is queued and
+    executed by one dedicated worker thread. NiceGUI handlers await the result
+    and the event loop keeps serving the UI and OPC UA callbacks meanwhile.
+
+    The worker is not the only thread in the DLL: the CyclicUpdater / change_feed
+    threads call it as well. They are kept apart by vz.lock, which every
+    VirtuosZugriff method holds around its DLL call. Code outside a job must go
+    through VirtuosZugriff (or hold vz.lock itself), never call vz.vi directly.
+
+    Usage:
+        avz = AsyncVirtuos(vz_env.vz)
+        vz = await avz.call(vz_env.connect_to_virtuos)
+        params = await avz.read_block_params("[Block Diagram].[RobotController]")
+    """
+
+    def __init__(self, vz=None, name="VirtuosWorker"):
+        self.vz = vz
+        self._queue = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._worker, name=name, daemon=True)
+        self._thread.start()
+
+    ## Worker
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            fn, args, kwargs, loop, future, context = job
+            if context.cancelled():
+                continue
+            try:
+                result, error = fn(*args, **kwargs), None
+            except BaseException as e:
+                result, error = None, e
+            try:
+                loop.call_soon_threadsafe(self._resolve, future, result, error)
+            except RuntimeError:
+                pass  # event loop already closed, nobody is waiting any more
+
+    @staticmethod
+    def _resolve(future, result, error):
+        if future.done():  # cancelled while running
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    async def _submit(self, fn, args=(), kwargs=None, progress=None, with_context=False):
+        if self._closed:
+            raise RuntimeError("AsyncVirtuos worker is closed")
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        context = JobContext(loop, threading.Event(), progress)
+        if with_context:
+            args = (context,) + tuple(args)
+        self._queue.put((fn, args, kwargs or {}, loop, future, context))
+        try:
+            return await future
+        except asyncio.CancelledError:
+            # Not started yet: skipped by the worker. Running: the job sees ctx.cancelled().
+            context._cancel_event.set()
+            raise
+
+    ## Generic calls
+    async def call(self, fn, *args, **kwargs):
+        """
+        Run any function on the worker thread, e.g. await avz.call(vz.isOpen).
+        """
+        return await self._submit(fn, args, kwargs)
+
+    async def run_job(self, job, *args, progress=None, **kwargs):
+        """
+        Run job(ctx, *args, **kwargs) on the worker thread. The job should check
+        ctx.cancelled() between steps and may call ctx.report(...) for progress.
+        """
+        return await self._submit(job, args, kwargs, progress=progress, with_context=True)
+
+    ## Parameter access
+    async def read_block_params(self, block_path: str) -> dict:
+        return await self.call(Virtuos_tool.read_block_params, self.vz, block_path)
+
+    async def write_params(self, block_path, trafo_names, trafo_values, axis_names, axis_values) -> dict:
+        return await self.call(Virtuos_tool.write_params_to_virtuos_batch, self.vz, block_path,
+                               trafo_names, trafo_values, axis_names, axis_values)
+
+    async def write_changed_params(self, block_path, trafo_names, trafo_values, axis_names, axis_values,
+                                   force_full=False):
+        return await self.call(Virtuos_tool.write_changed_params_to_virtuos, self.vz, block_path,
+                               trafo_names, trafo_values, axis_names, axis_values, force_full=force_full)
+
+    async def read_blocks(self, block_paths: dict, progress=None) -> dict:
+        """
+        Read several blocks in one queued job.
+
+        Args:
+            block_paths (dict): {key: block_path}, e.g. {"Kanal_1": "[Block Diagram].[...]"}.
+            progress (callable): progress(done, total, key), called on the event loop.
+
+        Returns:
+            dict: {key: read_block_params result}. Keys after a cancellation are missing.
+        """
+        def job(ctx):
+            results = {}
+            total = len(block_paths)
+            for done, (key, path) in enumerate(block_paths.items(), start=1):
+                if ctx.cancelled():
+                    break
+                results[key] = Virtuos_tool.read_block_params(self.vz, path)
+                ctx.report(done, total, key)
+            return results
+
+        return await self.run_job(job, progress=progress)
+
+    async def write_blocks(self, block_data: dict, force_full=False, progress=None) -> dict:
+        """
+        Write back several blocks in one queued job, only changed values unless force_full.
+
+        Args:
+            block_data (dict): {key: (block_path, {"trafo_names", "trafo_values", "axis_names", "axis_values"})}.
+            progress (callable): progress(done, total, key), called on the event loop.
+
+        Returns:
+            dict: {key: (success map, skipped count)}.
+        """
+        def job(ctx):
+            results = {}
+            total = len(block_data)
+            for done, (key, (path, data)) in enumerate(block_data.items(), start=1):
+                if ctx.cancelled():
+                    break
+                results[key] = Virtuos_tool.write_changed_params_to_virtuos(
+                    self.vz, path,
+                    data["trafo_names"], data["trafo_values"],
+                    data["axis_names"], data["axis_values"],
+                    force_full=force_full,
+                )
+                ctx.report(done, total, key)
+            return results
+
+        return await self.run_job(job, progress=progress)
+
+    ## Lifecycle
+    def close(self, timeout=5.0):
+        """
+        Stop the worker after the queued jobs are done.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout)
@@ -0,0 +1,200 @@
+import bisect
+import json
+import os
+import re
+from lib.utils.save_to_file import TEMP_DIR
+
+# Match = [Block Diagram].[xxx].[yyy] ;
+_model_line = re.compile(r'=\s*(\[[^\]]+\](?:\.\[[^\]]+\])*)\s*;')
+# Paths containing 'Controller', truncated before '.[Programs'
+_controller_pattern = re.compile(r'\[.*?Controller.*?\]')
+
+
+class BlockIndex:
+    """
+    Parsed block map (exports/Block Diagram.map) with a persistent cache and
+    name lookup.
+
+    The map file is read in one pass for the 'Model uuids' section (block name ->
+    full path) and the controller paths. The result is cached in Temp_Datei and
+    reused as long as the modification time and size of the map file are unchanged.
+    Substring lookups go through an n-gram index over the lower-case block names,
+    so a search only touches candidate names; results are memoized per keyword.
+
+    Cache layout (Temp_Datei/block_index_cache.json):
+        {"source": {"path", "mtime", "size"}, "blocks": {name: path}, "controller_paths": [...]}
+    """
+
+    GRAM = 3  # Laenge der n-Gramme fuer die Teilstringsuche
+
+    def __init__(self, map_path=None, cache_filename="block_index_cache.json"):
+        self.map_path = map_path
+        self.cache_path = os.path.join(TEMP_DIR, cache_filename)
+        self.source_key = None
+        self.blocks = {}  # {plain block name: full path}
+        self.controller_paths = []
+        self._reset_lookup()
+
+    def _reset_lookup(self):
+        self.names = []  # sortiert nach Kleinschreibung, damit bisect auf _lower passt
+        self._lower = []  # kleingeschrieben, gleiche Reihenfolge wie names
+        self._grams = {}  # {n-Gramm (1..GRAM Zeichen): [Namensindex, ...]}
+        self._results = {}
+
+    @staticmethod
+    def make_source_key(map_path):
+        stat = os.stat(map_path)
+        return {"path": os.path.abspath(map_path), "mtime": stat.st_mtime, "size": stat.st_size}
+
+    ## Laden
+    def load(self, map_path=None):
+        """
+        Load the index for map_path, from the cache if the file did not change.
+        """
+        if map_path is not None:
+            self.map_path = map_path
+        if not self.map_path or not os.path.isfile(self.map_path):
+            raise FileNotFoundError(f"BLOCK_MAP_PATH not found or invalid: {self.map_path}")
+        key = self.make_source_key(self.map_path)
+        if key == self.source_key:
+            return self
+        if not self._load_cache(key):
+            self._parse()
+            self.source_key = key
+            self._save_cache()
+        self._build_lookup()
+        return self
+
+    def _load_cache(self, key):
+        if not os.path.isfile(self.cache_path):
+            return False
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[WARN] Ignoring unreadable block index cache {self.cache_path}: {e}")
+            return False
+        if data.get("source") != key:
+            return False
+        self.source_key = key
+        self.blocks = data.get("blocks", {})
+        self.controller_paths = data.get("controller_paths", [])
+        return True
+
+    def _save_cache(self):
+        # Temp-Datei je Prozess; ein fehlgeschlagenes Speichern kostet nur den Cache
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"source": self.source_key, "blocks": self.blocks,
+                           "controller_paths": self.controller_paths}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"[WARN] Could not save block index cache {self.cache_path}: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def _read_lines(self):
+        for encoding in ['utf-8', 'latin1']:
+            try:
+                with open(self.map_path, 'r', encoding=encoding) as f:
+                    return f.read().splitlines()
+            except UnicodeDecodeError:
+                continue
+        raise UnicodeDecodeError("Unable to decode file with utf-8 or latin1")
+
+    def _parse(self):
+        blocks = {}
+        controller_paths = set()
+        in_model_section = False
+        done_with_models = False
+        for line in self._read_lines():
+            for match in _controller_pattern.findall(line):
+                controller_paths.add(match.split('.[Programs')[0])
+            if done_with_models:
+                continue
+            line = line.strip()
+            # Start capturing from the "Model uuids" section
+            if line.startswith("//Model uuids"):
+                in_model_section = True
+                continue
+            elif line.startswith("//Port uuids"):  # stop when Port uuids start
+                done_with_models = True
+                continue
+            if in_model_section:
+                match = _model_line.search(line)
+                if match:
+                    full_path = match.group(1)
+                    blocks[full_path.split('.')[-1].strip('[]')] = full_path
+        self.blocks = blocks
+        self.controller_paths = sorted(controller_paths)
+
+    def _build_lookup(self):
+        self._reset_lookup()
+        self.names = sorted(self.blocks, key=lambda name: (name.lower(), name))
+        self._lower = [name.lower() for name in self.names]
+        for i, name in enumerate(self._lower):
+            seen = set()
+            for n in range(1, self.GRAM + 1):
+                for start in range(len(name) - n + 1):
+                    gram = name[start:start + n]
+                    if gram not in seen:
+                        seen.add(gram)
+                        self._grams.setdefault(gram, []).append(i)
+
+    ## Abfragen
+    @property
+    def block_map(self):
+        """
+        {name: full path} with and without brackets, the layout of the former load_block_map().
+        """
+        block_map = {}
+        for name, path in self.blocks.items():
+            block_map[name] = path
+            block_map[f'[{name}]'] = path
+        return block_map
+
+    def get_path(self, block_name, default="Not Found"):
+        return self.blocks.get(block_name.strip().strip('[]'), default)
+
+    def find(self, keyword="Controller"):
+        """
+        Block names containing keyword (case-insensitive), in plain sorted() order
+        like the former find_blocks().
+        """
+        key = keyword.strip().lower()
+        if key in self._results:
+            return list(self._results[key])
+        if not key:
+            result = list(self.names)
+        elif len(key) <= self.GRAM:
+            result = [self.names[i] for i in self._grams.get(key, [])]
+        else:
+            # Kandidaten aus der Schnittmenge der n-Gramme, dann exakt pruefen
+            postings = [self._grams.get(key[i:i + self.GRAM], []) for i in range(len(key) - self.GRAM + 1)]
+            postings.sort(key=len)
+            candidates = set(postings[0])
+            for posting in postings[1:]:
+                candidates.intersection_update(posting)
+                if not candidates:
+                    break
+            result = [self.names[i] for i in candidates if key in self._lower[i]]
+        result = sorted(result)
+        self._results[key] = result
+        return list(result)
+
+    def find_prefix(self, prefix):
+        """
+        Block names starting with prefix (case-insensitive), via binary search.
+        Sorted case-insensitively, the order of the index.
+        """
+        key = prefix.strip().lower()
+        start = bisect.bisect_left(self._lower, key)
+        result = []
+        end = start
+        while end < len(self._lower) and self._lower[end].startswith(key):
+            end += 1
+        return self.names[start:end]
@@ -0,0 +1,86 @@
+import threading
+from ctypes import c_int32, c_long, pointer
+
+
+def _to_number(text):
+    """
+    Port values arrive as strings from readChangedStringValue; numbers become float.
+    """
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+def changed_values(vz, paths, dataType=None, max_fifo_size=10000, update_rate_ms=10, stop_event=None):
+    """
+    Generator over the changes of a set of ports.
+
+    Turns on the buffered mode of the DLL (setBuffered with max_fifo_size) and the cyclic
+    update, fetches every buffered current set with updateCurrentSet and reads the ports
+    with readChangedStringValue. Only ports whose value changed in that set are yielded,
+    unchanged ports cost no conversion and no consumer work.
+
+    Cannot run next to a running CyclicUpdater, both would consume the same sets.
+
+    Args:
+        vz (remote.VirtuosZugriff): Connected Virtuos access.
+        paths (list): Port paths in hierarchical dot notation.
+        dataType: Data type(s) used to resolve the ValueIDs, default REAL64.
+        max_fifo_size (int): Number of sets the DLL buffers between two reads.
+        update_rate_ms (int): Update rate of the cyclic update.
+        stop_event (threading.Event): Ends the generator when set.
+
+    Yields:
+        tuple: (set_index, {path: value}) for every set with at least one change.
+    """
+    if vz.updater is not None and vz.updater.running:
+        raise RuntimeError("Cyclic updater is running, stop it before reading changes")
+    stop_event = stop_event or threading.Event()
+    data_types = [dt.value for dt in vz.dataTypeList(dataType, len(paths))]
+
+    def resolve(port_paths, port_types):
+        _, value_ids, port_status = vz.resolveValueIDs(port_paths, port_types)
+        return [(port_paths[i], port_types[i], value_ids[i])
+                for i in range(len(port_paths)) if port_status[i] == vz.V_SUCCD]
+
+    ports = resolve(list(paths), data_types)
+
+    if vz.setBufferedMode(True, max_fifo_size) != vz.V_SUCCD:
+        raise RuntimeError("setBuffered failed")
+    with vz.lock:
+        started = vz.vi.startCyclicUpdate(update_rate_ms) == vz.V_SUCCD
+    if not started:
+        vz.setBufferedMode(False, max_fifo_size)
+        raise RuntimeError("startCyclicUpdate failed")
+
+    remaining_sets = c_int32(0)
+    fill_state = c_long(0)
+    remaining_pointer, fill_pointer = pointer(remaining_sets), pointer(fill_state)
+    generation = vz.valueIDGeneration
+    set_index = 0
+    try:
+        stop_event.wait(0.03)  # Pause vor dem ersten Update des CurrentSet ist notwendig
+        while not stop_event.is_set():
+            changes = {}
+            with vz.lock:
+                status = vz.vi.updateCurrentSet(remaining_pointer, fill_pointer)
+                vz.checkInterfaceChange(status)
+                if generation != vz.valueIDGeneration:
+                    # ValueIDs nach Ramp up/down neu bestimmen
+                    ports = resolve([p[0] for p in ports], [p[1] for p in ports])
+                    generation = vz.valueIDGeneration
+                if status == vz.V_SUCCD:
+                    set_index += 1
+                    for path, _, value_id in ports:
+                        read_status, value, changed = vz.readChangedValue(value_id)
+                        if read_status == vz.V_SUCCD and changed:
+                            changes[path] = _to_number(value)
+            if changes:
+                yield set_index, changes
+            if status != vz.V_SUCCD or remaining_sets.value == 0:
+                stop_event.wait(update_rate_ms / 1000)
+    finally:
+        with vz.lock:
+            vz.vi.stopCyclicUpdate()
+        vz.setBufferedMode(False, max_fifo_size)
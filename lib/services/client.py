@@ -1,5 +1,6 @@
 import os
 import json
+import weakref
 from opcua import Client
 from lib.utils.save_to_file import save_structure_to_file
 
@@ -161,24 +162,40 @@ def build_kanal_axis_structure(client: Client) -> dict:
 
     return kanal_axis_structure
 
-def read_modifier_info(client: Client) -> dict:
+MODIFIER_FIELDS = ["LastModifier", "LastModifiedTime", "LastModifiedNode", "LastOperation", "SessionID"]
+
+# 每个客户端只解析一次 ModifierTrail 节点: {client: (idx, modifier_node, [field nodes], method node or None)}
+_modifier_nodes = weakref.WeakKeyDictionary()
+
+def get_modifier_nodes(client: Client):
     """
-    从 OPC UA 服务器读取修改者信息
+    ModifierTrail object, its field variables (in MODIFIER_FIELDS order) and the
+    UpdateModifier method node (None on servers without it), resolved once per client.
     """
-    try:
-        if not client:
-            return None
+    cached = _modifier_nodes.get(client)
+    if cached is None:
         # 自动获取命名空间索引
         ns_uri = "http://example.org/"
         idx = client.get_namespace_index(ns_uri)
         root = client.get_root_node()
         modifier_node = root.get_child([f"0:Objects", f"{idx}:ModifierTrail"])
+        field_nodes = [modifier_node.get_child(f"{idx}:{field}") for field in MODIFIER_FIELDS]
+        try:
+            method_node = modifier_node.get_child(f"{idx}:UpdateModifier")
+        except Exception:
+            method_node = None  # aelterer Server ohne Methode
+        cached = _modifier_nodes[client] = (idx, modifier_node, field_nodes, method_node)
+    return cached
 
-        modifier = modifier_node.get_child(f"{idx}:LastModifier").get_value()
-        modified_time = modifier_node.get_child(f"{idx}:LastModifiedTime").get_value()
-        modified_node = modifier_node.get_child(f"{idx}:LastModifiedNode").get_value()
-        operation = modifier_node.get_child(f"{idx}:LastOperation").get_value()
-        session_id = modifier_node.get_child(f"{idx}:SessionID").get_value()
+def read_modifier_info(client: Client) -> dict:
+    """
+    从 OPC UA 服务器读取修改者信息（一次批量读取）
+    """
+    try:
+        if not client:
+            return None
+        _, _, field_nodes, _ = get_modifier_nodes(client)
+        modifier, modified_time, modified_node, operation, session_id = client.get_values(field_nodes)
 
         return {
             'modifier': modifier,
@@ -272,15 +289,18 @@ def update_modifier_info_via_client(client: Client, modifier_name: str, modified
         from datetime import datetime
         
         # 获取修改者节点
-        root = client.get_root_node()
-        modifier_node = root.get_child(["0:Objects", "2:ModifierTrail"])
-
-        # 更新修改者信息
-        modifier_node.get_child("2:LastModifier").set_value(modifier_name)
-        modifier_node.get_child("2:LastModifiedTime").set_value(datetime.now().isoformat())
-        modifier_node.get_child("2:LastModifiedNode").set_value(modified_node)
-        modifier_node.get_child("2:LastOperation").set_value(operation)
-        modifier_node.get_child("2:SessionID").set_value(session_id or f"Client_{datetime.now().strftime('%H%M%S')}")
+        _, modifier_node, field_nodes, method_node = get_modifier_nodes(client)
+        session_id = session_id or f"Client_{datetime.now().strftime('%H%M%S')}"
+
+        # 服务器方法一次调用更新全部字段；旧服务器没有该方法时批量写入
+        if method_node is not None:
+            ok = modifier_node.call_method(method_node, modifier_name, modified_node, operation, session_id)
+        else:
+            client.set_values(field_nodes, [modifier_name, datetime.now().isoformat(), modified_node, operation, session_id])
+            ok = True
+        if not ok:
+            print("[ERROR] Server rejected the modifier update")
+            return False
 
         print(f"[MODIFIER] Updated via client: modifier={modifier_name}, node={modified_node}, operation={operation}")
         return True
@@ -0,0 +1,201 @@
+import threading
+import time
+import numpy as np
+from ctypes import c_int32, c_long, pointer
+from .port_io import PortSet
+
+
+class SignalRingBuffer:
+    """
+    Fixed-size ring buffer of port samples: timestamp, current-set index and one value
+    per channel. Old samples are overwritten once the capacity is reached.
+    """
+
+    def __init__(self, capacity, channels):
+        self.capacity = capacity
+        self.timestamps = np.zeros(capacity)
+        self.set_indices = np.zeros(capacity, dtype=np.int64)
+        self.values = np.full((capacity, channels), np.nan)
+        self.count = 0  # samples written in total
+        self.lock = threading.Lock()
+
+    def append(self, timestamp, set_index, values):
+        with self.lock:
+            row = self.count % self.capacity
+            self.timestamps[row] = timestamp
+            self.set_indices[row] = set_index
+            self.values[row] = values
+            self.count += 1
+
+    def snapshot(self, last=None):
+        """
+        Copy of the buffered samples in chronological order.
+
+        Args:
+            last (int): Only the newest `last` samples.
+
+        Returns:
+            tuple: (timestamps, set_indices, values)
+        """
+        with self.lock:
+            size = min(self.count, self.capacity)
+            if last is not None:
+                size = min(size, last)
+            rows = (np.arange(self.count - size, self.count)) % self.capacity
+            return self.timestamps[rows], self.set_indices[rows], self.values[rows]
+
+
+class CyclicUpdater:
+    """
+    Managed cyclic update of the Virtuos current set.
+
+    Replaces the free-running thread of VirtuosZugriff.startUpdate: updateCurrentSet,
+    readValue and writeValue all run under the same vz.lock, so a port read never sees
+    a half updated set. While the DLL still holds buffered sets (remainingSets > 0)
+    they are fetched without pause, otherwise the sleep shrinks with the buffer fill
+    state. Registered ports are sampled into a ring buffer after each update and
+    handed to the sinks (e.g. a recorder).
+
+    Usage:
+        updater = CyclicUpdater(vz, update_rate_ms=10)
+        updater.register(["[Block Diagram].[Robot].[Axis_1_Pos]", ...])
+        updater.start()
+        ...
+        timestamps, set_indices, values = updater.ring.snapshot()
+        updater.stop()
+    """
+
+    def __init__(self, vz, update_rate_ms=10, capacity=10000):
+        self.vz = vz
+        self.update_rate_ms = update_rate_ms
+        self.capacity = capacity
+        self.ports = None
+        self.ring = None
+        self.sinks = []  # callables(timestamp, set_index, values, status)
+        self.set_index = 0
+        self.status = vz.V_DAMGD
+        self.remaining_sets = c_int32(0)
+        self.buffer_fill_state = c_long(0)
+        self._remaining_pointer = pointer(self.remaining_sets)
+        self._fill_pointer = pointer(self.buffer_fill_state)
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def register(self, paths, dataType=None):
+        """
+        Select the ports sampled after every update. Resets the ring buffer.
+        """
+        with self.vz.lock:
+            self.ports = PortSet(self.vz, paths, dataType)
+            self.ring = SignalRingBuffer(self.capacity, len(self.ports))
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+
+    def remove_sink(self, sink):
+        if sink in self.sinks:
+            self.sinks.remove(sink)
+
+    def start(self):
+        """
+        Start the cyclic update in the DLL and the update thread.
+
+        Returns:
+            int: V_SUCCD or V_DAMGD
+        """
+        if self.running:
+            if self._stop_event.is_set():
+                # alter Thread haengt noch im letzten Update, kein zweiter Thread daneben
+                print("[ERROR] Previous cyclic update thread is still running, not restarting.")
+                return self.vz.V_DAMGD
+            return self.vz.V_SUCCD
+        with self.vz.lock:
+            if self.vz.vi.startCyclicUpdate(self.update_rate_ms) != self.vz.V_SUCCD:
+                print("[ERROR] startCyclicUpdate failed.")
+                return self.vz.V_DAMGD
+            self.vz.continueUpdate = 1
+        time.sleep(0.03)  # wichtig: Pause vor dem ersten Update des CurrentSet ist notwendig
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="VirtuosCyclicUpdate", daemon=True)
+        self._thread.start()
+        return self.vz.V_SUCCD
+
+    def stop(self, timeout=2.0):
+        """
+        Stop the update thread, wait for it and stop the cyclic update in the DLL.
+        A thread that does not end within timeout is kept, start() refuses to run
+        a second one until it has ended.
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                print("[WARN] Cyclic update thread did not stop in time.")
+            else:
+                self._thread = None
+        with self.vz.lock:
+            self.vz.continueUpdate = 0
+            return self.vz.vi.stopCyclicUpdate()
+
+    def update_once(self):
+        """
+        One updateCurrentSet plus sampling of the registered ports.
+
+        Returns:
+            int: Status of updateCurrentSet.
+        """
+        vz = self.vz
+        values = status = None
+        with vz.lock:
+            self.status = vz.vi.updateCurrentSet(self._remaining_pointer, self._fill_pointer)
+            vz.checkInterfaceChange(self.status)
+            if self.status != vz.V_SUCCD:
+                return self.status
+            self.set_index += 1
+            if self.ports is not None:
+                values, status = self.ports.read()
+        if values is not None:
+            timestamp = time.time()
+            self.ring.append(timestamp, self.set_index, values)
+            for sink in list(self.sinks):
+                try:
+                    sink(timestamp, self.set_index, values, status)
+                except Exception as e:
+                    print(f"[ERROR] Cyclic update sink failed: {e}")
+        return self.status
+
+    def _sleep_time(self):
+        if self.remaining_sets.value > 0:
+            return 0.0  # gepufferte Sets sofort abholen
+        period = self.update_rate_ms / 1000
+        # Fuellstand in Prozent: je voller der Puffer, desto kuerzer die Pause
+        fill = min(max(self.buffer_fill_state.value, 0), 100)
+        return period * (1 - fill / 100)
+
+    def _run(self):
+        period = self.update_rate_ms / 1000
+        try:
+            while not self._stop_event.is_set():
+                status = self.update_once()
+                if status == self.vz.V_SUCCD:
+                    delay = self._sleep_time()
+                else:
+                    delay = period  # noch kein Set verfuegbar oder Schnittstelle geaendert
+                if delay > 0:
+                    self._stop_event.wait(delay)
+        except Exception as e:
+            print(f"[ERROR] Cyclic update thread failed: {e}")
+        finally:
+            if not self._stop_event.is_set():
+                # Thread unerwartet beendet: zyklisches Update in der DLL nicht weiterlaufen lassen
+                self._stop_event.set()
+                with self.vz.lock:
+                    self.vz.continueUpdate = 0
+                    try:
+                        self.vz.vi.stopCyclicUpdate()
+                    except Exception as e:
+                        print(f"[ERROR] stopCyclicUpdate failed: {e}")
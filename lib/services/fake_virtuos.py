@@ -0,0 +1,666 @@
+import json
+import os
+import re
+import time
+import threading
+from collections import Counter, deque
+
+# Fake process IDs handed out by startVirtuos
+_pid_counter = iter(range(40000, 1 << 30))
+
+_IO_TYPES = {
+    "BOOLEAN": 0x0001, "REAL32": 0x0002, "REAL64": 0x0004, "STRING": 0x0008,
+    "INT8": 0x0010, "INT16": 0x0020, "INT32": 0x0040, "INT64": 0x0080,
+    "UINT8": 0x0100, "UINT16": 0x0200, "UINT32": 0x0400, "UINT64": 0x0800,
+}
+
+V_SUCCD = 0
+V_DAMGD = -1
+V_CORBA_INTERFACE_CHANGED_RAMPUP = 2007
+V_CORBA_INTERFACE_CHANGED_RAMPDOWN = 2010
+V_CORBA_INTERFACE_CHANGED_INITIALIZED = 2016
+
+
+def _text(arg):
+    """
+    Decode a string argument as the DLL would see it: str, bytes, c_char_p or char buffer.
+    """
+    if arg is None:
+        return None
+    if isinstance(arg, str):
+        return arg
+    if isinstance(arg, (bytes, bytearray)):
+        return bytes(arg).decode("utf-8")
+    value = getattr(arg, "value", None)
+    if isinstance(value, bytes):
+        return value.decode("utf-8")
+    return str(value)
+
+
+def _target(ptr):
+    """
+    The ctypes object behind pointer(...)/POINTER casts, or the object itself.
+    """
+    return ptr.contents if hasattr(ptr, "contents") else ptr
+
+
+def _scalar(arg):
+    return arg.value if hasattr(arg, "value") else arg
+
+
+class FakeBlockModel:
+    """
+    In-memory Virtuos project: block parameters and IO ports.
+
+    Attributes:
+        parameters (dict): {"[Block Diagram].[Block].[par_0]": "0", ...}, values as strings.
+        ports (dict): {"[Block Diagram].[Block].[Out]": {"type": "REAL64", "value": 0.0}, ...}.
+    """
+
+    def __init__(self, parameters=None, ports=None):
+        self.parameters = dict(parameters or {})
+        self.ports = {}
+        for path, port in (ports or {}).items():
+            self.add_port(path, port.get("type", "REAL64"), port.get("value", 0))
+        self.step_hooks = []  # callables(model, step_count) run on every simulation step
+
+    def add_port(self, path, data_type="REAL64", value=0):
+        type_code = _IO_TYPES[data_type] if isinstance(data_type, str) else int(data_type)
+        self.ports[path] = {"type": type_code, "value": value}
+
+    @classmethod
+    def from_file(cls, file_path):
+        with open(file_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data.get("parameters"), data.get("ports"))
+
+    @classmethod
+    def robot_controller(cls, block_path="[Block Diagram].[RobotController]", axes=6, trafo_params=32):
+        """
+        Block with KinID, par_0..par_{trafo_params-1} and Axis_1..Axis_{axes} fields,
+        shaped like the robot controllers the pages work with.
+        """
+        parameters = {f"{block_path}.[KinID]": "21"}
+        for i in range(trafo_params):
+            parameters[f"{block_path}.[par_{i}]"] = "0"
+        for index in range(1, axes + 1):
+            for field, value in (("ratio", "0.017453292519943295"), ("s_min", "-180"), ("s_max", "180"),
+                                 ("s_init", "0"), ("v_max", "500"), ("a_max", "1000")):
+                parameters[f"{block_path}.[Axis_{index}.{field}]"] = value
+        model = cls(parameters)
+        for index in range(1, axes + 1):
+            model.add_port(f"{block_path}.[Axis_{index}_Pos]", "REAL64", 0.0)
+        return model
+
+
+class FakeVirtuosInterface:
+    """
+    Pure-Python stand-in for the Virtuos interface DLL object (`vi`) in remote.VirtuosZugriff.
+
+    Implements the functions VirtuosZugriff calls with the same arguments and return
+    codes (0 = success, -1 = failure) over a FakeBlockModel, so parameter and port code
+    can run and be benchmarked without Virtuos. Every call waits `latency` seconds to
+    model the CORBA round trip and is counted in `calls`.
+
+    Generated parameter scripts (see virtuos_js.py) are emulated from their `request`
+    literal when `scripting` is True. In buffered mode (setBuffered) with the cyclic
+    update running, every simulation step queues one set that updateCurrentSet hands out.
+    """
+
+    def __init__(self, model=None, latency=0.0, scripting=True):
+        self.model = model if model is not None else FakeBlockModel.robot_controller()
+        self.latency = latency
+        self.scripting = scripting
+        self.calls = Counter()
+        self.lock = threading.Lock()
+        self.connected_ = False
+        self.project = None
+        self.sim_state = "Ready"
+        self.step_count = 0
+        self.cyclic_update = False
+        self.current_set = 0
+        self.forced = set()
+        self.buffered = False
+        self.max_fifo_size = 10000
+        self._fifo = deque()  # gepufferte Sets {Portpfad: Wert}, ein Set je Simulationsschritt
+        self._current_set = None  # Set des letzten updateCurrentSet, daraus lesen die Ports
+        self._previous_set = None  # Set davor, fuer die Aenderungskennung
+        self._last_read = {}  # {valueID: value} fuer readChangedStringValue ohne zyklisches Update
+        self._tree = None  # Modellbaum, aus den Namen von Parametern und Ports aufgebaut
+        self._tree_key = None
+        self.interface_generation = 1
+        self.interface_change = V_CORBA_INTERFACE_CHANGED_INITIALIZED  # returned for stale ValueIDs
+        self._port_ids = {}  # {path: valueID}
+        self._port_paths = {}  # {valueID: path}
+
+    @classmethod
+    def from_env(cls):
+        """
+        Build from envFakeModel (JSON model file) and envFakeLatency (seconds per call).
+        """
+        model_path = os.getenv("envFakeModel")
+        model = FakeBlockModel.from_file(model_path) if model_path else None
+        latency = float(os.getenv("envFakeLatency", "0"))
+        return cls(model, latency)
+
+    def _call(self, name):
+        self.calls[name] += 1
+        if self.latency > 0:
+            if self.latency < 0.002:
+                # sleep() is too coarse for sub-millisecond round trips
+                end = time.perf_counter() + self.latency
+                while time.perf_counter() < end:
+                    pass
+            else:
+                time.sleep(self.latency)
+
+    ## Virtuos-Schnittstelle
+    def initDLL(self):
+        self._call("initDLL")
+        return V_SUCCD
+
+    def detachDLL(self):
+        self._call("detachDLL")
+        return V_SUCCD
+
+    def setCorbaInfo(self, ip, port, serverName):
+        self._call("setCorbaInfo")
+        self.corba = (_text(ip), _text(port), _text(serverName))
+        return V_SUCCD
+
+    def startVirtuos(self, path, argc, argv, pid_ptr):
+        self._call("startVirtuos")
+        _target(pid_ptr).value = next(_pid_counter)
+        return V_SUCCD
+
+    def startConnection(self):
+        self._call("startConnection")
+        self.connected_ = True
+        return V_SUCCD
+
+    def stopConnection(self):
+        self._call("stopConnection")
+        self.connected_ = False
+        return V_SUCCD
+
+    def connected(self):
+        self._call("connected")
+        return V_SUCCD if self.connected_ else V_DAMGD
+
+    def stopVirtuos(self):
+        self._call("stopVirtuos")
+        self.connected_ = False
+        return V_SUCCD
+
+    def terminateProcess(self, pid):
+        self._call("terminateProcess")
+        return V_SUCCD
+
+    def killProcess(self, pid):
+        self._call("killProcess")
+        return V_SUCCD
+
+    def processState(self, pid, state_ptr):
+        self._call("processState")
+        _target(state_ptr).value = 1
+        return V_SUCCD
+
+    def interpretJSFile(self, path):
+        self._call("interpretJSFile")
+        with open(_text(path), "r", encoding="utf-8") as f:
+            return self._run_script(f.read())
+
+    def interpretJSCode(self, code):
+        self._call("interpretJSCode")
+        return self._run_script(_text(code))
+
+    def _run_script(self, code):
+        """
+        Emulate a script generated by virtuos_js from its `var request = {...};` line.
+        """
+        if not self.scripting:
+            return V_DAMGD
+        match = re.match(r"\s*var request = (.*);\s*$", code.splitlines()[0] if code else "")
+        if not match:
+            return V_SUCCD  # arbitrary script: nothing to emulate
+        request = json.loads(match.group(1))
+        block = request.get("block")
+        params = self.model.parameters
+        result = {}
+        if request["op"] == "probe":
+            result = {"ok": True}
+        elif request["op"] == "read":
+            names = request.get("names")
+            if names is None:
+                names = ["KinID"]
+                for i in range(request.get("maxPar", 9999)):
+                    if f"{block}.[par_{i}]" not in params:
+                        break
+                    names.append(f"par_{i}")
+                for prefix, fields in request.get("groups", {}).items():
+                    for index in range(1, request.get("maxIndex", 98) + 1):
+                        names.extend(f"{prefix}_{index}.{field}" for field in fields)
+            for name in names:
+                value = params.get(f"{block}.[{name}]")
+                if value is not None:
+                    result[name] = value
+        elif request["op"] == "write":
+            for name, value in request["values"].items():
+                path = f"{block}.[{name}]"
+                result[name] = path in params
+                if result[name]:
+                    params[path] = str(value)
+        with open(request["resultPath"], "w", encoding="utf-8") as f:
+            json.dump(result, f)
+        return V_SUCCD
+
+    ## Projekt-Schnittstelle
+    def loadProject(self, path, convert):
+        self._call("loadProject")
+        self.project = _text(path)
+        self.interface_change = V_CORBA_INTERFACE_CHANGED_INITIALIZED
+        self.interface_generation += 1
+        return V_SUCCD
+
+    def isOpened(self):
+        self._call("isOpened")
+        return V_SUCCD if self.project or self.connected_ else V_DAMGD
+
+    def closeProject(self):
+        self._call("closeProject")
+        self.project = None
+        return V_SUCCD
+
+    ## Simulations-Schnittstelle
+    def rampUp(self):
+        self._call("rampUp")
+        self.sim_state = "Suspended"
+        self.interface_change = V_CORBA_INTERFACE_CHANGED_RAMPUP
+        self.interface_generation += 1
+        return V_SUCCD
+
+    def rampDown(self):
+        self._call("rampDown")
+        self.sim_state = "Ready"
+        self.interface_change = V_CORBA_INTERFACE_CHANGED_RAMPDOWN
+        self.interface_generation += 1
+        return V_SUCCD
+
+    def run(self):
+        self._call("run")
+        self.sim_state = "Running"
+        return V_SUCCD
+
+    def stop(self):
+        self._call("stop")
+        self.sim_state = "Suspended"
+        return V_SUCCD
+
+    def step(self):
+        self._call("step")
+        self.step_count += 1
+        for hook in self.model.step_hooks:
+            hook(self.model, self.step_count)
+        if self.buffered and self.cyclic_update:
+            # Gepufferter Modus: jeder Schritt legt ein Set in die FIFO, die aeltesten fallen heraus
+            self._fifo.append(self._port_values())
+            while len(self._fifo) > max(self.max_fifo_size, 1):
+                self._fifo.popleft()
+        return V_SUCCD
+
+    def reset(self):
+        self._call("reset")
+        self.step_count = 0
+        return V_SUCCD
+
+    def rampUp2(self, n, names):
+        return self.rampUp()
+
+    def rampDown2(self, n, names):
+        return self.rampDown()
+
+    def run2(self, n, names):
+        return self.run()
+
+    def stop2(self, n, names):
+        return self.stop()
+
+    def step2(self, n, names):
+        return self.step()
+
+    def reset2(self, n, names):
+        return self.reset()
+
+    def getSimulationStatus(self, buffer, size_ptr):
+        self._call("getSimulationStatus")
+        data = self.sim_state.encode("utf-8")
+        size = _target(size_ptr)
+        if len(data) + 1 > size.value:
+            size.value = len(data) + 1
+            return V_DAMGD
+        buffer.value = data
+        return V_SUCCD
+
+    ## Modell-Schnittstelle
+    def getParameter(self, name, buffer, size_ptr):
+        self._call("getParameter")
+        value = self.model.parameters.get(_text(name))
+        if value is None:
+            return V_DAMGD
+        data = str(value).encode("utf-8")
+        size = _target(size_ptr)
+        if len(data) + 1 > size.value:
+            size.value = len(data) + 1
+            return V_DAMGD
+        if hasattr(buffer, "raw"):  # writable char buffer
+            buffer.value = data
+        size.value = len(data) + 1
+        return V_SUCCD
+
+    def setParameter(self, name, value):
+        self._call("setParameter")
+        path = _text(name)
+        if path not in self.model.parameters:
+            return V_DAMGD
+        self.model.parameters[path] = _text(value)
+        return V_SUCCD
+
+    def setProperty(self, path, value):
+        self._call("setProperty")
+        return V_SUCCD
+
+    ## Modellbaum
+    def _model_tree(self):
+        """
+        Nodes [(name, parent_id, [child_ids])], node 0 is the root. Built from the
+        hierarchical names of parameters and ports, "[A].[B].[par_0]" -> A / B / par_0.
+        """
+        key = (len(self.model.parameters), len(self.model.ports))
+        if self._tree is None or key != self._tree_key:
+            nodes = [("", None, [])]
+            lookup = {}
+            for path in list(self.model.parameters) + list(self.model.ports):
+                parent = 0
+                for name in path[1:-1].split("].["):
+                    node = lookup.get((parent, name))
+                    if node is None:
+                        node = lookup[(parent, name)] = len(nodes)
+                        nodes.append((name, parent, []))
+                        nodes[parent][2].append(node)
+                    parent = node
+            self._tree, self._tree_key = nodes, key
+        return self._tree
+
+    @staticmethod
+    def _node_id(index_ptr):
+        index = _target(index_ptr)
+        return int(index.internalId) if index.row >= 0 else 0
+
+    def index(self, row, column, parent_ptr, child_ptr):
+        self._call("index")
+        children = self._model_tree()[self._node_id(parent_ptr)][2]
+        row = _scalar(row)
+        if not 0 <= row < len(children):
+            return V_DAMGD
+        child = _target(child_ptr)
+        child.row, child.column, child.internalId = row, _scalar(column), children[row]
+        return V_SUCCD
+
+    def rowCount(self, parent_ptr, count_ptr):
+        self._call("rowCount")
+        _target(count_ptr).value = len(self._model_tree()[self._node_id(parent_ptr)][2])
+        return V_SUCCD
+
+    def columnCount(self, parent_ptr, count_ptr):
+        self._call("columnCount")
+        _target(count_ptr).value = 1
+        return V_SUCCD
+
+    def getData(self, index_ptr, role, out, size_ptr):
+        self._call("getData")
+        node_id = self._node_id(index_ptr)
+        if node_id == 0:
+            return V_DAMGD
+        data = self._model_tree()[node_id][0].encode("utf-8")
+        size = _target(size_ptr)
+        if len(data) + 1 > size.value:
+            size.value = len(data) + 1
+            return V_DAMGD
+        out.value = data
+        size.value = len(data) + 1
+        return V_SUCCD
+
+    def parent(self, index_ptr, parent_ptr):
+        self._call("parent")
+        tree = self._model_tree()
+        parent_id = tree[self._node_id(index_ptr)][1]
+        result = _target(parent_ptr)
+        if not parent_id:
+            result.row, result.column, result.internalId = -1, -1, 0
+        else:
+            result.row = tree[tree[parent_id][1]][2].index(parent_id)
+            result.column, result.internalId = 0, parent_id
+        return V_SUCCD
+
+    ## Kommunikations-Schnittstelle
+    def getValueID(self, path, data_type, access, vid_ptr):
+        self._call("getValueID")
+        path = _text(path)
+        port = self.model.ports.get(path)
+        if port is None:
+            return V_DAMGD
+        port_id = self._port_ids.get(path)
+        if port_id is None:
+            port_id = self._port_ids[path] = len(self._port_ids)
+            self._port_paths[port_id] = path
+        vid = _target(vid_ptr)
+        vid.valueID = port_id
+        vid.interfaceID = self.interface_generation
+        vid.interfaceID2 = 0
+        vid.valueDataType = port["type"]
+        vid.valueIOType = access
+        return V_SUCCD
+
+    def _port(self, vid):
+        """
+        (status, port) for a ValueID. ValueIDs from before the last ramp up/down or project
+        load report the interface change code like the real DLL.
+        """
+        vid = _target(vid)
+        if vid.interfaceID != self.interface_generation:
+            return self.interface_change, None
+        path = self._port_paths.get(vid.valueID)
+        if path is None:
+            return V_DAMGD, None
+        return V_SUCCD, self.model.ports[path]
+
+    def _port_values(self):
+        return {path: port["value"] for path, port in self.model.ports.items()}
+
+    def _value(self, vid, port):
+        """
+        Value of a port as the DLL reports it: from the current set while the cyclic
+        update runs, otherwise the live model value.
+        """
+        if self.cyclic_update and self._current_set is not None:
+            return self._current_set.get(self._port_paths.get(_target(vid).valueID), port["value"])
+        return port["value"]
+
+    def _read(self, name, vid, out_ptr):
+        self._call(name)
+        status, port = self._port(vid)
+        if port is None:
+            return status
+        _target(out_ptr).value = self._value(vid, port)
+        return V_SUCCD
+
+    def _write(self, name, vid, value, force_type):
+        self._call(name)
+        status, port = self._port(vid)
+        if port is None:
+            return status
+        port["value"] = _scalar(value)
+        return V_SUCCD
+
+    def readBooleanValue(self, vid, out_ptr):
+        return self._read("readBooleanValue", vid, out_ptr)
+
+    def readReal32Value(self, vid, out_ptr):
+        return self._read("readReal32Value", vid, out_ptr)
+
+    def readReal64Value(self, vid, out_ptr):
+        return self._read("readReal64Value", vid, out_ptr)
+
+    def readInt8Value(self, vid, out_ptr):
+        return self._read("readInt8Value", vid, out_ptr)
+
+    def readInt16Value(self, vid, out_ptr):
+        return self._read("readInt16Value", vid, out_ptr)
+
+    def readInt32Value(self, vid, out_ptr):
+        return self._read("readInt32Value", vid, out_ptr)
+
+    def readInt64Value(self, vid, out_ptr):
+        return self._read("readInt64Value", vid, out_ptr)
+
+    def readUInt8Value(self, vid, out_ptr):
+        return self._read("readUInt8Value", vid, out_ptr)
+
+    def readUInt16Value(self, vid, out_ptr):
+        return self._read("readUInt16Value", vid, out_ptr)
+
+    def readUInt32Value(self, vid, out_ptr):
+        return self._read("readUInt32Value", vid, out_ptr)
+
+    def readUInt64Value(self, vid, out_ptr):
+        return self._read("readUInt64Value", vid, out_ptr)
+
+    def readStringValue(self, vid, out, size_ptr):
+        self._call("readStringValue")
+        status, port = self._port(vid)
+        if port is None:
+            return status
+        data = str(self._value(vid, port)).encode("utf-8")
+        size = _target(size_ptr)
+        if hasattr(out, "raw") and len(data) < len(out):
+            out.value = data
+        size.value = len(data) + 1
+        return V_SUCCD
+
+    def readChangedStringValue(self, vid, out, size_ptr, changed_ptr):
+        self._call("readChangedStringValue")
+        status, port = self._port(vid)
+        if port is None:
+            return status
+        key = _target(vid).valueID
+        value = self._value(vid, port)
+        if self.cyclic_update and self._current_set is not None:
+            # geaendert gegenueber dem vorherigen Set, wie die DLL
+            path = self._port_paths.get(key)
+            previous = self._previous_set
+            _target(changed_ptr).value = previous is None or path not in previous or previous[path] != value
+        else:
+            _target(changed_ptr).value = self._last_read.get(key, object()) != value
+        self._last_read[key] = value
+        data = str(value).encode("utf-8")
+        size = _target(size_ptr)
+        if hasattr(out, "raw") and len(data) < len(out):
+            out.value = data
+        size.value = len(data) + 1
+        return V_SUCCD
+
+    def setBuffered(self, buffered, max_fifo_size):
+        self._call("setBuffered")
+        self.buffered = bool(_scalar(buffered))
+        self.max_fifo_size = _scalar(max_fifo_size)
+        self._fifo.clear()
+        return V_SUCCD
+
+    def writeBooleanValue(self, vid, value, force_type):
+        return self._write("writeBooleanValue", vid, value, force_type)
+
+    def writeReal32Value(self, vid, value, force_type):
+        return self._write("writeReal32Value", vid, value, force_type)
+
+    def writeReal64Value(self, vid, value, force_type):
+        return self._write("writeReal64Value", vid, value, force_type)
+
+    def writeInt8Value(self, vid, value, force_type):
+        return self._write("writeInt8Value", vid, value, force_type)
+
+    def writeInt16Value(self, vid, value, force_type):
+        return self._write("writeInt16Value", vid, value, force_type)
+
+    def writeInt32Value(self, vid, value, force_type):
+        return self._write("writeInt32Value", vid, value, force_type)
+
+    def writeInt64Value(self, vid, value, force_type):
+        return self._write("writeInt64Value", vid, value, force_type)
+
+    def writeUInt8Value(self, vid, value, force_type):
+        return self._write("writeUInt8Value", vid, value, force_type)
+
+    def writeUInt16Value(self, vid, value, force_type):
+        return self._write("writeUInt16Value", vid, value, force_type)
+
+    def writeUInt32Value(self, vid, value, force_type):
+        return self._write("writeUInt32Value", vid, value, force_type)
+
+    def writeUInt64Value(self, vid, value, force_type):
+        return self._write("writeUInt64Value", vid, value, force_type)
+
+    def writeStringValue(self, vid, value, force_type):
+        return self._write("writeStringValue", vid, _text(value), force_type)
+
+    def setForced(self, vid, force_type):
+        self._call("setForced")
+        status, port = self._port(vid)
+        if port is None:
+            return status
+        vid = _target(vid)
+        key = (vid.valueID, vid.interfaceID, vid.interfaceID2)
+        if _scalar(force_type) == 1:
+            self.forced.add(key)
+        else:
+            self.forced.discard(key)
+        return V_SUCCD
+
+    def unforceAll(self):
+        self._call("unforceAll")
+        self.forced.clear()
+        return V_SUCCD
+
+    ## Update
+    def startCyclicUpdate(self, update_rate):
+        self._call("startCyclicUpdate")
+        self.cyclic_update = True
+        return V_SUCCD
+
+    def stopCyclicUpdate(self):
+        self._call("stopCyclicUpdate")
+        self.cyclic_update = False
+        self._fifo.clear()
+        self._current_set = self._previous_set = None
+        return V_SUCCD
+
+    def updateCurrentSet(self, remaining_ptr, fill_ptr):
+        """
+        Next current set. Buffered: the oldest set of the FIFO, V_DAMGD while it is empty;
+        remaining_ptr gets the sets left, fill_ptr the fill state in percent.
+        Unbuffered: the live port values.
+        """
+        self._call("updateCurrentSet")
+        if not self.cyclic_update:
+            return V_DAMGD
+        if self.buffered:
+            if not self._fifo:
+                return V_DAMGD  # noch kein neues Set
+            next_set = self._fifo.popleft()
+        else:
+            next_set = self._port_values()
+        self._previous_set, self._current_set = self._current_set, next_set
+        self.current_set += 1
+        remaining = len(self._fifo) if self.buffered else 0
+        _target(remaining_ptr).value = remaining
+        _target(fill_ptr).value = remaining * 100 // max(self.max_fifo_size, 1)
+        return V_SUCCD
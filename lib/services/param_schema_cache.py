@@ -0,0 +1,107 @@
+import json
+import os
+from lib.utils.save_to_file import TEMP_DIR
+
+
+class ParamSchemaCache:
+    """
+    Persistent record of the parameter names that exist for each Virtuos block.
+
+    The cache belongs to one Virtuos project file and its modification time.
+    As soon as a different project (or a newer save of the same project) is
+    bound, all recorded blocks are dropped and probed again on the next read.
+
+    File layout (Temp_Datei/param_schema_cache.json):
+        {
+            "project": {"path": "...", "mtime": 1700000000.0},
+            "blocks": {"[Block Diagram].[RobotController]": ["KinID", "par_0", ...]}
+        }
+    """
+
+    def __init__(self, filename="param_schema_cache.json"):
+        self.filepath = os.path.join(TEMP_DIR, filename)
+        self.project_key = None
+        self.blocks = {}
+        self._loaded = False
+
+    @staticmethod
+    def make_project_key(project_file):
+        if not project_file:
+            return None
+        path = os.path.abspath(project_file)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            mtime = None
+        return {"path": path, "mtime": mtime}
+
+    def _load(self):
+        self._loaded = True
+        if not os.path.isfile(self.filepath):
+            return
+        try:
+            with open(self.filepath, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.project_key = data.get("project")
+            self.blocks = data.get("blocks", {})
+        except (OSError, ValueError) as e:
+            print(f"[WARN] Ignoring unreadable schema cache {self.filepath}: {e}")
+            self.project_key = None
+            self.blocks = {}
+
+    def _save(self):
+        """
+        Persist the cache. A failed save only costs the cache entry, never the read
+        that produced it, so errors are logged and swallowed.
+        """
+        # Temp-Datei je Prozess: Farm-Worker teilen sich Temp_Datei
+        tmp_path = f"{self.filepath}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.filepath), exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"project": self.project_key, "blocks": self.blocks}, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, self.filepath)
+        except OSError as e:
+            print(f"[WARN] Could not save schema cache {self.filepath}: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def bind_project(self, project_file):
+        """
+        Select the project the cache entries belong to. Invalidates the cache
+        if the project file or its modification time differs from the stored one.
+        """
+        if not self._loaded:
+            self._load()
+        key = self.make_project_key(project_file)
+        if key != self.project_key:
+            if self.blocks:
+                print("[INFO] Virtuos project changed, parameter schema cache invalidated.")
+            self.project_key = key
+            self.blocks = {}
+            self._save()
+
+    def get(self, block_path):
+        if not self._loaded:
+            self._load()
+        return self.blocks.get(block_path)
+
+    def put(self, block_path, param_names):
+        if not self._loaded:
+            self._load()
+        self.blocks[block_path] = list(param_names)
+        self._save()
+
+    def invalidate(self, block_path=None):
+        """
+        Drop one block, or every block if no path is given.
+        """
+        if not self._loaded:
+            self._load()
+        if block_path is None:
+            self.blocks = {}
+        else:
+            self.blocks.pop(block_path, None)
+        self._save()
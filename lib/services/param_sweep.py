@@ -0,0 +1,259 @@
+import hashlib
+import itertools
+import json
+import os
+import time
+import numpy as np
+from . import Virtuos_tool
+from .port_io import PortSet
+from lib.utils.save_to_file import TEMP_DIR
+
+MANIFEST_NAME = "manifest.json"
+
+
+def parameter_grid(**axes):
+    """
+    Full factorial grid over parameter values.
+
+    Example:
+        parameter_grid(par_0=[0.1, 0.2], **{"Axis_1.v_max": [400, 500]})
+        -> [{"par_0": 0.1, "Axis_1.v_max": 400}, {"par_0": 0.1, "Axis_1.v_max": 500}, ...]
+    """
+    names = list(axes)
+    return [dict(zip(names, values)) for values in itertools.product(*(axes[name] for name in names))]
+
+
+def point_id(params: dict) -> str:
+    """
+    Stable id of a parameter set, independent of the order of the names.
+    """
+    text = json.dumps({k: Virtuos_tool.normalize_param_value(v) for k, v in params.items()}, sort_keys=True)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+
+def _write_json_atomic(path, data):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def run_sweep_point(vz, ports, block_path, params, steps, sample_every, out_dir, pid):
+    """
+    One sweep point: batch write, simReset, `steps` steps through VirtuosZugriff.runSteps
+    with a sample every `sample_every` steps, result saved as out_dir/point_<pid>.npz.
+
+    Returns:
+        tuple: (file name, number of samples)
+    """
+    results = Virtuos_tool.write_params_to_virtuos_batch(vz, block_path, list(params), list(params.values()), [], [])
+    failed = [name for name, ok in results.items() if not ok]
+    if failed:
+        raise RuntimeError(f"Parameter write failed: {failed}")
+    if vz.simReset() != vz.V_SUCCD:
+        raise RuntimeError("simReset failed")
+
+    # Anfangszustand nach dem Reset, dann alle sample_every Schritte eine Zeile
+    start_values, _ = ports.read()
+    status, block = vz.runSteps(steps, ports, sample_every)
+    if status != vz.V_SUCCD:
+        raise RuntimeError(f"simStep failed after {len(block) * sample_every} steps")
+    step_col = np.arange(len(block) + 1, dtype=np.int64) * sample_every
+    values = np.vstack([start_values, block])
+
+    file_name = f"point_{pid}.npz"
+    # Temp-Datei je Prozess: ein neu verteilter Farm-Job kann denselben Punkt parallel schreiben
+    tmp_path = os.path.join(out_dir, f"point_{pid}.{os.getpid()}.tmp.npz")
+    np.savez_compressed(tmp_path, step=step_col, values=values, ports=np.array(ports.paths))
+    os.replace(tmp_path, os.path.join(out_dir, file_name))
+    return file_name, len(step_col)
+
+
+# Zustand je Farm-Worker: {id(vz): {"ramped": bool, "ports": {tuple(paths): PortSet}}}
+_worker_state = {}
+
+
+def sweep_point_job(vz, block_path, params, sample_ports, steps, sample_every, out_dir, pid, ramp_up=True):
+    """
+    Farm job (see virtuos_farm.VirtuosFarm) for one sweep point. Ramps the simulation of
+    the worker's instance up once and keeps one PortSet per port list.
+    """
+    state = _worker_state.setdefault(id(vz), {"ramped": not ramp_up, "ports": {}})
+    if not state["ramped"]:
+        if vz.rampUpSim() != vz.V_SUCCD:
+            raise RuntimeError("rampUpSim failed")
+        state["ramped"] = True
+    key = tuple(sample_ports)
+    if key not in state["ports"]:
+        state["ports"][key] = PortSet(vz, sample_ports)
+    return run_sweep_point(vz, state["ports"][key], block_path, params, steps, sample_every, out_dir, pid)
+
+
+class ParameterSweep:
+    """
+    Runs a block through a list of parameter sets on the simulation step API.
+
+    For every point the parameters are written in one batch
+    (Virtuos_tool.write_params_to_virtuos_batch, names as in read_Value_Model_json,
+    e.g. "KinID", "par_3", "Axis_1.v_max"), the simulation is reset with simReset and
+    stepped `steps` times (VirtuosZugriff.runSteps). Every `sample_every` steps the chosen ports are
+    read through a PortSet.
+
+    Each point is stored as compressed npz in out_dir (columns: step, values[samples, ports]
+    with NaN for failed reads, ports). manifest.json records the state of every point and is
+    rewritten after each point, so an interrupted sweep continues with the first point
+    that is not "done" when run() is called again with the same out_dir.
+
+    Usage:
+        sweep = ParameterSweep(vz, "[Block Diagram].[RobotController]",
+                               parameter_grid(par_0=[0.1, 0.2], par_1=[1, 2]),
+                               ["[Block Diagram].[RobotController].[Axis_1_Pos]"], steps=500)
+        manifest = sweep.run()
+        table = sweep.collect()
+    """
+
+    def __init__(self, vz, block_path, points, sample_ports, steps, sample_every=1, out_dir=None,
+                 ramp_up=True):
+        self.vz = vz
+        self.block_path = block_path
+        self.points = [dict(p) for p in points]
+        self.sample_ports = list(sample_ports)
+        self.steps = int(steps)
+        self.sample_every = max(int(sample_every), 1)
+        self.out_dir = out_dir or os.path.join(TEMP_DIR, "Sweep_Datei", time.strftime("%Y%m%d_%H%M%S"))
+        self.ramp_up = ramp_up
+        self.manifest_path = os.path.join(self.out_dir, MANIFEST_NAME)
+        self.manifest = None
+
+    ## Manifest
+    def _load_manifest(self):
+        os.makedirs(self.out_dir, exist_ok=True)
+        entries = {}
+        if os.path.isfile(self.manifest_path):
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                previous = json.load(f)
+            if previous.get("block_path") != self.block_path or previous.get("ports") != self.sample_ports \
+                    or previous.get("steps") != self.steps or previous.get("sample_every") != self.sample_every:
+                raise ValueError(f"Sweep settings differ from the existing manifest in {self.out_dir}")
+            entries = {entry["id"]: entry for entry in previous.get("points", [])}
+
+        points = []
+        for params in self.points:
+            pid = point_id(params)
+            entry = entries.get(pid, {"id": pid, "params": params, "status": "pending", "file": None})
+            # Ergebnisdatei fehlt -> Punkt erneut rechnen
+            if entry["status"] == "done" and not os.path.isfile(os.path.join(self.out_dir, entry["file"] or "")):
+                entry["status"] = "pending"
+            points.append(entry)
+        self.manifest = {
+            "block_path": self.block_path,
+            "ports": self.sample_ports,
+            "steps": self.steps,
+            "sample_every": self.sample_every,
+            "points": points,
+        }
+        self._save_manifest()
+
+    def _save_manifest(self):
+        _write_json_atomic(self.manifest_path, self.manifest)
+
+    ## Ablauf
+    def run(self, farm=None):
+        """
+        Run all points that are not done yet.
+
+        Args:
+            farm (virtuos_farm.VirtuosFarm): Spread the points over the instances of a
+                farm instead of running them on self.vz.
+
+        Returns:
+            dict: The manifest after the run.
+        """
+        self._load_manifest()
+        todo = [entry for entry in self.manifest["points"] if entry["status"] != "done"]
+        print(f"[INFO] Sweep {self.block_path}: {len(self.manifest['points']) - len(todo)} done, {len(todo)} to run")
+        if not todo:
+            return self.manifest
+        if farm is not None:
+            return self._run_on_farm(farm, todo)
+
+        vz = self.vz
+        if self.ramp_up and vz.rampUpSim() != vz.V_SUCCD:
+            print("[ERROR] rampUpSim failed, sweep aborted.")
+            return self.manifest
+        ports = PortSet(vz, self.sample_ports)
+        for n, entry in enumerate(todo, 1):
+            entry["status"] = "running"
+            entry["started"] = time.time()
+            self._save_manifest()
+            try:
+                entry["file"], entry["samples"] = self._run_point(ports, entry)
+                entry["status"] = "done"
+                print(f"[OK] Sweep point {n}/{len(todo)} ({entry['id']}) finished.")
+            except Exception as e:
+                entry["status"] = "failed"
+                entry["error"] = str(e)
+                print(f"[ERROR] Sweep point {n}/{len(todo)} ({entry['id']}) failed: {e}")
+            entry["finished"] = time.time()
+            self._save_manifest()
+        return self.manifest
+
+    def _run_point(self, ports, entry):
+        return run_sweep_point(self.vz, ports, self.block_path, entry["params"], self.steps,
+                               self.sample_every, self.out_dir, entry["id"])
+
+    def _run_on_farm(self, farm, todo):
+        jobs = {}
+        for entry in todo:
+            job_id = farm.submit(sweep_point_job, self.block_path, entry["params"], self.sample_ports, self.steps,
+                                 self.sample_every, self.out_dir, entry["id"], self.ramp_up)
+            jobs[job_id] = entry
+            entry["status"] = "running"
+            entry["started"] = time.time()
+        self._save_manifest()
+        for n, (job_id, ok, result) in enumerate(farm.results(list(jobs)), 1):
+            entry = jobs[job_id]
+            if ok:
+                entry["file"], entry["samples"] = result
+                entry["status"] = "done"
+                print(f"[OK] Sweep point {n}/{len(todo)} ({entry['id']}) finished.")
+            else:
+                entry["status"] = "failed"
+                entry["error"] = str(result)
+                print(f"[ERROR] Sweep point {n}/{len(todo)} ({entry['id']}) failed: {result}")
+            entry["finished"] = time.time()
+            self._save_manifest()
+        return self.manifest
+
+    ## Auswertung
+    def collect(self):
+        """
+        All finished points in one columnar table.
+
+        Returns:
+            dict: {"point": ids[n], "step": [n], "values": [n, ports], "params": {name: [n]}}
+            with one row per sample.
+        """
+        if self.manifest is None:
+            self._load_manifest()
+        done = [entry for entry in self.manifest["points"] if entry["status"] == "done"]
+        names = sorted({name for entry in done for name in entry["params"]})
+        point_col, step_col, value_col = [], [], []
+        param_cols = {name: [] for name in names}
+        for entry in done:
+            with np.load(os.path.join(self.out_dir, entry["file"])) as data:
+                count = len(data["step"])
+                step_col.append(data["step"])
+                value_col.append(data["values"])
+            point_col.append(np.full(count, entry["id"]))
+            for name in names:
+                param_cols[name].append(np.full(count, str(entry["params"].get(name, ""))))
+        if not done:
+            return {"point": np.array([]), "step": np.array([], dtype=np.int64),
+                    "values": np.empty((0, len(self.sample_ports))), "params": {}}
+        return {
+            "point": np.concatenate(point_col),
+            "step": np.concatenate(step_col),
+            "values": np.concatenate(value_col),
+            "params": {name: np.concatenate(cols) for name, cols in param_cols.items()},
+        }
@@ -0,0 +1,144 @@
+import numpy as np
+from ctypes import POINTER, addressof, cast, sizeof
+from . import remote
+
+# 64-Bit-Ganzzahlen verlieren in float64 ab 2**53 Stellen
+_INEXACT_TYPES = (remote.VIODataType.V_IO_TYPE_INT64, remote.VIODataType.V_IO_TYPE_UINT64)
+
+
+class _PortGroup:
+    """
+    Ports of one data type: preallocated ctypes array, one pointer per element
+    and a NumPy view on the array.
+    """
+
+    def __init__(self, vi, data_type, indices, value_ids):
+        read_name, write_name, ctype = remote.VALUE_ACCESS[data_type]
+        self.indices = np.asarray(indices, dtype=np.intp)
+        self.value_ids = value_ids
+        self.buffer = (ctype * len(indices))()
+        base = addressof(self.buffer)
+        self.pointers = [cast(base + k * sizeof(ctype), POINTER(ctype)) for k in range(len(indices))]
+        self.view = np.ctypeslib.as_array(self.buffer)
+        self.read = getattr(vi, read_name)
+        self.write = getattr(vi, write_name)
+
+
+class PortSet:
+    """
+    Prepared bulk access to a fixed list of numeric Virtuos ports.
+
+    The ValueIDs are resolved once through the ValueID cache of VirtuosZugriff and the
+    ports are grouped by data type. Each group reads into a preallocated ctypes array
+    through the function from remote.VALUE_ACCESS, so a cycle does one DLL call per port
+    and no allocation per port. The set re-resolves itself after the ValueIDs were
+    invalidated (ramp up/down, reset, interface-change codes).
+
+    Usage:
+        ports = PortSet(vz, ["[Block Diagram].[Robot].[Axis_1_Pos]", ...])
+        values, status = ports.read()
+
+    Values are returned as float64 (NaN for failed ports), status as int32 per port.
+    INT64/UINT64 ports are rejected: float64 is exact only up to 2**53, read those
+    ports with VirtuosZugriff.readValue/writeValue.
+    """
+
+    def __init__(self, vz, paths, dataType=None):
+        self.vz = vz
+        self.paths = list(paths)
+        self.data_types = vz.dataTypeList(dataType, len(self.paths))
+        unsupported = [p for p, dt in zip(self.paths, self.data_types) if dt not in remote.VALUE_ACCESS]
+        if unsupported:
+            raise ValueError(f"PortSet supports numeric ports only: {unsupported}")
+        inexact = [p for p, dt in zip(self.paths, self.data_types) if dt in _INEXACT_TYPES]
+        if inexact:
+            raise ValueError(f"PortSet cannot pass 64-bit integer ports through float64 exactly: {inexact}")
+        self.values = np.full(len(self.paths), np.nan)
+        self.status = np.full(len(self.paths), remote.VirtuosZugriff.V_DAMGD, dtype=np.int32)
+        self.generation = None
+        self.prepare()
+
+    def __len__(self):
+        return len(self.paths)
+
+    def prepare(self):
+        """
+        Resolve the ValueIDs and rebuild the per-type groups.
+        """
+        vz = self.vz
+        with vz.lock:
+            _, self.value_ids, port_status = vz.resolveValueIDs(self.paths, [dt.value for dt in self.data_types])
+            groups = {}
+            for i in range(len(self.paths)):
+                if port_status[i] == remote.VirtuosZugriff.V_SUCCD:
+                    groups.setdefault(self.data_types[i], []).append(i)
+            self.groups = [
+                _PortGroup(vz.vi, data_type, indices, [self.value_ids[i] for i in indices])
+                for data_type, indices in groups.items()
+            ]
+            self.generation = vz.valueIDGeneration
+
+    def _check_interface_change(self, status):
+        changed = np.isin(status, remote.VirtuosZugriff.V_CORBA_INTERFACE_CHANGED)
+        if changed.any():
+            self.vz.invalidateValueIDs()
+
+    def read(self):
+        """
+        Read all ports.
+
+        Returns:
+            tuple: (values, status) as NumPy arrays in the order of paths.
+        """
+        with self.vz.lock:
+            self.read_into(self.values, self.status)
+            values, status = self.values.copy(), self.status.copy()
+        self._check_interface_change(status)
+        return values, status
+
+    def read_into(self, values, status):
+        """
+        Read all ports into caller-owned arrays, e.g. one row of a preallocated sample
+        block. Interface-change codes stay in status, the caller has to check them.
+        """
+        vz = self.vz
+        with vz.lock:
+            if self.generation != vz.valueIDGeneration:
+                self.prepare()
+            status.fill(remote.VirtuosZugriff.V_DAMGD)
+            for group in self.groups:
+                read = group.read
+                status[group.indices] = [read(vid, ptr) for vid, ptr in zip(group.value_ids, group.pointers)]
+                values[group.indices] = group.view
+            values[status != remote.VirtuosZugriff.V_SUCCD] = np.nan
+
+    def write(self, values, force=True):
+        """
+        Write all ports, forced like VirtuosZugriff.writeValue.
+
+        Args:
+            values (array-like): One value per path.
+            force (bool): Force the ports before writing.
+
+        Returns:
+            np.ndarray: Status per port.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if values.shape != (len(self.paths),):
+            raise ValueError(f"Expected {len(self.paths)} values, got shape {values.shape}")
+        vz = self.vz
+        forced = remote.ForceType.V_WRITE_FORCED.value
+        with vz.lock:
+            if self.generation != vz.valueIDGeneration:
+                self.prepare()
+            if force:
+                vz.forcePorts([vid for group in self.groups for vid in group.value_ids])
+            self.status.fill(remote.VirtuosZugriff.V_DAMGD)
+            for group in self.groups:
+                group.view[:] = values[group.indices]
+                write = group.write
+                buffer = group.buffer
+                self.status[group.indices] = [write(vid, buffer[k], forced) for k, vid in enumerate(group.value_ids)]
+            status = self.status.copy()
+        self._check_interface_change(status)
+        return status
@@ -5,8 +5,10 @@ import time
 from threading import *
 import threading
 import inspect  # Angabe der Zeilennumern
+from functools import lru_cache, wraps
 
 from dotenv import load_dotenv
+from .fake_virtuos import FakeVirtuosInterface
 
 dotenv_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "config", ".env"))
 load_dotenv(dotenv_path)
@@ -56,6 +58,31 @@ class ValueID(Structure):
         self.valueIOType = 0
 
 
+class ModelIndex(Structure):
+    """
+    Index eines Eintrags im Modellbaum von Virtuos (index/rowCount/getData/parent).
+    Aufbau wie QModelIndex: Zeile, Spalte, interne ID und Modell. Ein ungueltiger
+    Index (row = -1) steht fuer die Wurzel des Baums.
+
+    Achtung: Layout angenommen, noch nicht mit virtuos_interface.h abgeglichen. Deshalb
+    ist virtuos_model_tree standardmaessig 0.
+    """
+    _fields_ = [('row', c_int32),
+                ('column', c_int32),
+                ('internalId', c_uint64),
+                ('model', c_void_p)]
+
+    def __init__(self):
+        self.row = -1
+        self.column = -1
+        self.internalId = 0
+        self.model = None
+
+
+# Rolle fuer getData: angezeigter Name des Eintrags
+MODEL_DISPLAY_ROLE = 0
+
+
 class VIODataType(Enum):
     # Datentypen fuer Virtuos
     V_IO_TYPE_UNKNOWN   = 0x0000
@@ -104,6 +131,84 @@ def lineno():
     return inspect.currentframe().f_back.f_lineno
 
 
+# Methoden von VirtuosZugriff, die die DLL aufrufen, laufen komplett unter self.lock:
+# die DLL ist nicht reentrant und wird gleichzeitig vom CyclicUpdater, AsyncVirtuos und den Seiten benutzt.
+def _locked(method):
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+# Signaturen der genutzten DLL-Funktionen {Name: (argtypes, restype)}.
+# Werden einmalig in virtuosDLL() gesetzt, damit ctypes die Argumente nicht bei jedem Aufruf
+# generisch umwandeln muss. Die Funktionen mit Loesungsliste (rampUp2, ...) und read*/write*Value
+# werden hier nicht deklariert, deren Argumente haengen vom Aufruf ab. read*/write*Value siehe VALUE_ACCESS.
+DLL_SIGNATURES = {
+    name: ([], c_int32) for name in (
+        "initDLL", "detachDLL", "startConnection", "stopConnection", "connected", "stopVirtuos",
+        "isOpened", "closeProject", "rampUp", "rampDown", "run", "stop", "step", "reset",
+        "unforceAll", "stopCyclicUpdate",
+    )
+}
+DLL_SIGNATURES.update({
+    "setCorbaInfo": ([c_char_p, c_char_p, c_char_p], c_int32),
+    "startVirtuos": ([c_char_p, c_int32, POINTER(c_char_p), POINTER(c_int64)], c_int32),
+    "terminateProcess": ([c_int64], c_int32),
+    "killProcess": ([c_int64], c_int32),
+    "processState": ([c_int64, POINTER(c_long)], c_int32),
+    "interpretJSFile": ([c_char_p], c_int32),
+    "interpretJSCode": ([c_char_p], c_int32),
+    "importTSP36": ([c_char_p], c_int32),
+    "loadProject": ([c_char_p, c_int32], c_int32),
+    "getSimulationStatus": ([POINTER(c_char), POINTER(c_uint32)], c_int32),
+    "setProperty": ([c_char_p, c_char_p], c_int32),
+    "getParameter": ([c_char_p, POINTER(c_char), POINTER(c_uint32)], c_int32),
+    "setParameter": ([c_char_p, c_char_p], c_int32),
+    "getValueID": ([c_char_p, c_int32, c_uint32, POINTER(ValueID)], c_int32),
+    "setForced": ([ValueID, c_int32], c_int32),
+    "startCyclicUpdate": ([c_int32], c_int32),
+    "updateCurrentSet": ([POINTER(c_int32), POINTER(c_long)], c_int32),
+    "readStringValue": ([ValueID, POINTER(c_char), POINTER(c_uint32)], c_int32),
+    "writeStringValue": ([ValueID, c_char_p, c_int32], c_int32),
+    "setBuffered": ([c_bool, c_int32], c_int32),
+    "readChangedStringValue": ([ValueID, POINTER(c_char), POINTER(c_uint32), POINTER(c_bool)], c_int32),
+    "index": ([c_int32, c_int32, POINTER(ModelIndex), POINTER(ModelIndex)], c_int32),
+    "rowCount": ([POINTER(ModelIndex), POINTER(c_int32)], c_int32),
+    "columnCount": ([POINTER(ModelIndex), POINTER(c_int32)], c_int32),
+    "getData": ([POINTER(ModelIndex), c_int32, POINTER(c_char), POINTER(c_uint32)], c_int32),
+    "parent": ([POINTER(ModelIndex), POINTER(ModelIndex)], c_int32),
+})
+
+# Dispatch-Tabelle fuer Ports: Datentyp -> (Lesefunktion, Schreibfunktion, ctypes-Typ des Werts)
+VALUE_ACCESS = {
+    VIODataType.V_IO_TYPE_BOOLEAN: ("readBooleanValue", "writeBooleanValue", c_bool),
+    VIODataType.V_IO_TYPE_REAL32: ("readReal32Value", "writeReal32Value", c_float),
+    VIODataType.V_IO_TYPE_REAL64: ("readReal64Value", "writeReal64Value", c_double),
+    VIODataType.V_IO_TYPE_INT8: ("readInt8Value", "writeInt8Value", c_int8),
+    VIODataType.V_IO_TYPE_INT16: ("readInt16Value", "writeInt16Value", c_int16),
+    VIODataType.V_IO_TYPE_INT32: ("readInt32Value", "writeInt32Value", c_int32),
+    VIODataType.V_IO_TYPE_INT64: ("readInt64Value", "writeInt64Value", c_int64),
+    VIODataType.V_IO_TYPE_UINT8: ("readUInt8Value", "writeUInt8Value", c_uint8),
+    VIODataType.V_IO_TYPE_UINT16: ("readUInt16Value", "writeUInt16Value", c_uint16),
+    VIODataType.V_IO_TYPE_UINT32: ("readUInt32Value", "writeUInt32Value", c_uint32),
+    VIODataType.V_IO_TYPE_UINT64: ("readUInt64Value", "writeUInt64Value", c_uint64),
+}
+for _readName, _writeName, _ctype in VALUE_ACCESS.values():
+    DLL_SIGNATURES[_readName] = ([ValueID, POINTER(_ctype)], c_int32)
+    DLL_SIGNATURES[_writeName] = ([ValueID, _ctype, c_int32], c_int32)
+
+
+@lru_cache(maxsize=8192)
+def encodeName(string):
+    """
+    UTF-8 encoded hierarchical name. Cached, because the probe loops and cyclic reads
+    pass the same parameter and port paths over and over again.
+    """
+    return string.encode("utf-8")
+
+
 class VirtuosZugriff:
     def __init__(self):
         # lokale Variablen
@@ -127,9 +232,15 @@ class VirtuosZugriff:
         self.remainingSets = None
         self.bufferFillState = None
         self.continueUpdate = 0  # Endkriterium fuer Update des CurrentSet
-        # Schloss zum vollständigen Durchführen einer Funktion ohne Unterbrechung
+        self.updater = None  # CyclicUpdater (cyclic_update.py) fuer das Update des CurrentSet
+        # Schloss zum vollständigen Durchführen einer Funktion ohne Unterbrechung (RLock, siehe _locked)
         self.lock = threading.RLock()
         self.vi = None  # Verbindung zur Virtuos-DLL
+        self.threadBuffers = threading.local()  # wiederverwendete Puffer je Thread
+        self.valueIDCache = {}  # {(Portpfad, Datentyp): ValueID}, gueltig bis zur Schnittstellenaenderung
+        self.valueIDGeneration = 0  # wird bei jeder Invalidierung erhoeht
+        self.stepPortSets = {}  # {Portpfade: PortSet} fuer runSteps
+        self.forcedValueIDs = set()  # bereits geforcte Ports als (valueID, interfaceID, interfaceID2)
 
     ## Definition allgemeiner Variablen
     V_SUCCD = 0
@@ -139,6 +250,13 @@ class VirtuosZugriff:
     V_CORBA_INTERFACE_CHANGED_RAMPDOWN = 2010
     V_CORBA_INTERFACE_CHANGED_DATA_RESET = 2013
     V_CORBA_INTERFACE_CHANGED_INITIALIZED = 2016
+    # Nach diesen Codes sind alle bisher bestimmten ValueIDs ungueltig
+    V_CORBA_INTERFACE_CHANGED = (
+        V_CORBA_INTERFACE_CHANGED_RAMPUP,
+        V_CORBA_INTERFACE_CHANGED_RAMPDOWN,
+        V_CORBA_INTERFACE_CHANGED_DATA_RESET,
+        V_CORBA_INTERFACE_CHANGED_INITIALIZED,
+    )
 
     ## Definition von allgemeinen Funktionen
     def stringToCharP(self, string):  # Umwandlung von string zu c_char_p
@@ -186,6 +304,7 @@ class VirtuosZugriff:
     ### Virtuos-Funktionen
     ## Virtuos-Schnittstelle
     # initDLL
+    @_locked
     def virtuosDLL(
         self,
         nwd = os.getenv('envNwd'),
@@ -198,14 +317,54 @@ class VirtuosZugriff:
         # os.chdir(self.nwd)  # Aenderung des work directory, damit dort ausgefuehrt wird, wo die DLL liegt
         # mydll = cdll.LoadLibrary(self.libDll)
         # evtl Abhaengigkeiten von anderen DLLs, die nicht gefunden werden
-        self.vi = cdll.LoadLibrary(self.libDll)  # .virtuos_interface_x64
+        if os.getenv('envVirtuosBackend', 'dll') == 'fake':
+            # In-Process-Ersatz ohne Virtuos (Linux, Tests, Benchmarks), siehe fake_virtuos.py
+            self.vi = FakeVirtuosInterface.from_env()
+        else:
+            self.vi = cdll.LoadLibrary(self.libDll)  # .virtuos_interface_x64
+            self.declareSignatures()
         self.vi.initDLL()
         # self.vi = cdll.virtuos_interface_x64
         # cdll.virtuos_interface_x64.initDLL()
 
     
     
+    def declareSignatures(self):
+        """
+        Declares argtypes and restype of the DLL functions listed in DLL_SIGNATURES.
+        Functions missing in older DLL versions are skipped.
+
+        Returns:
+            int: Number of declared functions (0 for the fake interface).
+        """
+        if not isinstance(self.vi, CDLL):
+            return 0
+        declared = 0
+        for name, (argtypes, restype) in DLL_SIGNATURES.items():
+            try:
+                function = getattr(self.vi, name)
+            except AttributeError:
+                continue
+            function.argtypes = argtypes
+            function.restype = restype
+            declared += 1
+        return declared
+
+    def parameterBuffer(self, minSize=2048):
+        """
+        Returns the string buffer, size and size pointer of the calling thread for getParameter.
+        The buffer is allocated once per thread and only replaced when a larger one is needed.
+        """
+        buffers = self.threadBuffers
+        valueBuffer = getattr(buffers, "parameter", None)
+        if valueBuffer is None or len(valueBuffer) < minSize:
+            valueBuffer = buffers.parameter = create_string_buffer(minSize)
+            buffers.parameterSize = c_uint32(minSize)
+            buffers.parameterSizePointer = pointer(buffers.parameterSize)
+        return valueBuffer, buffers.parameterSize, buffers.parameterSizePointer
+
     # set CORBA-information
+    @_locked
     def corbaInfo(
         self, ipCorba="127.0.0.1", portCorba="54322", serverNameCorba="Visualization"
     ):
@@ -227,7 +386,7 @@ class VirtuosZugriff:
         self.serverNameCorba = serverNameCorba
         self.serverNameCorba = self.stringToCharP(self.serverNameCorba)
         if (
-            cdll.LoadLibrary(self.libDll).setCorbaInfo(
+            self.vi.setCorbaInfo(
                 self.ipCorba, self.portCorba, self.serverNameCorba
             )
             == 0
@@ -237,30 +396,35 @@ class VirtuosZugriff:
             self.status = VirtuosZugriff.V_DAMGD
         return self.status
     # start Virtuos
-    def startVirtuosExe(self, pathVirtuos= os.getenv('envPathVirtuosExe')):
+    @_locked
+    def startVirtuosExe(self, pathVirtuos= os.getenv('envPathVirtuosExe'), virtuosArgs=None):
         """
         Starts the Virtuos executable with the specified path and establishes a connection with the CORBA server.
 
         Sets the path to the Virtuos executable and initializes the connection to the CORBA server by passing the 
         appropriate parameter. The function returns a status indicating the success or failure of the operation.
+        The process ID of the started Virtuos is stored in self.prozessIDM.
 
         Args:
             pathVirtuos (str): The path to the Virtuos executable. Defaults to the environment variable 'envPathVirtuosExe'.
+            virtuosArgs (list): Command line arguments for Virtuos. Defaults to ["-startcorbaserver"].
 
         Returns:
             int: The status of the operation, either VirtuosZugriff.V_SUCCD for success or VirtuosZugriff.V_DAMGD for failure.
         """
         self.pathVirtuos = pathVirtuos
         # gleichzeitiger Verbindungsaufbau mit CORBA-Server
-        virtuosparameter = "-startcorbaserver"
-        virtuosparameter = (c_char_p * 1)(virtuosparameter.encode("utf-8"))
-        if (self.vi.startVirtuos(self.stringToCharP(self.pathVirtuos), c_int32(1), virtuosparameter,
+        if virtuosArgs is None:
+            virtuosArgs = ["-startcorbaserver"]
+        virtuosparameter = (c_char_p * len(virtuosArgs))(*[arg.encode("utf-8") for arg in virtuosArgs])
+        if (self.vi.startVirtuos(self.stringToCharP(self.pathVirtuos), c_int32(len(virtuosArgs)), virtuosparameter,
                                   pointer(self.prozessIDM)) == 0):
             self.status = VirtuosZugriff.V_SUCCD
         else:
             self.status = VirtuosZugriff.V_DAMGD
         return self.status
     
+    @_locked
     def interpretJSFileFn(self, pathJSFile):
         """
         Interprets a JavaScript file with the given path using the Virtuos interface.
@@ -285,6 +449,7 @@ class VirtuosZugriff:
             self.status = VirtuosZugriff.V_DAMGD
         return self.status
     
+    @_locked
     def interpretJSCodeFn(self, jsCode):
         """
         Interprets a JavaScript code snippet using the Virtuos interface.
@@ -298,6 +463,7 @@ class VirtuosZugriff:
             self.status = VirtuosZugriff.V_DAMGD
         return self.status
 
+    @_locked
     def importTSP36(self, pathJSFile):
         self.pathJSFile = pathJSFile
 
@@ -308,6 +474,7 @@ class VirtuosZugriff:
         return self.status
         
     # Corba-Verbindung aufbauen
+    @_locked
     def startConnectionCorba(self):
         """
         Establishes a connection to the CORBA server using the Virtuos interface.
@@ -325,6 +492,7 @@ class VirtuosZugriff:
         return self.status
 
     # Verbindung ueberpruefen
+    @_locked
     def isConnected(self):
         """
         Checks if the connection to Virtuos is established.
@@ -341,6 +509,7 @@ class VirtuosZugriff:
             return VirtuosZugriff.V_DAMGD
 
     # DLL trennen
+    @_locked
     def unloadDLL(self):
         """
         Unloads the Virtuos interface DLL.
@@ -360,6 +529,7 @@ class VirtuosZugriff:
             pass
     
     # Shut down Virtuos
+    @_locked
     def stopVirtuosPrgm(self):
         """
         Stops the Virtuos process.
@@ -377,6 +547,7 @@ class VirtuosZugriff:
         return self.status
     
     # Beenden des Prozesses
+    @_locked
     def stopProcess(self, prozessID):
         """
         Stops the Virtuos process gracefully.
@@ -396,6 +567,7 @@ class VirtuosZugriff:
             return VirtuosZugriff.V_DAMGD
 
     # Hartes Beenden des Prozesses
+    @_locked
     def killProcess(self, prozessID):
         """
         Forcefully terminates the Virtuos process.
@@ -415,6 +587,7 @@ class VirtuosZugriff:
             return VirtuosZugriff.V_DAMGD
 
     # Zustand des Prozesses
+    @_locked
     def stateProcess(self, prozessIDM):
         """
         Retrieves the state of the Virtuos process.
@@ -442,6 +615,7 @@ class VirtuosZugriff:
     ## Projekt-Schnittstelle
     
     # Projekt in Virtuos laden
+    @_locked
     def getProject(self, projectVirtuos, convert=1):
         """
         Loads a Virtuos project from a file.
@@ -462,6 +636,7 @@ class VirtuosZugriff:
 
         self.projectVirtuos = projectVirtuos
         dconvert = convert
+        self.invalidateValueIDs()
         if (self.vi.loadProject(self.stringToCharP(self.projectVirtuos), dconvert) == 0):
             self.status = VirtuosZugriff.V_SUCCD
         else:
@@ -469,6 +644,7 @@ class VirtuosZugriff:
         return self.status
     
     # Ueberpruefen, ob ein Projekt in VirtuosM geoeffnet ist
+    @_locked
     def isOpen(self):
         """
         Checks if a Virtuos project is currently open.
@@ -487,6 +663,7 @@ class VirtuosZugriff:
             return VirtuosZugriff.V_DAMGD
 
     # Projekt in Virtuos schliessen
+    @_locked
     def closeProject(self):
         """
         Closes the currently open Virtuos project.
@@ -498,12 +675,14 @@ class VirtuosZugriff:
             int: The status of the operation, either VirtuosZugriff.V_SUCCD for success or
             VirtuosZugriff.V_DAMGD for failure.
         """
+        self.invalidateValueIDs()
         if (self.vi.closeProject() == 0):
             self.status = VirtuosZugriff.V_SUCCD
         else:
             self.status = VirtuosZugriff.V_DAMGD
         return self.status
 
+    @_locked
     def stopConnect(self):
         """
         Stops the connection to Virtuos.
@@ -522,6 +701,7 @@ class VirtuosZugriff:
         return self.status
             
     # !test Activates the 'Assisted TwinCAT Project Management' of a configuration.  Also sets the configuration as active configuration
+    @_locked
     def activateAssistedTwinCProjectMgmt(self, configName):
         """
         Activates the 'Assisted TwinCAT Project Management' of a configuration.  Also sets the configuration as active configuration
@@ -541,6 +721,7 @@ class VirtuosZugriff:
             self.status = VirtuosZugriff.V_DAMGD
             
     # !test import twinCAT project ( i_filePath - Full path to the *.tszip)
+    @_locked
     def importTwinCProject(self, configName, targetName, filePath):
         """
         Imports a TwinCAT project into Virtuos
@@ -568,6 +749,7 @@ class VirtuosZugriff:
         return self.status
     
     # set exclude from execution
+    @_locked
     def setExclFromExecution(self, hierarchicalModelName, bExclude):
         
         """
@@ -590,6 +772,7 @@ class VirtuosZugriff:
     
     # !test getEntityComment from hierarchicalModelName
     # i_entityType can be "model", "input", "output"
+    @_locked
     def getEntityCom(self, hierarchicalModelName, comment, sizeOfComment, entityType):
         """
         Retrieves the comment associated with a specified entity in the hierarchical model.
@@ -616,6 +799,7 @@ class VirtuosZugriff:
     
     # !test change EntityComment from hierarchicalModelName
     # i_entityType can be "model", "input", "output"
+    @_locked
     def changeEntityCom(self, hierarchicalModelName, comment, entityType):
         """
         Changes the comment associated with a specified entity in the hierarchical model.
@@ -638,6 +822,7 @@ class VirtuosZugriff:
             self.status = VirtuosZugriff.V_DAMGD
         
     # Projekt in Virtuos speichern
+    @_locked
     def saveVirtuosAs(self, pathToSave):
         """
         Saves the current Virtuos project to the specified path.
@@ -661,6 +846,7 @@ class VirtuosZugriff:
         return self.status
 
     # Merge Projekt
+    @_locked
     def mergeProject(self, pathToEcf, assemblyName):
         """
         Merges the Virtuos project with the specified .ecf file.
@@ -683,6 +869,7 @@ class VirtuosZugriff:
         return self.status
 
     # VIRTUOSREMOTEINTERFACE_API VRESULT setSimulationManagerConfiguration(const V_CHAR8 *i_simulationManagerConfigurationName);
+    @_locked
     def setSimManagerConfig(self, i_simulationManagerConfigurationName):
         """
         Sets the configuration of the simulation manager to the specified name.
@@ -706,6 +893,7 @@ class VirtuosZugriff:
     
     # VIRTUOSREMOTEINTERFACE_API VRESULT getSimulationManagerConfiguration(V_CHAR8 *o_simulationManagerConfigurationName, V_UINT32 *io_size);
     #! test   
+    @_locked
     def getSimManagerConfig(self):
         
         """
@@ -732,6 +920,7 @@ class VirtuosZugriff:
     
     # VIRTUOSREMOTEINTERFACE_API VRESULT getSimulationManagerConfigurationNames(V_UINT32 *io_numberOfConfigurations, V_UINT32 i_maxStringLength, V_CHAR8* o_simulationConfigurationNames[]);
     #! test
+    @_locked
     def getSimManagerConfigNames(self, io_numberOfConfigurations, i_maxStringLength, o_simulationConfigurationNames):
         """
         Retrieves the names of available simulation manager configurations.
@@ -762,6 +951,7 @@ class VirtuosZugriff:
             
     # VIRTUOSREMOTEINTERFACE_API VRESULT getSolverNames(const V_CHAR8 *i_simulationManagerConfigurationName, V_UINT32 *io_numberOfSolvers, V_UINT32 i_maxStringLength, V_CHAR8* o_solverNames[]);
     #! test
+    @_locked
     def getSolverNames(self, i_simulationManagerConfigurationName, io_numberOfSolvers, i_maxStringLength, o_solverNames):
         """
         Retrieves the names of available solvers for a given simulation manager configuration.
@@ -792,7 +982,9 @@ class VirtuosZugriff:
             
     ## Simulations-Schnittstelle
     # Ramp Up der Simulation
+    @_locked
     def rampUpSim(self):
+        self.invalidateValueIDs()
         if (self.vi.rampUp() == 0):
             self.status = VirtuosZugriff.V_SUCCD
         else:
@@ -800,7 +992,9 @@ class VirtuosZugriff:
         return self.status
 
     # Ramp Down der Simulation
+    @_locked
     def rampDownSim(self):
+        self.invalidateValueIDs()
         if (self.vi.rampDown() == VirtuosZugriff.V_SUCCD):
             self.status = VirtuosZugriff.V_SUCCD
         else:
@@ -808,6 +1002,7 @@ class VirtuosZugriff:
         return self.status
 
     # Starten der Simulation
+    @_locked
     def startSim(self):
         if (self.vi.run() == VirtuosZugriff.V_SUCCD):
             self.status = VirtuosZugriff.V_SUCCD
@@ -816,6 +1011,7 @@ class VirtuosZugriff:
         return self.status
 
     # Beenden der Simulation
+    @_locked
     def stopSim(self):
         if (self.vi.stop() == VirtuosZugriff.V_SUCCD):
             self.status = VirtuosZugriff.V_SUCCD
@@ -825,6 +1021,7 @@ class VirtuosZugriff:
 
     # VIRTUOSREMOTEINTERFACE_API VRESULT rampUp2(V_INT32 i_noOfSolvers, V_CHAR8* i_solverNames[]);
     # !test
+    @_locked
     def rampUpV2(self, i_noOfSolvers, i_solverNames):
         self.i_noOfSolvers = i_noOfSolvers
         self.i_solverNames = i_solverNames
@@ -837,6 +1034,7 @@ class VirtuosZugriff:
     
     # VIRTUOSREMOTEINTERFACE_API VRESULT rampDown2(V_INT32 i_noOfSolvers, V_CHAR8* i_solverNames[]);
     # !test
+    @_locked
     def rampDownV2(self, i_noOfSolvers, i_solverNames):
         self.i_noOfSolvers = i_noOfSolvers
         self.i_solverNames = i_solverNames
@@ -849,6 +1047,7 @@ class VirtuosZugriff:
     
     #  VIRTUOSREMOTEINTERFACE_API VRESULT reset2(V_INT32 i_noOfSolvers, V_CHAR8* i_solverNames[]);
     # !test
+    @_locked
     def rampUpV2(self, i_noOfSolvers, i_solverNames):
         self.i_noOfSolvers = i_noOfSolvers
         self.i_solverNames = i_solverNames
@@ -861,6 +1060,7 @@ class VirtuosZugriff:
     
     # VIRTUOSREMOTEINTERFACE_API VRESULT run2(V_INT32 i_noOfSolvers, V_CHAR8* i_solverNames[]);
     # !test
+    @_locked
     def runV2(self, i_noOfSolvers, i_solverNames):
         self.i_noOfSolvers = i_noOfSolvers
         self.i_solverNames = i_solverNames
@@ -873,6 +1073,7 @@ class VirtuosZugriff:
     
     # VIRTUOSREMOTEINTERFACE_API VRESULT stop2(V_INT32 i_noOfSolvers, V_CHAR8* i_solverNames[]);
     # !test
+    @_locked
     def stopV2(self, i_noOfSolvers, i_solverNames):
         self.i_noOfSolvers = i_noOfSolvers
         self.i_solverNames = i_solverNames
@@ -885,6 +1086,7 @@ class VirtuosZugriff:
     
     #  VIRTUOSREMOTEINTERFACE_API VRESULT step2(V_INT32 i_noOfSolvers, V_CHAR8* i_solverNames[]);
     # !test
+    @_locked
     def stepV2(self, i_noOfSolvers, i_solverNames):
         self.i_noOfSolvers = i_noOfSolvers
         self.i_solverNames = i_solverNames
@@ -895,6 +1097,7 @@ class VirtuosZugriff:
             self.status = VirtuosZugriff.V_DAMGD
             
     # Ein Schritt der Simulation
+    @_locked
     def simStep(self):
         if (self.vi.step() == VirtuosZugriff.V_SUCCD):
             self.status = VirtuosZugriff.V_SUCCD
@@ -903,8 +1106,65 @@ class VirtuosZugriff:
             print("Step Failed")
         return self.status
 
+    # n Simulationsschritte mit Abtastung von Ports alle everyK Schritte
+    def runSteps(self, n, ports, everyK=1, solverNames=None):
+        """
+        Steps the simulation n times and samples ports after every everyK-th step.
+
+        The ports are read through a port_io.PortSet into a preallocated NumPy block, so
+        the loop creates no Python objects per step. The lock is held for the whole run,
+        no cyclic update or other thread steps in between.
+
+        Args:
+            n (int): Number of steps.
+            ports (list | port_io.PortSet): Numeric port paths or a prepared PortSet.
+            everyK (int): Sample after every everyK-th step.
+            solverNames (list): Step only these solvers (step2), default all (step).
+
+        Returns:
+            tuple: (status, samples) with samples as float64 array [n // everyK, ports],
+            NaN for failed reads. On a failed step status is V_DAMGD and samples ends
+            with the last complete sample.
+        """
+        # Import hier, da port_io selbst remote importiert
+        import numpy as np
+        from .port_io import PortSet
+        if not isinstance(ports, PortSet):
+            key = tuple(ports)
+            portSet = self.stepPortSets.get(key)
+            if portSet is None:
+                portSet = self.stepPortSets[key] = PortSet(self, key)
+            ports = portSet
+        everyK = max(int(everyK), 1)
+        samples = np.empty((n // everyK, len(ports)), dtype=np.float64)
+        portStatus = np.empty(len(ports), dtype=np.int32)
+        if solverNames:
+            names = (c_char_p * len(solverNames))(*[name.encode("utf-8") for name in solverNames])
+            count = c_int32(len(solverNames))
+            step = lambda: self.vi.step2(count, names)
+        else:
+            step = self.vi.step
+        SUCCD = VirtuosZugriff.V_SUCCD
+
+        self.status = SUCCD
+        row = 0
+        with self.lock:
+            for i in range(1, n + 1):
+                stepStatus = step()
+                if stepStatus != SUCCD:
+                    self.checkInterfaceChange(stepStatus)
+                    print(f"[ERROR] Step {i} of {n} failed ({stepStatus})")
+                    self.status = VirtuosZugriff.V_DAMGD
+                    break
+                if i % everyK == 0:
+                    ports.read_into(samples[row], portStatus)
+                    row += 1
+        return self.status, samples[:row]
+
     # Reset der Simulation
+    @_locked
     def simReset(self):
+        self.invalidateValueIDs()
         if (self.vi.reset() == VirtuosZugriff.V_SUCCD):
             self.status = VirtuosZugriff.V_SUCCD
         else:
@@ -912,6 +1172,7 @@ class VirtuosZugriff:
         return self.status
 
     # Abfrage des Simulationszustands
+    @_locked
     def simStatus(self):
         groesse = (
             max(len("Suspended"), len("Ready"), len("Running")) + 1
@@ -931,6 +1192,7 @@ class VirtuosZugriff:
 
     ## Modell-Schnittstelle
     # Eigenschaft eines Projektbaustein aendern
+    @_locked
     def setPropertyBlock(self, pathBlock, propertyValue):
         # Es koennen nur Eigenschaften geaendert werden, die als property in einem Bustein vorhanden sind
         self.pathBlock = pathBlock
@@ -942,6 +1204,7 @@ class VirtuosZugriff:
         return self.status
 
     # Parameter eines Projektbausteins lesen
+    @_locked
     def getParameterBlock(self, parameterName, parameterValue):
         
         stringSize = (
@@ -958,14 +1221,19 @@ class VirtuosZugriff:
         return self.status
 
 
+    @_locked
     def getParameterBlock_New(self, parameterName):
-        buffer_size = 2048
-        value_buffer = create_string_buffer(buffer_size)
-        size_c_type = c_uint32(buffer_size)
-
-        dparameterName = self.stringToCharP(parameterName)
-
-        status = self.vi.getParameter(dparameterName, value_buffer, pointer(size_c_type))
+        # Puffer des Threads wiederverwenden, Namen nur einmal kodieren
+        value_buffer, size_c_type, size_pointer = self.parameterBuffer()
+        size_c_type.value = len(value_buffer)
+        dparameterName = encodeName(parameterName)
+
+        status = self.vi.getParameter(dparameterName, value_buffer, size_pointer)
+        if status != VirtuosZugriff.V_SUCCD and size_c_type.value > len(value_buffer):
+            # Puffer zu klein, die DLL meldet die benoetigte Groesse
+            value_buffer, size_c_type, size_pointer = self.parameterBuffer(size_c_type.value)
+            size_c_type.value = len(value_buffer)
+            status = self.vi.getParameter(dparameterName, value_buffer, size_pointer)
 
         if status == VirtuosZugriff.V_SUCCD:
             self.status = status
@@ -975,370 +1243,361 @@ class VirtuosZugriff:
             return None
 
 
-    
     # Parameter eines Projektbausteins aendern
+    @_locked
     def setParameterBlock(self, parameterName, parameterValue):
-        dparameterName = self.stringToCharP(parameterName)  # Parametername in hierachischer Punktnotation
-        dparameterValue = self.stringToCharP(parameterValue)  # Wert als String uebergeben
+        dparameterName = encodeName(parameterName)  # Parametername in hierachischer Punktnotation
+        dparameterValue = str(parameterValue).encode("utf-8")  # Wert als String uebergeben
         if (self.vi.setParameter(dparameterName, dparameterValue) == VirtuosZugriff.V_SUCCD):
             self.status = VirtuosZugriff.V_SUCCD
         else:
             self.status = VirtuosZugriff.V_DAMGD
         return self.status
 
+    ## Modellbaum
+    # Kindindex unterhalb von parentIndex (None = Wurzel)
+    @_locked
+    def modelIndex(self, row, column=0, parentIndex=None):
+        parentIndex = parentIndex if parentIndex is not None else ModelIndex()
+        childIndex = ModelIndex()
+        status = self.vi.index(row, column, pointer(parentIndex), pointer(childIndex))
+        return status, childIndex
+
+    # Anzahl der Kinder unterhalb von parentIndex (None = Wurzel)
+    @_locked
+    def modelRowCount(self, parentIndex=None):
+        parentIndex = parentIndex if parentIndex is not None else ModelIndex()
+        count = c_int32(0)
+        status = self.vi.rowCount(pointer(parentIndex), pointer(count))
+        return status, count.value
+
+    @_locked
+    def modelColumnCount(self, parentIndex=None):
+        parentIndex = parentIndex if parentIndex is not None else ModelIndex()
+        count = c_int32(0)
+        status = self.vi.columnCount(pointer(parentIndex), pointer(count))
+        return status, count.value
+
+    # Daten eines Eintrags als String, Puffer wird bei Bedarf vergroessert
+    @_locked
+    def modelData(self, index, role=MODEL_DISPLAY_ROLE, bufferLen=256):
+        dataBuffer = create_string_buffer(bufferLen)
+        size = c_uint32(bufferLen)
+        status = self.vi.getData(pointer(index), role, dataBuffer, pointer(size))
+        if status != VirtuosZugriff.V_SUCCD and size.value > bufferLen:
+            return self.modelData(index, role, size.value)
+        return status, dataBuffer.value.decode("utf-8")
+
+    @_locked
+    def modelParent(self, index):
+        parentIndex = ModelIndex()
+        status = self.vi.parent(pointer(index), pointer(parentIndex))
+        return status, parentIndex
+
+    # Namen aller Kinder eines Eintrags, Rueckgabe: status und [(Name, ModelIndex)]
+    def modelChildren(self, parentIndex=None):
+        status, rows = self.modelRowCount(parentIndex)
+        if status != VirtuosZugriff.V_SUCCD:
+            return status, []
+        children = []
+        for row in range(rows):
+            status, childIndex = self.modelIndex(row, 0, parentIndex)
+            if status != VirtuosZugriff.V_SUCCD:
+                continue
+            status, name = self.modelData(childIndex)
+            if status == VirtuosZugriff.V_SUCCD:
+                children.append((name, childIndex))
+        return VirtuosZugriff.V_SUCCD, children
+
+    # Eintrag zu einem hierarchischen Namen suchen, z.B. "[Block Diagram].[RobotController]"
+    def findModelIndex(self, hierarchicalName):
+        # Namen koennen selbst Klammern enthalten (z.B. "MIL[1]_SIL[2]_HIL[3]"), daher Trennung an "].["
+        names = hierarchicalName.strip()[1:-1].split("].[")
+        with self.lock:
+            index = None
+            for name in names:
+                status, children = self.modelChildren(index)
+                match = [childIndex for childName, childIndex in children if childName == name]
+                if status != VirtuosZugriff.V_SUCCD or not match:
+                    return VirtuosZugriff.V_DAMGD, None
+                index = match[0]
+        return VirtuosZugriff.V_SUCCD, index
+
+    # Alle Eintraege unterhalb eines Bausteins in einem Durchlauf, verschachtelte Namen mit "." verbunden
+    def listModelChildren(self, hierarchicalName, maxDepth=2):
+        """
+        Lists the entries below a block from the model tree.
+
+        Args:
+            hierarchicalName (str): Block path, e.g. "[Block Diagram].[RobotController]".
+            maxDepth (int): Depth of the traversal, nested entries are joined with "."
+                (e.g. "Axis_1" -> "s_max" becomes "Axis_1.s_max").
+
+        Returns:
+            tuple: (status, list of local names). Only leaf entries are listed.
+        """
+        with self.lock:
+            status, blockIndex = self.findModelIndex(hierarchicalName)
+            if status != VirtuosZugriff.V_SUCCD:
+                return status, []
+            names = []
+            pending = [("", blockIndex, 0)]
+            while pending:
+                prefix, index, depth = pending.pop()
+                status, children = self.modelChildren(index)
+                for name, childIndex in children:
+                    localName = prefix + name
+                    status, rows = self.modelRowCount(childIndex)
+                    if status == VirtuosZugriff.V_SUCCD and rows > 0 and depth + 1 < maxDepth:
+                        pending.append((localName + ".", childIndex, depth + 1))
+                    else:
+                        names.append(localName)
+        return VirtuosZugriff.V_SUCCD, names
+
     ## Kommunikations-Schnittstelle
-    # ValueID der Parameter, Rueckgabe: status und ValueID
-    def readValueID(self, parameterPfad, dataType=None):
-        # evtl. Umwandlung in Liste
-        if not isinstance(parameterPfad, list) and not isinstance(parameterPfad, tuple):
+    # Bestimmte ValueIDs verwerfen (Ramp up/down, Reset, Projektwechsel)
+    def invalidateValueIDs(self):
+        with self.lock:
+            if self.valueIDCache:
+                print(f"[INFO] Virtuos interface changed, {len(self.valueIDCache)} cached ValueIDs dropped.")
+            self.valueIDCache.clear()
+            self.forcedValueIDs.clear()  # Force-Zustand der alten ValueIDs ist nicht mehr bekannt
+            self.valueIDGeneration += 1
+
+    # Statuscode auf Schnittstellenaenderung pruefen, Rueckgabe: True, wenn die ValueIDs verworfen wurden
+    def checkInterfaceChange(self, status):
+        if status in VirtuosZugriff.V_CORBA_INTERFACE_CHANGED:
+            self.invalidateValueIDs()
+            return True
+        return False
+
+    # ValueIDs vieler Ports bestimmen, jeder Port wird nur einmal bei der DLL angefragt
+    def resolveValueIDs(self, parameterPfad, dataType=None):
+        """
+        Resolves hierarchical port paths to ValueIDs through the ValueID cache.
+
+        Args:
+            parameterPfad (str | list): Port path(s), e.g. "[Block Diagram].[Robot].[Axis_1_Pos]".
+            dataType (VIODataType | int | list): Data type per port, default REAL64.
+
+        Returns:
+            tuple: (status, ValueID array, per-port status list). status is V_SUCCD
+            only if every port was resolved.
+        """
+        if not isinstance(parameterPfad, (list, tuple)):
             parameterPfad = [parameterPfad]
-        # Umwandlung des Parameterpfads in Ctypes
-        dparameterPfad = (c_char_p * len(parameterPfad))()
-        for i in range(0, len(dparameterPfad)):
-            dparameterPfad[i] = self.strToByte(parameterPfad[i])
-        self.parameterValueID = (ValueID * len(dparameterPfad))()
         # Default datentyp ist REAL64
         if dataType is None:
-            ddataType = [VIODataType.V_IO_TYPE_REAL64.value] * len(dparameterPfad)
+            ddataType = [VIODataType.V_IO_TYPE_REAL64.value] * len(parameterPfad)
         elif isinstance(dataType, (list, tuple)):
             ddataType = [dt.value if isinstance(dt, VIODataType) else dt for dt in dataType]
         else:
-            ddataType = [dataType.value if isinstance(dataType, VIODataType) else dataType] * len(dparameterPfad)
-        self.status = -1
-        # Iteration ueber alle Parameter
-        for ipara in range(0, len(dparameterPfad)):
-            # Es werden alle ValueIDs mit lesendem Zugriff bestimmt: ACCESS_READ
-            # Dies funktioniert auch bei verbundenen Ports.
-            # Die ValueIDs koennen trotzdem zum Schreiben benutzt werden.
-            if (self.vi.getValueID(dparameterPfad[ipara], ddataType[ipara], VIOAccessType.V_IO_ACCESS_READ.value,
-                                   pointer(self.parameterValueID[ipara])) == VirtuosZugriff.V_SUCCD):
-                nr = ipara + 1
-                self.status = VirtuosZugriff.V_SUCCD
+            ddataType = [dataType.value if isinstance(dataType, VIODataType) else dataType] * len(parameterPfad)
+
+        valueIDs = (ValueID * len(parameterPfad))()
+        portStatus = [VirtuosZugriff.V_SUCCD] * len(parameterPfad)
+        with self.lock:
+            # enumerate() ist hier durch "from threading import *" ueberdeckt
+            for i in range(len(parameterPfad)):
+                pfad, dt = parameterPfad[i], ddataType[i]
+                cached = self.valueIDCache.get((pfad, dt))
+                if cached is not None:
+                    valueIDs[i] = cached
+                    continue
+                # Es werden alle ValueIDs mit lesendem Zugriff bestimmt: ACCESS_READ
+                # Dies funktioniert auch bei verbundenen Ports.
+                # Die ValueIDs koennen trotzdem zum Schreiben benutzt werden.
+                status = self.vi.getValueID(encodeName(pfad), dt, VIOAccessType.V_IO_ACCESS_READ.value,
+                                            pointer(valueIDs[i]))
+                if status == VirtuosZugriff.V_SUCCD:
+                    self.valueIDCache[(pfad, dt)] = ValueID.from_buffer_copy(valueIDs[i])
+                else:
+                    self.checkInterfaceChange(status)
+                    portStatus[i] = VirtuosZugriff.V_DAMGD
+                    print(f"[ERROR] Getting ValueID for {pfad} failed (status {status})")
+        if VirtuosZugriff.V_DAMGD in portStatus:
+            self.status = VirtuosZugriff.V_DAMGD
+        else:
+            self.status = VirtuosZugriff.V_SUCCD
+        return self.status, valueIDs, portStatus
+
+    # ValueID der Parameter, Rueckgabe: status und ValueID
+    def readValueID(self, parameterPfad, dataType=None):
+        self.status, self.parameterValueID, _ = self.resolveValueIDs(parameterPfad, dataType)
+        # Die ValueID wird als Structure zurueck gegeben
+        return self.status, self.parameterValueID
 
-                print('Getting Value ID for variable ' + str(dparameterPfad[ipara]) + 'succeeded');
-                print(self.parameterValueID[ipara])
+    # ValueID, Liste oder ctypes-Array einheitlich als Sequenz
+    @staticmethod
+    def valueIDList(parameterValueID):
+        if isinstance(parameterValueID, ValueID):
+            return [parameterValueID]
+        return parameterValueID
+
+    # Datentypen je Port als VIODataType, Default ist REAL64
+    @staticmethod
+    def dataTypeList(dataType, count):
+        if dataType is None:
+            return [VIODataType.V_IO_TYPE_REAL64] * count
+        if isinstance(dataType, (list, tuple)):
+            return [dt if isinstance(dt, VIODataType) else VIODataType(dt) for dt in dataType]
+        dt = dataType if isinstance(dataType, VIODataType) else VIODataType(dataType)
+        return [dt] * count
+
+    # String-Port lesen, Puffer wird bei Bedarf vergroessert
+    @_locked
+    def readStringPort(self, valueID, bufferLen=256):
+        stringBuffer = create_string_buffer(bufferLen)
+        size = c_uint32(bufferLen)
+        status = self.vi.readStringValue(valueID, stringBuffer, pointer(size))
+        if status != VirtuosZugriff.V_SUCCD and size.value > bufferLen:
+            return self.readStringPort(valueID, size.value)
+        return status, stringBuffer.value.decode("utf-8")
+
+    # Gepufferten Modus (FIFO der CurrentSets) ein-/ausschalten
+    def setBufferedMode(self, buffered=True, maxFiFoSize=10000):
+        with self.lock:
+            if (self.vi.setBuffered(bool(buffered), maxFiFoSize) == VirtuosZugriff.V_SUCCD):
+                self.status = VirtuosZugriff.V_SUCCD
             else:
                 self.status = VirtuosZugriff.V_DAMGD
-                print('Getting Value ID for variable ' + str(dparameterPfad[ipara]) + 'failed');
-                print(self.parameterValueID[ipara])
-                # Die ValueID wird als Structure zurueck gegeben
-        return self.status, self.parameterValueID
+        return self.status
+
+    # Port als String lesen, nur mit Aenderungskennung, Rueckgabe: status, Wert und geaendert
+    def readChangedValue(self, valueID, bufferLen=256):
+        stringBuffer = create_string_buffer(bufferLen)
+        size = c_uint32(bufferLen)
+        changed = c_bool(False)
+        with self.lock:
+            status = self.vi.readChangedStringValue(valueID, stringBuffer, pointer(size), pointer(changed))
+            self.checkInterfaceChange(status)
+        if status != VirtuosZugriff.V_SUCCD and size.value > bufferLen:
+            return self.readChangedValue(valueID, size.value)
+        return status, stringBuffer.value.decode("utf-8"), changed.value
 
     # Parameter lesen, Rueckgabe: status und Parameterwert
     def readValue(self, parameterValueID, dataType=None):
+        """
+        Reads the values of one or more ports.
+
+        Args:
+            parameterValueID (ValueID | list | Array): ValueID(s) from readValueID.
+            dataType (VIODataType | list): Data type per port, default REAL64.
+
+        Returns:
+            tuple: (status, values). status is V_DAMGD if any port failed, the value of a
+            failed port is None. For many ports per cycle use port_io.PortSet.
+        """
         with self.lock:
-            # Kopie, wenn ein mutuable vorliegt
-            try:
-                dparameterValueID = parameterValueID.copy()
-            except AttributeError:
-                dparameterValueID = parameterValueID
-            # Umwandlung in Liste, wenn noch nicht vorhanden
-            try:
-                a = dparameterValueID[0]
-            except TypeError:
-                dparameterValueID = (ValueID * 1)()
-                dparameterValueID[0] = parameterValueID.copy()
-            except:
-                pass
+            dparameterValueID = self.valueIDList(parameterValueID)
+            ddataType = self.dataTypeList(dataType, len(dparameterValueID))
             leseparameter = [None] * len(dparameterValueID)
-            # Default Datentyp ist REAL64
-            if dataType is None:
-                ddataType = [VIODataType.V_IO_TYPE_REAL64] * len(dparameterValueID)
-            elif isinstance(dataType, (list, tuple)):
-                ddataType = dataType.copy()
-            else:
-                ddataType = [dataType] * len(dparameterValueID)
-
-            nr = 0
-            ivalueID = -1
-            # Schleife ueber alle ValueIDs
-            for valueID in dparameterValueID:
-                ivalueID += 1
-                nr += 1
-                try:
-                    # Lesen der unterschiedlichen Datentypen
-                    if (ddataType[ivalueID] == VIODataType.V_IO_TYPE_REAL64):
-                        dleseparametera = c_double(0)
-                        if (self.vi.readReal64Value(dparameterValueID[ivalueID], pointer(dleseparametera)) ==
-                                VirtuosZugriff.V_SUCCD):
-                            leseparameter[ivalueID] = dleseparametera
-                            self.status = VirtuosZugriff.V_SUCCD
-                        else:
-                            self.status = VirtuosZugriff.V_DAMGD
-                    elif (ddataType[ivalueID] == VIODataType.V_IO_TYPE_BOOLEAN):
-                        dleseparametera = c_bool(0)
-                        if (self.vi.readBooleanValue(dparameterValueID[ivalueID], pointer(dleseparametera)) ==
-                                VirtuosZugriff.V_SUCCD):
-                            leseparameter[ivalueID] = dleseparametera
-                            self.status = VirtuosZugriff.V_SUCCD
-                        else:
-                            self.status = VirtuosZugriff.V_DAMGD
-                    elif (ddataType[ivalueID] == VIODataType.V_IO_TYPE_REAL32):
-                        dleseparametera = c_double(0)
-                        if (self.vi.readReal32Value(dparameterValueID[ivalueID], pointer(dleseparametera)) ==
-                                VirtuosZugriff.V_SUCCD):
-                            leseparameter[ivalueID] = dleseparametera
-                            self.status = VirtuosZugriff.V_SUCCD
-                        else:
-                            self.status = VirtuosZugriff.V_DAMGD
-                    elif (ddataType[ivalueID] == VIODataType.V_IO_TYPE_UINT8):
-                        dleseparametera = c_uint(0)
-                        if (self.vi.readUInt8Value(dparameterValueID[ivalueID], pointer(dleseparametera)) ==
-                                VirtuosZugriff.V_SUCCD):
-                            leseparameter[ivalueID] = dleseparametera
-                            self.status = VirtuosZugriff.V_SUCCD
-                        else:
-                            self.status = VirtuosZugriff.V_DAMGD
-                    elif (ddataType[ivalueID] == VIODataType.V_IO_TYPE_INT8):
-                        dleseparametera = c_int(0)
-                        if (self.vi.readInt8Value(dparameterValueID[ivalueID],
-                                                  pointer(dleseparametera)) == VirtuosZugriff.V_SUCCD):
-                            leseparameter[ivalueID] = dleseparametera
-                            self.status = VirtuosZugriff.V_SUCCD
-                        else:
-                            self.status = VirtuosZugriff.V_DAMGD
-                    elif (ddataType[ivalueID] == VIODataType.V_IO_TYPE_UINT16):
-                        dleseparametera = c_uint(0)
-                        if (self.vi.readUInt16Value(dparameterValueID[ivalueID], pointer(dleseparametera)) ==
-                                VirtuosZugriff.V_SUCCD):
-                            leseparameter[ivalueID] = dleseparametera
-                            self.status = VirtuosZugriff.V_SUCCD
-                        else:
-                            self.status = VirtuosZugriff.V_DAMGD
-                    elif (ddataType[ivalueID] == VIODataType.V_IO_TYPE_INT16):
-                        dleseparametera = c_int(0)
-                        if (self.vi.readInt16Value(dparameterValueID[ivalueID], pointer(dleseparametera)) ==
-                                VirtuosZugriff.V_SUCCD):
-                            leseparameter[ivalueID] = dleseparametera
-                            self.status = VirtuosZugriff.V_SUCCD
-                        else:
-                            self.status = VirtuosZugriff.V_DAMGD
-                    elif (ddataType[ivalueID] == VIODataType.V_IO_TYPE_UINT32):
-                        dleseparametera = c_uint(0)
-                        if (self.vi.readUInt32Value(dparameterValueID[ivalueID], pointer(dleseparametera)) ==
-                                VirtuosZugriff.V_SUCCD):
-                            leseparameter[ivalueID] = dleseparametera
-                            self.status = VirtuosZugriff.V_SUCCD
-                        else:
-                            self.status = VirtuosZugriff.V_DAMGD
-                    elif (ddataType[ivalueID] == VIODataType.V_IO_TYPE_INT32):
-                        dleseparametera = c_int(0)
-                        if (self.vi.readInt32Value(dparameterValueID[ivalueID], pointer(dleseparametera)) ==
-                                VirtuosZugriff.V_SUCCD):
-                            leseparameter[ivalueID] = dleseparametera
-                            self.status = VirtuosZugriff.V_SUCCD
-                        else:
-                            self.status = VirtuosZugriff.V_DAMGD
-                    elif (ddataType[ivalueID] == VIODataType.V_IO_TYPE_UINT64):
-                        dleseparametera = c_uint(0)
-                        if (self.vi.readUInt64Value(dparameterValueID[ivalueID], pointer(dleseparametera)) ==
-                                VirtuosZugriff.V_SUCCD):
-                            leseparameter[ivalueID] = dleseparametera
-                            self.status = VirtuosZugriff.V_SUCCD
-                        else:
-                            self.status = VirtuosZugriff.V_DAMGD
-                    elif (ddataType[ivalueID] == VIODataType.V_IO_TYPE_INT64):
-                        dleseparametera = c_int(0)
-                        if (self.vi.readInt64Value(dparameterValueID[ivalueID], pointer(dleseparametera)) ==
-                                VirtuosZugriff.V_SUCCD):
-                            leseparameter[ivalueID] = dleseparametera
-                            self.status = VirtuosZugriff.V_SUCCD
-                        else:
-                            self.status = VirtuosZugriff.V_DAMGD
-                    elif (ddataType[ivalueID] == VIODataType.V_IO_TYPE_STRING):
-                        dleseparametera = c_char(0)
-                        self.maxBufferLen = (c_uint * len(dparameterValueID))(100)
-                        dmaxBufferLena = c_uint(0)
-                        if (self.vi.readStringValue(dparameterValueID[ivalueID], pointer(dleseparametera),
-                                                    pointer(dmaxBufferLena)) == VirtuosZugriff.V_SUCCD):
-                            leseparameter[ivalueID] = dleseparametera
-                            self.maxBufferLen[ivalueID] = dmaxBufferLena
-                            self.status = VirtuosZugriff.V_SUCCD
-                        else:
-                            self.status = VirtuosZugriff.V_DAMGD
-
-                    else:
-                        self.status = VirtuosZugriff.V_DAMGD
-
-                except Exception as e:
-                    print(e)
-                    raise Exception(
-                        "Error in function readValue() attempting to vi.Read_*_Value"
-                    )
-                    pass
-        # Umwandlung der ctypes
-        for jleseparameter in range(len(leseparameter)):
-            if leseparameter[jleseparameter] is not None:
-                try:
-                    leseparameter[jleseparameter] = leseparameter[jleseparameter].value
-                except AttributeError:
-                    # 对于不是 ctypes 类型的值（可能是已转好的），跳过
-                    pass
-            else:
-                # Wenn der Parameter nicht gelesen werden konnte, wird None zurueckgegeben  
-                 leseparameter[jleseparameter] = None
+            self.status = VirtuosZugriff.V_SUCCD
+            for i in range(len(dparameterValueID)):
+                # Lesen ueber die Dispatch-Tabelle statt einer if/elif-Kette je Datentyp
+                if ddataType[i] == VIODataType.V_IO_TYPE_STRING:
+                    readStatus, value = self.readStringPort(dparameterValueID[i])
+                elif ddataType[i] in VALUE_ACCESS:
+                    readName, _, ctype = VALUE_ACCESS[ddataType[i]]
+                    dleseparameter = ctype()
+                    readStatus = getattr(self.vi, readName)(dparameterValueID[i], pointer(dleseparameter))
+                    value = dleseparameter.value
+                else:
+                    readStatus = VirtuosZugriff.V_DAMGD
+                self.checkInterfaceChange(readStatus)
+                if readStatus == VirtuosZugriff.V_SUCCD:
+                    leseparameter[i] = value
+                else:
+                    # Wenn der Parameter nicht gelesen werden konnte, wird None zurueckgegeben
+                    self.status = VirtuosZugriff.V_DAMGD
         return self.status, leseparameter
 
     # Parameter schreiben
     def writeValue(self, parameterValueID, schreibparameter, dataType=None):
-        # Kopie, wenn ein mutuable vorliegt
-        try:
-            lparameterValueID = parameterValueID.copy()
-        except AttributeError:
-            lparameterValueID = parameterValueID
-        # Umwandlung in Liste, wenn noch nicht vorhanden
-        try:
-            a = lparameterValueID[0]
-        except TypeError:
-            lparameterValueID = (ValueID * 1)()
-            lparameterValueID[0] = parameterValueID.copy()
-        except:
-            pass
-        # Ports forcen, bevor sie beschrieben werden
-        self.status = self.forcePorts(lparameterValueID)
-        # Schreibparameter in Liste umwandeln
-        if not isinstance(schreibparameter, list):
-            self.schreibparameter = [schreibparameter]
-        else:
-            self.schreibparameter = schreibparameter[:]
-        # Default Datentyp ist REAL64
-        if dataType is None:
-            ddataType = [VIODataType.V_IO_TYPE_REAL64] * len(self.parameterValueID)
-        else:
-            ddataType = dataType.copy()
-        # Iteration ueber alle zu schreibenden Parameter
-        for i in range(0, len(self.schreibparameter)):
-            nr = i + 1
-            # Unterscheidung der Datentypen
-            if (ddataType[i] == VIODataType.V_IO_TYPE_REAL64):
-                if (self.vi.writeReal64Value(lparameterValueID[i], c_double(self.schreibparameter[i]),
-                                             ForceType.V_WRITE_FORCED.value) == VirtuosZugriff.V_SUCCD):
-                    self.status = VirtuosZugriff.V_SUCCD
-                else:
-                    self.status = VirtuosZugriff.V_DAMGD
-            elif (ddataType[i] == VIODataType.V_IO_TYPE_BOOLEAN):
-                if (self.vi.writeBooleanValue(lparameterValueID[i], c_bool(self.schreibparameter[i]),
-                                              ForceType.V_WRITE_FORCED.value) == VirtuosZugriff.V_SUCCD):
-                    self.status = VirtuosZugriff.V_SUCCD
-                else:
-                    self.status = VirtuosZugriff.V_DAMGD
-            elif (ddataType[i] == VIODataType.V_IO_TYPE_REAL32):
-                if (self.vi.writeReal32Value(lparameterValueID[i], c_double(self.schreibparameter[i]),
-                                             ForceType.V_WRITE_FORCED.value) == VirtuosZugriff.V_SUCCD):
-                    self.status = VirtuosZugriff.V_SUCCD
-                else:
-                    self.status = VirtuosZugriff.V_DAMGD
-            elif (ddataType[i] == VIODataType.V_IO_TYPE_UINT8):
-                if (self.vi.writeUInt8Value(lparameterValueID[i], c_uint(self.schreibparameter[i]),
-                                            ForceType.V_WRITE_FORCED.value) == VirtuosZugriff.V_SUCCD):
-                    self.status = VirtuosZugriff.V_SUCCD
-                else:
-                    self.status = VirtuosZugriff.V_DAMGD
-            elif (ddataType[i] == VIODataType.V_IO_TYPE_UINT16):
-                if (self.vi.writeUInt16Value(lparameterValueID[i], c_uint(self.schreibparameter[i]),
-                                             ForceType.V_WRITE_FORCED.value) == VirtuosZugriff.V_SUCCD):
-                    self.status = VirtuosZugriff.V_SUCCD
-                else:
-                    self.status = VirtuosZugriff.V_DAMGD
-            elif (ddataType[i] == VIODataType.V_IO_TYPE_UINT32):
-                if (self.vi.writeUInt32Value(lparameterValueID[i], c_uint(self.schreibparameter[i]),
-                                             ForceType.V_WRITE_FORCED.value) == VirtuosZugriff.V_SUCCD):
-                    self.status = VirtuosZugriff.V_SUCCD
-                else:
-                    self.status = VirtuosZugriff.V_DAMGD
-            elif (ddataType[i] == VIODataType.V_IO_TYPE_UINT64):
-                if (self.vi.writeUInt64Value(lparameterValueID[i], c_uint(self.schreibparameter[i]),
-                                             ForceType.V_WRITE_FORCED.value) == VirtuosZugriff.V_SUCCD):
-                    self.status = VirtuosZugriff.V_SUCCD
-                else:
-                    self.status = VirtuosZugriff.V_DAMGD
-            elif (ddataType[i] == VIODataType.V_IO_TYPE_INT8):
-                if (self.vi.writeInt8Value(lparameterValueID[i], c_int(self.schreibparameter[i]),
-                                           ForceType.V_WRITE_FORCED.value) == VirtuosZugriff.V_SUCCD):
-                    self.status = VirtuosZugriff.V_SUCCD
-                else:
-                    self.status = VirtuosZugriff.V_DAMGD
-            elif (ddataType[i] == VIODataType.V_IO_TYPE_INT16):
-                if (self.vi.writeInt16Value(lparameterValueID[i], c_int(self.schreibparameter[i]),
-                                            ForceType.V_WRITE_FORCED.value) == VirtuosZugriff.V_SUCCD):
-                    self.status = VirtuosZugriff.V_SUCCD
-                else:
-                    self.status = VirtuosZugriff.V_DAMGD
-            elif (ddataType[i] == VIODataType.V_IO_TYPE_INT32):
-                if (self.vi.writeInt32Value(lparameterValueID[i], c_int(self.schreibparameter[i]),
-                                            ForceType.V_WRITE_FORCED.value) == VirtuosZugriff.V_SUCCD):
-                    self.status = VirtuosZugriff.V_SUCCD
-                else:
-                    self.status = VirtuosZugriff.V_DAMGD
-            elif (ddataType[i] == VIODataType.V_IO_TYPE_INT64):
-                if (self.vi.writeInt64Value(lparameterValueID[i], c_int(self.schreibparameter[i]),
-                                            ForceType.V_WRITE_FORCED.value) == VirtuosZugriff.V_SUCCD):
-                    self.status = VirtuosZugriff.V_SUCCD
-                else:
-                    self.status = VirtuosZugriff.V_DAMGD
-            elif (ddataType[i] == VIODataType.V_IO_TYPE_STRING):
-                if (self.vi.writeStringValue(lparameterValueID[i], c_char_p(self.schreibparameter[i]),
-                                             ForceType.V_WRITE_FORCED.value) == VirtuosZugriff.V_SUCCD):
-                    self.status = VirtuosZugriff.V_SUCCD
-                else:
-                    self.status = VirtuosZugriff.V_DAMGD
+        """
+        Forces and writes the values of one or more ports. Ports already forced since the
+        last unforcePorts or interface change are not forced again (see forcedValueIDs).
+
+        Returns:
+            int: V_SUCCD if every port was written, otherwise V_DAMGD.
+        """
+        with self.lock:
+            lparameterValueID = self.valueIDList(parameterValueID)
+            # Schreibparameter in Liste umwandeln
+            if not isinstance(schreibparameter, (list, tuple)):
+                self.schreibparameter = [schreibparameter]
             else:
-                self.status = VirtuosZugriff.V_DAMGD
+                self.schreibparameter = list(schreibparameter)
+            ddataType = self.dataTypeList(dataType, len(self.schreibparameter))
+            # Ports forcen, bevor sie beschrieben werden
+            self.status = self.forcePorts(lparameterValueID)
+            writeFailed = self.status != VirtuosZugriff.V_SUCCD
+            forced = ForceType.V_WRITE_FORCED.value
+            for i in range(len(self.schreibparameter)):
+                if ddataType[i] == VIODataType.V_IO_TYPE_STRING:
+                    writeStatus = self.vi.writeStringValue(lparameterValueID[i],
+                                                           str(self.schreibparameter[i]).encode("utf-8"), forced)
+                elif ddataType[i] in VALUE_ACCESS:
+                    _, writeName, ctype = VALUE_ACCESS[ddataType[i]]
+                    writeStatus = getattr(self.vi, writeName)(lparameterValueID[i],
+                                                              ctype(self.schreibparameter[i]), forced)
+                else:
+                    writeStatus = VirtuosZugriff.V_DAMGD
+                self.checkInterfaceChange(writeStatus)
+                if writeStatus != VirtuosZugriff.V_SUCCD:
+                    writeFailed = True
+                    # beim naechsten Schreiben erneut forcen
+                    self.forcedValueIDs.discard(self.valueIDKey(lparameterValueID[i]))
+            self.status = VirtuosZugriff.V_DAMGD if writeFailed else VirtuosZugriff.V_SUCCD
         return self.status
 
+    @staticmethod
+    def valueIDKey(valueID):
+        return (valueID.valueID, valueID.interfaceID, valueID.interfaceID2)
+
     # Force Ports
     def forcePorts(self, parameterValueID):
-        # Ueberpruefen, ob Array oder List uebergeben ist; ansonsten umwandeln
-        # Kopie, falls ein mutuable vorliegt
-        try:
-            a = parameterValueID[0]
-            if isinstance(parameterValueID, tuple):
-                dparameterValueID = parameterValueID
-            else:
-                dparameterValueID = parameterValueID.copy()
-        except TypeError:
-            dparameterValueID = (ValueID * 1)()
-            if isinstance(parameterValueID, tuple):
-                dparameterValueID[0] = parameterValueID
-            else:
-                dparameterValueID[0] = parameterValueID.copy()
-        except Exception as e:
-            print(e)
-            raise Exception("Error at function call forcePorts()")
-            pass
-        # Iteration ueber alle Parameter
-        for i in range(0, len(dparameterValueID)):
-            nr = i + 1
-            if (self.vi.setForced(dparameterValueID[i], ForceType.V_FORCE.value) == VirtuosZugriff.V_SUCCD):
-                self.status = VirtuosZugriff.V_SUCCD
-            else:
-                self.status = VirtuosZugriff.V_DAMGD
+        # ValueID, Liste oder ctypes-Array
+        dparameterValueID = self.valueIDList(parameterValueID)
+        self.status = VirtuosZugriff.V_SUCCD
+        with self.lock:
+            # Iteration ueber alle Parameter, bereits geforcte Ports werden uebersprungen
+            for i in range(0, len(dparameterValueID)):
+                key = self.valueIDKey(dparameterValueID[i])
+                if key in self.forcedValueIDs:
+                    continue
+                forceStatus = self.vi.setForced(dparameterValueID[i], ForceType.V_FORCE.value)
+                if forceStatus == VirtuosZugriff.V_SUCCD:
+                    self.forcedValueIDs.add(key)
+                else:
+                    self.checkInterfaceChange(forceStatus)
+                    self.status = VirtuosZugriff.V_DAMGD
         return self.status
 
     # Unforce aller Ports
     def unforcePorts(self):
-        if (self.vi.unforceAll() == VirtuosZugriff.V_SUCCD):
-            self.status = VirtuosZugriff.V_SUCCD
-        else:
-            self.status = VirtuosZugriff.V_DAMGD
+        with self.lock:
+            self.forcedValueIDs.clear()
+            if (self.vi.unforceAll() == VirtuosZugriff.V_SUCCD):
+                self.status = VirtuosZugriff.V_SUCCD
+            else:
+                self.status = VirtuosZugriff.V_DAMGD
         return self.status
 
     ## Update
     # Starten des zyklischen Updates, update rate in ms
     def startUpdate(self, updateRate=10):
-        # vorhandene Anzahl an Datensets
-        self.remainingSets = c_int32(0)
-        self.bufferFillState = c_long(0)
-        if (self.vi.startCyclicUpdate(updateRate) == VirtuosZugriff.V_SUCCD):
-            self.continueUpdate = 1  # Endkriterium fuer das Update des CurrentSet
-            time.sleep(0.03)  # wichtig: Pause vor dem ersten Update des CurrentSet ist notwendig
-            self.vi.updateCurrentSet(pointer(self.remainingSets), pointer(self.bufferFillState))
-            # Thread fuer das kontinuierliche Update des CurrentSet im Hintergrund
-            t = Thread(target=self.startUpdateCurrentSet, args=(updateRate,))
-            t.start()  # Start des Threads
-        else:
-            self.continueUpdate = 0
+        # Update des CurrentSet im Hintergrund ueber den CyclicUpdater, der denselben Lock wie
+        # readValue/writeValue nutzt. Import hier, da cyclic_update selbst remote importiert.
+        from .cyclic_update import CyclicUpdater
+        if self.updater is None:
+            self.updater = CyclicUpdater(self, updateRate)
+        elif not self.updater.running:
+            self.updater.update_rate_ms = updateRate  # registrierte Ports und Puffer bleiben erhalten
+        self.status = self.updater.start()
+        return self.status
 
+    @_locked
     def startCyclicUpdate(self, updateRate=10):
         self.remainingSets = c_int32(0)
         self.bufferFillState = c_long(0)
@@ -1351,6 +1610,7 @@ class VirtuosZugriff:
 
     # Starten des zyklischen Updates ohne CurrentSet, update rate in ms
     # CurrentSet muss getrennt gestartet werden
+    @_locked
     def startZyklUpdate(self, updateRate=10):
         # vorhandene Anzahl an Datensets
         self.remainingSets = c_int32(0)
@@ -1366,8 +1626,10 @@ class VirtuosZugriff:
     def startUpdateCurrentSet(self, updateRate):
         while (self.continueUpdate == 1):
 
-            # todo: Zugriff mit mutex gegen read/write funktionen verriegeln
-            self.status = self.vi.updateCurrentSet(pointer(self.remainingSets), pointer(self.bufferFillState))
+            # Zugriff mit Lock gegen read/write Funktionen verriegelt
+            with self.lock:
+                self.status = self.vi.updateCurrentSet(pointer(self.remainingSets), pointer(self.bufferFillState))
+                self.checkInterfaceChange(self.status)
 
 
             # Update des CurrentSet in aehnlicher Haeufigkeit wie zyklisches Update
@@ -1377,12 +1639,12 @@ class VirtuosZugriff:
 
     def singleUpdateCurrentSet(self, sleep_time):
         i = 1
-        while (
-            self.vi.updateCurrentSet(
-                pointer(self.remainingSets), pointer(self.bufferFillState)
-            )
-            != VirtuosZugriff.V_SUCCD
-        ):
+        while True:
+            with self.lock:
+                updateStatus = self.vi.updateCurrentSet(pointer(self.remainingSets), pointer(self.bufferFillState))
+                self.checkInterfaceChange(updateStatus)
+            if updateStatus == VirtuosZugriff.V_SUCCD:
+                break
             i = i + 1
             time.sleep(sleep_time)
             if i >= 1000:
@@ -1393,12 +1655,18 @@ class VirtuosZugriff:
 
     # Stop des zyklischen Updates
     def stopUpdate(self):
-        self.status = self.vi.stopCyclicUpdate()
+        if self.updater is not None:
+            # wartet auf das Ende des Update-Threads
+            self.status = self.updater.stop()
+        else:
+            with self.lock:
+                self.status = self.vi.stopCyclicUpdate()
         # Endsignal fuer Update des CurrentSet
         self.continueUpdate = 0
         return self.status, self.continueUpdate
     
     #export IO ProtsByName
+    @_locked
     def exportIO(self,SubmodelBlock,pathToSave):
         self.SubmodelBlock = SubmodelBlock
         self.pathToSave = pathToSave
@@ -1410,6 +1678,7 @@ class VirtuosZugriff:
     
     #export IO Connection
     
+    @_locked
     def exportConnectionIO(self,pathToSave):
         self.pathToSave = pathToSave    
         noOfSubmodels = 1
@@ -1433,13 +1702,6 @@ VRESULT getClientID(char* o_clientID, V_UINT32 *io_size);
 VRESULT saveProject();
 VRESULT setSolverType(const char *i_solverType);
 VRESULT getProjectName(char* o_loadedFileName, V_UINT32 *io_size);
-VRESULT readChangedStringValue(const ValueID i_id, char *o_value, V_UINT32 *io_size, V_BOOLEAN *o_changed);
-VRESULT setBuffered(V_BOOLEAN i_buffered, V_INT32 i_maxFiFoSize = 10000);
-VRESULT index(V_INT32 i_row, V_INT32 i_column, ModelIndex *i_parentIndex, ModelIndex *o_childIndex);
-VRESULT rowCount(ModelIndex *i_parentIndex, V_INT32 *o_count);
-VRESULT columnCount(ModelIndex *i_parentIndex, V_INT32 *o_count);
-VRESULT getData(ModelIndex *i_index, V_INT32 i_role, char* o_data, V_UINT32 *io_size);
-VRESULT parent(ModelIndex *i_index, ModelIndex *o_parentIndex)
 exportVirtualIOPortsByName(const V_CHAR8* i_hierarchicalModelName, const V_CHAR8* i_filePath);
 exportVirtualSyncConnections(noOfSubmodels, hierarchicalNames, "D://temp//virtualConnectionsExport.csv", true);
 """
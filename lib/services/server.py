@@ -1,8 +1,10 @@
 import os
 from dotenv import load_dotenv
-from opcua import ua, Server
+from opcua import ua, Server, uamethod
 from opcua.server.user_manager import UserManager
+import hashlib
 import json
+import threading
 from datetime import datetime
 
 
@@ -19,6 +21,160 @@ online_users = []
 
 log_callback = None
 
+MODIFIER_FIELDS = ["LastModifier", "LastModifiedTime", "LastModifiedNode", "LastOperation", "SessionID"]
+
+
+class OpcServerRegistry:
+    """
+    The running OPC UA server together with the Node handles created for it, so reads
+    and updates go straight to the nodes instead of resolving browse names every call.
+    Returned by start_opc_server_multi_kanal and passed to the helper functions below.
+
+    Attributes:
+        server (opcua.Server): The server itself.
+        idx (int): Namespace index of "http://example.org/".
+        kanal_nodes (dict): {kanal: Node}.
+        json_vars (dict): {kanal: {"TrafoConfigJSON" | "AxisConfigJSON": Node}}.
+        structured (dict): {kanal: {"TrafoConfigJSON" | "AxisConfigJSON": {param_name: Node}}},
+            only with the structured address space (add_kanal_structure).
+        modifier_node (Node): ModifierTrail object.
+        modifier_vars (dict): {field: Node} for MODIFIER_FIELDS.
+        content_hashes (dict): {(kanal, param_type): sha1 of the canonical JSON payload},
+            kept current by a datachange callback, so client writes are seen as well.
+    """
+
+    def __init__(self, server, idx):
+        self.server = server
+        self.idx = idx
+        self.kanal_nodes = {}
+        self.json_vars = {}
+        self.structured = {}
+        self.modifier_node = None
+        self.modifier_vars = {}
+        self.content_hashes = {}
+        self.lock = threading.RLock()  # Abgleich JSON <-> strukturierte Variablen
+
+    def json_var(self, kanal_name, param_type):
+        try:
+            return self.json_vars[kanal_name][param_type]
+        except KeyError:
+            raise KeyError(f"{kanal_name} has no {param_type} variable") from None
+
+    @staticmethod
+    def content_hash(payload):
+        """
+        Hash of the JSON content, independent of formatting (indent=2 from client.py,
+        compact from the server) and key order. Invalid JSON is hashed as text.
+        """
+        try:
+            payload = json.dumps(json.loads(payload), sort_keys=True, separators=(",", ":"))
+        except (ValueError, TypeError):
+            pass
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def track_content(self, kanal_name, param_type):
+        """
+        Remember the hash of a JSON variable and follow every later change of its value.
+        """
+        key = (kanal_name, param_type)
+        json_var = self.json_var(kanal_name, param_type)
+        self.content_hashes[key] = self.content_hash(json_var.get_value())
+
+        def on_change(handle, datavalue):
+            self.content_hashes[key] = self.content_hash(datavalue.Value.Value or "")
+
+        self.server.iserver.aspace.add_datachange_callback(json_var.nodeid, ua.AttributeIds.Value, on_change)
+
+    def subscribe_data_change(self, handler, kanal_names=None):
+        """
+        In-process subscription on the Kanal JSON variables, without a client session.
+
+        The address space calls handler.datachange_notification(node, val, data) after every
+        value change, in the thread that wrote the value (own writes and client writes).
+
+        Args:
+            handler: Object with datachange_notification, e.g. opcua_tool.ConfigChangeHandler.
+            kanal_names (list): Kanals to watch, default all.
+
+        Returns:
+            list: [(kanal, param_type, handle)] for unsubscribe_data_change().
+        """
+        aspace = self.server.iserver.aspace
+        handles = []
+        for kanal_name in (kanal_names if kanal_names is not None else list(self.json_vars)):
+            for param_type, json_var in self.json_vars.get(kanal_name, {}).items():
+                def on_change(handle, datavalue, node=json_var):
+                    handler.datachange_notification(node, datavalue.Value.Value, datavalue)
+
+                status, handle = aspace.add_datachange_callback(json_var.nodeid, ua.AttributeIds.Value, on_change)
+                status.check()
+                handles.append((kanal_name, param_type, handle))
+        return handles
+
+    def unsubscribe_data_change(self, handles):
+        for _, _, handle in handles:
+            self.server.iserver.aspace.delete_datachange_callback(handle)
+
+    def write_modifier(self, modifier_name, modified_node="", operation="Parameter_Update", session_id=""):
+        """
+        Write all ModifierTrail fields with one batched attribute write.
+
+        Returns:
+            bool: True if every field was written.
+        """
+        values = [modifier_name, datetime.now().isoformat(), modified_node, operation, session_id]
+        params = ua.WriteParameters()
+        for field, value in zip(MODIFIER_FIELDS, values):
+            write_value = ua.WriteValue()
+            write_value.NodeId = self.modifier_vars[field].nodeid
+            write_value.AttributeId = ua.AttributeIds.Value
+            write_value.Value = ua.DataValue(ua.Variant(value, ua.VariantType.String))
+            params.NodesToWrite.append(write_value)
+        with self.lock:
+            results = self.server.iserver.isession.write(params)
+        return all(result.is_good() for result in results)
+
+    def read_modifier(self):
+        """
+        Read all ModifierTrail fields with one batched attribute read.
+
+        Returns:
+            dict: {field: value} for MODIFIER_FIELDS.
+        """
+        params = ua.ReadParameters()
+        for field in MODIFIER_FIELDS:
+            read_value = ua.ReadValueId()
+            read_value.NodeId = self.modifier_vars[field].nodeid
+            read_value.AttributeId = ua.AttributeIds.Value
+            params.NodesToRead.append(read_value)
+        with self.lock:
+            results = self.server.iserver.isession.read(params)
+        for result in results:
+            result.StatusCode.check()
+        return {field: result.Value.Value for field, result in zip(MODIFIER_FIELDS, results)}
+
+    def add_modifier_method(self):
+        """
+        Method UpdateModifier(name, node, op, session) on the ModifierTrail object, so a
+        client updates the whole trail in one call instead of five writes.
+        """
+        @uamethod
+        def update_modifier(parent, modifier_name, modified_node, operation, session_id):
+            ok = self.write_modifier(modifier_name, modified_node, operation, session_id)
+            log_message(f"[MODIFIER] Updated via method: modifier={modifier_name}, node={modified_node}, operation={operation}")
+            return ok
+
+        string = ua.VariantType.String
+        return self.modifier_node.add_method(self.idx, "UpdateModifier", update_modifier,
+                                             [string, string, string, string], [ua.VariantType.Boolean])
+
+    def start(self):
+        self.server.start()
+
+    def stop(self):
+        self.server.stop()
+
+
 def set_log_callback(callback_func):
     global log_callback
     log_callback = callback_func
@@ -54,6 +210,9 @@ def show_online_users():
 def create_opc_server(kanal_names):
     """
     Create and configure OPC UA server with multiple Kanal/Channel nodes.
+
+    Returns:
+        OpcServerRegistry: Server (not started yet) with the Kanal and ModifierTrail handles.
     """
     dotenv_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "config", ".env"))
     load_dotenv(dotenv_path)
@@ -89,50 +248,204 @@ def create_opc_server(kanal_names):
     idx = server.register_namespace("http://example.org/")
     objects = server.get_objects_node()
 
-    kanal_nodes = {}
+    registry = OpcServerRegistry(server, idx)
     for kanal in kanal_names:
-        kanal_nodes[kanal] = objects.add_object(idx, kanal)
+        registry.kanal_nodes[kanal] = objects.add_object(idx, kanal)
 
     # 你的自定义节点构建（只做建树，不做会话操作）
-    modifier_node = create_modifier_trail_node(objects, idx)
+    registry.modifier_node, registry.modifier_vars = create_modifier_trail_node(objects, idx)
+    if registry.modifier_node is not None:
+        registry.add_modifier_method()
 
     print(f"[OK] OPC UA Server created at {url}")
-    return server, kanal_nodes, idx
+    return registry
  
 def add_kanal_config(kanal_node, idx, trafo_names, trafo_values, axis_names, axis_values):
     """
     Add Trafo and Axis config variables to a specific Kanal/Channel node.
+
+    Returns:
+        dict: {"TrafoConfigJSON": Node, "AxisConfigJSON": Node} for the variables created.
     """
+    json_vars = {}
     if trafo_names and trafo_values:
         trafo_data = json.dumps({"param_names": trafo_names, "param_values": trafo_values})
         trafo_var = kanal_node.add_variable(idx, "TrafoConfigJSON", trafo_data, ua.VariantType.String)
         trafo_var.set_writable()
+        json_vars["TrafoConfigJSON"] = trafo_var
     if axis_names and axis_values:
         axis_data = json.dumps({"param_names": axis_names, "param_values": axis_values})
         axis_var = kanal_node.add_variable(idx, "AxisConfigJSON", axis_data, ua.VariantType.String)
         axis_var.set_writable()
+        json_vars["AxisConfigJSON"] = axis_var
+    return json_vars
+
+def _param_group(param_type, param_name):
+    """
+    Object and variable name of a parameter in the structured address space:
+    trafo parameters go to "Trafo", "Axis_1.s_max" to "Axis_1" / "s_max".
+    """
+    if param_type == "TrafoConfigJSON":
+        return "Trafo", param_name
+    if "." in param_name:
+        group, field = param_name.split(".", 1)
+        return group, field
+    return "Axis", param_name
+
+def _typed_value(value):
+    """
+    Numeric parameters become Double variables, expressions such as "PI/180" stay String.
+    """
+    if isinstance(value, bool):
+        return str(value), ua.VariantType.String
+    try:
+        return float(str(value).strip()), ua.VariantType.Double
+    except ValueError:
+        return str(value), ua.VariantType.String
+
+def _variable_value(value, variant_type):
+    """
+    JSON value converted for an existing variable: String variables take any value as
+    text, Double variables raise ValueError for non-numeric values.
+    """
+    if variant_type == ua.VariantType.String:
+        return str(value)
+    if isinstance(value, bool):
+        raise ValueError(f"{value!r} is not numeric")
+    return float(str(value).strip())
+
+def _json_value(value, old_value):
+    """
+    Value written to a structured variable in the representation of the JSON blob.
+    """
+    if isinstance(value, float) and isinstance(old_value, str):
+        return str(int(value)) if value.is_integer() else repr(value)
+    return value
 
-def start_opc_server_multi_kanal(kanal_data_dict):
+def add_kanal_structure(registry, kanal_name, param_type, param_names, param_values):
+    """
+    Add typed variables for one config blob (TrafoConfigJSON or AxisConfigJSON) below the
+    Kanal node (Kanal -> Trafo / Axis_n -> Double/String variable per parameter) and keep
+    them in sync with the JSON variable in both directions.
+
+    Writes to a single variable are merged into the JSON blob, writes to the JSON blob
+    update only the variables whose value changed. Both directions use datachange
+    callbacks of the server address space, so they work for server-side and client writes.
+    A JSON value a Double variable cannot hold (an expression) sets that variable to NaN
+    with status BadTypeMismatch until the JSON carries a number again.
+    """
+    aspace = registry.server.iserver.aspace
+    kanal_node = registry.kanal_nodes[kanal_name]
+    json_var = registry.json_var(kanal_name, param_type)
+    idx = registry.idx
+    groups = {}
+    nodes = {}
+    for name, value in zip(param_names, param_values):
+        group, field = _param_group(param_type, name)
+        if group not in groups:
+            groups[group] = kanal_node.add_object(idx, group)
+        typed, variant_type = _typed_value(value)
+        var = groups[group].add_variable(idx, field, typed, variant_type)
+        var.set_writable()
+        nodes[name] = var
+
+        def on_param_change(handle, datavalue, name=name):
+            if not datavalue.StatusCode.is_good():
+                return  # als ungueltig markiert (_sync_params_from_json), nicht ins JSON zurueck
+            _sync_json_from_param(registry, json_var, name, datavalue.Value.Value)
+
+        aspace.add_datachange_callback(var.nodeid, ua.AttributeIds.Value, on_param_change)
+
+    def on_json_change(handle, datavalue):
+        _sync_params_from_json(registry, kanal_name, param_type, datavalue.Value.Value)
+
+    aspace.add_datachange_callback(json_var.nodeid, ua.AttributeIds.Value, on_json_change)
+    with registry.lock:
+        registry.structured.setdefault(kanal_name, {})[param_type] = nodes
+    return nodes
+
+def _sync_json_from_param(registry, json_var, param_name, value):
+    with registry.lock:
+        try:
+            data = json.loads(json_var.get_value())
+            names = data.get("param_names", [])
+            values = data.get("param_values", [])
+            i = names.index(param_name)
+        except (ValueError, TypeError) as e:
+            print(f"[WARN] {param_name} not found in {json_var}: {e}")
+            return
+        new_value = _json_value(value, values[i])
+        if _typed_value(new_value)[0] == _typed_value(values[i])[0]:
+            return  # schon im JSON, z.B. Echo einer JSON-Aenderung
+        values[i] = new_value
+        json_var.set_value(json.dumps(data))
+
+def _sync_params_from_json(registry, kanal_name, param_type, json_str):
+    with registry.lock:
+        nodes = registry.structured.get(kanal_name, {}).get(param_type)
+        if not nodes:
+            return
+        try:
+            data = json.loads(json_str)
+        except (ValueError, TypeError) as e:
+            print(f"[WARN] Invalid {param_type} JSON for {kanal_name}: {e}")
+            return
+        for name, value in zip(data.get("param_names", []), data.get("param_values", [])):
+            var = nodes.get(name)
+            if var is None:
+                continue  # neuer Parameter, erst nach einem Neustart des Servers als Variable
+            variant_type = var.get_data_type_as_variant_type()
+            try:
+                typed = _variable_value(value, variant_type)
+            except ValueError:
+                # Double-Variable kann z.B. "PI/180" nicht aufnehmen: NaN mit Bad-Status statt alter Wert
+                print(f"[WARN] {kanal_name}/{name}: value {value!r} is not numeric, variable marked BadTypeMismatch.")
+                var.set_data_value(ua.DataValue(ua.Variant(float("nan"), variant_type),
+                                                ua.StatusCode(ua.StatusCodes.BadTypeMismatch)))
+                continue
+            current = registry.server.iserver.aspace.get_attribute_value(var.nodeid, ua.AttributeIds.Value)
+            if current.StatusCode.is_good() and current.Value.Value == typed:
+                continue
+            var.set_value(typed, variant_type)
+
+def start_opc_server_multi_kanal(kanal_data_dict, structured=None):
     """
     Start the OPC UA server and configure multiple Kanal nodes with their configs.
+
+    Returns:
+        OpcServerRegistry: The running server and its node handles.
+
+    Args:
+        kanal_data_dict (dict): {kanal: {"trafo_names", "trafo_values", "axis_names", "axis_values"}}.
+        structured (bool): Also add the typed per-parameter variables (add_kanal_structure).
+            Default from OPCUA_STRUCTURED_NODES in the .env file.
     """
     kanal_names = list(kanal_data_dict.keys())
-    server, kanal_nodes, idx = create_opc_server(kanal_names)
+    registry = create_opc_server(kanal_names)  # laedt auch die .env
+    if structured is None:
+        structured = os.getenv("OPCUA_STRUCTURED_NODES", "0") == "1"
 
-    for kanal, node in kanal_nodes.items():
+    for kanal, node in registry.kanal_nodes.items():
         data = kanal_data_dict[kanal]
-        add_kanal_config(
+        registry.json_vars[kanal] = add_kanal_config(
             kanal_node=node,
-            idx=idx,
+            idx=registry.idx,
             trafo_names=data.get("trafo_names"),
             trafo_values=data.get("trafo_values"),
             axis_names=data.get("axis_names"),
             axis_values=data.get("axis_values"),
         )
-
-    server.start()
+        for param_type in registry.json_vars[kanal]:
+            registry.track_content(kanal, param_type)
+        if structured:
+            for param_type in registry.json_vars[kanal]:
+                prefix = "trafo" if param_type == "TrafoConfigJSON" else "axis"
+                add_kanal_structure(registry, kanal, param_type,
+                                    data.get(f"{prefix}_names"), data.get(f"{prefix}_values"))
+
+    registry.start()
     print("\n OPC UA Server started with multiple Kanals.")
-    return server
+    return registry
 
 def stop_opc_server(server):
     if server:
@@ -145,9 +458,15 @@ def stop_opc_server(server):
 def update_kanal_axis_config(server_instance, kanal_name, param_type, param_names, param_values):
     """
     Update the JSON data for a given Kanal and config type ("TrafoConfigJSON" or "AxisConfigJSON").
+    server_instance is the OpcServerRegistry returned by start_opc_server_multi_kanal.
+
+    The write is skipped if the payload equals the current content of the variable
+    (content hash), so an unchanged refresh causes no data-change notification.
+
+    Returns:
+        bool: True if the variable was written, False if the content was unchanged.
     """
-    config_obj = server_instance.get_objects_node().get_child([f"2:{kanal_name}"])
-    json_node = config_obj.get_child(f"2:{param_type}")
+    json_node = server_instance.json_var(kanal_name, param_type)
 
     data = {
         "param_names": param_names,
@@ -155,31 +474,49 @@ def update_kanal_axis_config(server_instance, kanal_name, param_type, param_name
     }
 
     json_str = json.dumps(data)
+    if server_instance.content_hashes.get((kanal_name, param_type)) == server_instance.content_hash(json_str):
+        return False
     json_node.set_value(json_str)
     print(f"[OK] {param_type} for {kanal_name} updated.")
+    return True
 
 def update_axis_config(server_instance, kanal_name, axis_names, axis_values):
     """
     Specifically update AxisConfigJSON for a given Kanal.
     """
-    update_kanal_axis_config(server_instance, kanal_name, "AxisConfigJSON", axis_names, axis_values)
-    print(f"[OK] AxisConfigJSON for {kanal_name} updated.")
+    return update_kanal_axis_config(server_instance, kanal_name, "AxisConfigJSON", axis_names, axis_values)
 
 def update_trafo_config(server_instance, kanal_name, trafo_names, trafo_values):
     """
     Specifically update TrafoConfigJSON for a given Kanal.
     """
-    update_kanal_axis_config(server_instance, kanal_name, "TrafoConfigJSON", trafo_names, trafo_values)
-    print(f"[OK] TrafoConfigJSON for {kanal_name} updated.")
+    return update_kanal_axis_config(server_instance, kanal_name, "TrafoConfigJSON", trafo_names, trafo_values)
+
+def update_all_kanal_configs(server_instance, kanal_params):
+    """
+    Update TrafoConfigJSON and AxisConfigJSON of several Kanals, unchanged ones are skipped.
+
+    Args:
+        kanal_params (dict): {kanal: {"trafo_names", "trafo_values", "axis_names", "axis_values"}}.
+
+    Returns:
+        list: Kanals with at least one changed variable.
+    """
+    changed = []
+    for kanal_name, params in kanal_params.items():
+        trafo_changed = update_trafo_config(server_instance, kanal_name, params["trafo_names"], params["trafo_values"])
+        axis_changed = update_axis_config(server_instance, kanal_name, params["axis_names"], params["axis_values"])
+        if trafo_changed or axis_changed:
+            changed.append(kanal_name)
+    return changed
 
 def read_kanal_data_from_server_instance(server_instance, kanal_name):
     """
     Read Trafo and Axis data from a specific Kanal node in the server instance.
     """
     try:
-        kanal_node = server_instance.get_objects_node().get_child([f"2:{kanal_name}"])
-        trafo_json = kanal_node.get_child(f"2:TrafoConfigJSON").get_value()
-        axis_json = kanal_node.get_child(f"2:AxisConfigJSON").get_value()
+        trafo_json = server_instance.json_var(kanal_name, "TrafoConfigJSON").get_value()
+        axis_json = server_instance.json_var(kanal_name, "AxisConfigJSON").get_value()
 
         trafo_data = json.loads(trafo_json)
         axis_data = json.loads(axis_json)
@@ -203,14 +540,11 @@ def read_kanal_data_from_server_instance(server_instance, kanal_name):
 def read_all_kanal_data_from_server_instance(server_instance):
     
     result = {}
-    kanal_nodes = server_instance.get_objects_node().get_children()
 
-    for kanal_node in kanal_nodes:
-        kanal_name = kanal_node.get_browse_name().Name
+    for kanal_name in server_instance.kanal_nodes:
         try:
-            kanal_node_obj = server_instance.get_objects_node().get_child([f"2:{kanal_name}"])
-            trafo_raw = kanal_node_obj.get_child(f"2:TrafoConfigJSON").get_value()
-            axis_raw = kanal_node_obj.get_child(f"2:AxisConfigJSON").get_value()
+            trafo_raw = server_instance.json_var(kanal_name, "TrafoConfigJSON").get_value()
+            axis_raw = server_instance.json_var(kanal_name, "AxisConfigJSON").get_value()
 
             result[kanal_name] = {
                 "TrafoConfigJSON": trafo_raw,
@@ -226,45 +560,36 @@ def read_all_kanal_data_from_server_instance(server_instance):
 def create_modifier_trail_node(objects, idx):
     """
     Create an modifier trail node for tracking changes.
+
+    Returns:
+        tuple: (ModifierTrail node, {field: variable node}), (None, {}) on failure.
     """
     try:
         modifier_node = objects.add_object(idx, "ModifierTrail")
 
         # add variables
-        last_modifier_var = modifier_node.add_variable(idx, "LastModifier", "Unknown", ua.VariantType.String)
-        last_modified_time_var = modifier_node.add_variable(idx, "LastModifiedTime", "", ua.VariantType.String)
-        last_modified_node_var = modifier_node.add_variable(idx, "LastModifiedNode", "", ua.VariantType.String)
-        last_operation_var = modifier_node.add_variable(idx, "LastOperation", "", ua.VariantType.String)
-        session_id_var = modifier_node.add_variable(idx, "SessionID", "", ua.VariantType.String)
-
-        # set writable
-        last_modifier_var.set_writable()
-        last_modified_time_var.set_writable()
-        last_modified_node_var.set_writable()
-        last_operation_var.set_writable()
-        session_id_var.set_writable()
-        
+        modifier_vars = {}
+        for field in MODIFIER_FIELDS:
+            initial = "Unknown" if field == "LastModifier" else ""
+            modifier_vars[field] = modifier_node.add_variable(idx, field, initial, ua.VariantType.String)
+            # set writable
+            modifier_vars[field].set_writable()
 
         print(f"[OK] Modifier trail node created successfully.")
-        return modifier_node
+        return modifier_node, modifier_vars
     except Exception as e:
         print(f"[ERROR] Failed to create modifier trail node: {e}")
-        return None
+        return None, {}
 
 def update_modifier_info(server_instance, modifier_name, modified_node="", operation="Parameter_Update", session_id=""):
     """
     更新修改者信息到 OPC UA 修改者节点
     """
     try:
-        # 获取修改者节点
-        modifier_node = server_instance.get_objects_node().get_child("2:ModifierTrail")
-
-        # 更新修改者信息
-        modifier_node.get_child("2:LastModifier").set_value(modifier_name)
-        modifier_node.get_child("2:LastModifiedTime").set_value(datetime.now().isoformat())
-        modifier_node.get_child("2:LastModifiedNode").set_value(modified_node)
-        modifier_node.get_child("2:LastOperation").set_value(operation)
-        modifier_node.get_child("2:SessionID").set_value(session_id)
+        # 一次批量写入全部字段，订阅者不会看到只更新了一半的记录
+        if not server_instance.write_modifier(modifier_name, modified_node, operation, session_id):
+            print("[ERROR] Failed to update modifier info: write rejected")
+            return False
 
         print(f"[MODIFIER] Updated: modifier={modifier_name}, node={modified_node}, operation={operation}")
         return True
@@ -278,20 +603,15 @@ def read_modifier_info(server_instance):
     从 OPC UA 服务器读取修改者信息
     """
     try:
-        modifier_node = server_instance.get_objects_node().get_child("2:ModifierTrail")
-
-        modifier = modifier_node.get_child("2:LastModifier").get_value()
-        modified_time = modifier_node.get_child("2:LastModifiedTime").get_value()
-        modified_node = modifier_node.get_child("2:LastModifiedNode").get_value()
-        operation = modifier_node.get_child("2:LastOperation").get_value()
-        session_id = modifier_node.get_child("2:SessionID").get_value()
+        # 一次批量读取
+        values = server_instance.read_modifier()
 
         return {
-            'modifier': modifier,
-            'modified_time': modified_time,
-            'modified_node': modified_node,
-            'operation': operation,
-            'session_id': session_id
+            'modifier': values["LastModifier"],
+            'modified_time': values["LastModifiedTime"],
+            'modified_node': values["LastModifiedNode"],
+            'operation': values["LastOperation"],
+            'session_id': values["SessionID"]
         }
         
     except Exception as e:
@@ -0,0 +1,207 @@
+import csv
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import numpy as np
+
+# Dateiaufbau:
+#   magic (8 Byte) | Headerlaenge uint32 | reserviert uint32 | Anzahl Records uint64 |
+#   Header als JSON (Kanaele, Datentypen, Update-Rate), auf 8 Byte aufgefuellt |
+#   Records fester Groesse: Zeitstempel float64, Set-Index int64, ein float64 je Kanal
+MAGIC = b"VSIGREC1"
+_PREFIX = struct.Struct("<8sIIQ")
+_COUNT_OFFSET = 16
+
+
+def record_dtype(channel_count):
+    return np.dtype([("t", "<f8"), ("set", "<i8"), ("values", "<f8", (channel_count,))])
+
+
+class SignalRecorder:
+    """
+    Append-only recording of port samples into a memory-mapped binary file.
+
+    The file grows in chunks of `chunk_records` and is truncated to the written
+    records on close(). The record count in the file prefix is updated with every
+    sample, so an interrupted recording stays readable up to the last sample.
+
+    Usage with the cyclic update (see cyclic_update.CyclicUpdater):
+        recorder = SignalRecorder.for_updater(vz.updater, "run_01.vsig")
+        ...
+        recorder.close()
+    """
+
+    def __init__(self, path, channels, types=None, update_rate_ms=None, chunk_records=65536):
+        self.path = path
+        self.channels = list(channels)
+        self.dtype = record_dtype(len(self.channels))
+        self.chunk_records = chunk_records
+        self.count = 0
+        self.lock = threading.Lock()
+        self.updater = None
+        header = json.dumps({
+            "channels": self.channels,
+            "types": list(types) if types is not None else ["V_IO_TYPE_REAL64"] * len(self.channels),
+            "update_rate_ms": update_rate_ms,
+            "created": time.time(),
+        }, ensure_ascii=False).encode("utf-8")
+        header += b" " * (-(_PREFIX.size + len(header)) % 8)
+        self.data_offset = _PREFIX.size + len(header)
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, "w+b")
+        self._file.write(_PREFIX.pack(MAGIC, len(header), 0, 0))
+        self._file.write(header)
+        self._capacity = 0
+        self._mmap = None
+        self._records = None
+        self._grow()
+
+    @classmethod
+    def for_updater(cls, updater, path, **kwargs):
+        """
+        Record every port registered on a CyclicUpdater, attached as sink.
+        """
+        if updater.ports is None:
+            raise ValueError("No ports registered on the cyclic updater")
+        types = [dt.name for dt in updater.ports.data_types]
+        recorder = cls(path, updater.ports.paths, types, updater.update_rate_ms, **kwargs)
+        recorder.updater = updater
+        updater.add_sink(recorder)
+        return recorder
+
+    def _grow(self):
+        self._release_mapping()
+        self._capacity += self.chunk_records
+        self._file.truncate(self.data_offset + self._capacity * self.dtype.itemsize)
+        self._mmap = mmap.mmap(self._file.fileno(), 0)
+        self._records = np.ndarray((self._capacity,), dtype=self.dtype, buffer=self._mmap, offset=self.data_offset)
+
+    def _release_mapping(self):
+        # numpy-Sicht zuerst freigeben, sonst laesst sich die mmap nicht schliessen
+        self._records = None
+        if self._mmap is not None:
+            self._mmap.flush()
+            self._mmap.close()
+            self._mmap = None
+
+    def append(self, timestamp, set_index, values):
+        with self.lock:
+            if self._records is None:
+                return  # bereits geschlossen
+            if self.count >= self._capacity:
+                self._grow()
+            record = self._records[self.count]
+            record["t"] = timestamp
+            record["set"] = set_index
+            record["values"] = values
+            self.count += 1
+            struct.pack_into("<Q", self._mmap, _COUNT_OFFSET, self.count)
+
+    def __call__(self, timestamp, set_index, values, status=None):
+        # Signatur der Sinks von CyclicUpdater
+        self.append(timestamp, set_index, values)
+
+    def record_changes(self, feed):
+        """
+        Record from change_feed.changed_values(). Channels without a change in a set
+        keep their last value, so the file layout stays the same as with full sets.
+        Returns when the feed ends.
+        """
+        columns = {channel: i for i, channel in enumerate(self.channels)}
+        row = np.full(len(self.channels), np.nan)
+        for set_index, changes in feed:
+            for path, value in changes.items():
+                if path in columns and isinstance(value, float):
+                    row[columns[path]] = value
+            self.append(time.time(), set_index, row)
+
+    def close(self):
+        if self.updater is not None:
+            self.updater.remove_sink(self)
+            self.updater = None
+        with self.lock:
+            if self._file.closed:
+                return
+            self._release_mapping()
+            self._file.truncate(self.data_offset + self.count * self.dtype.itemsize)
+            self._file.close()
+        print(f"[OK] Recorded {self.count} samples of {len(self.channels)} channels to {self.path}")
+
+
+class SignalRecording:
+    """
+    Read access to a file written by SignalRecorder. The records are memory-mapped,
+    time slices are found by binary search and only the requested range is loaded.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            magic, header_len, _, count = _PREFIX.unpack(f.read(_PREFIX.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a signal recording")
+            self.header = json.loads(f.read(header_len).decode("utf-8"))
+        self.channels = self.header["channels"]
+        self.types = self.header["types"]
+        self.update_rate_ms = self.header["update_rate_ms"]
+        self.dtype = record_dtype(len(self.channels))
+        self.data_offset = _PREFIX.size + header_len
+        # Laufende Aufnahme: nur vollstaendige Records im Bereich der Datei
+        available = (os.path.getsize(path) - self.data_offset) // self.dtype.itemsize
+        self.count = min(count, available)
+        if self.count:
+            self.records = np.memmap(path, dtype=self.dtype, mode="r", offset=self.data_offset, shape=(self.count,))
+        else:
+            self.records = np.zeros(0, dtype=self.dtype)
+
+    def __len__(self):
+        return self.count
+
+    def channel_index(self, channels):
+        return [self.channels.index(c) for c in channels]
+
+    def _range(self, t_start=None, t_end=None):
+        timestamps = self.records["t"]
+        start = 0 if t_start is None else int(np.searchsorted(timestamps, t_start, side="left"))
+        end = self.count if t_end is None else int(np.searchsorted(timestamps, t_end, side="right"))
+        return start, end
+
+    def time_slice(self, t_start=None, t_end=None, channels=None):
+        """
+        Samples with t_start <= t <= t_end (unix time).
+
+        Returns:
+            tuple: (timestamps, set_indices, values[samples, channels])
+        """
+        start, end = self._range(t_start, t_end)
+        part = self.records[start:end]
+        values = part["values"]
+        if channels is not None:
+            values = values[:, self.channel_index(channels)]
+        return np.array(part["t"]), np.array(part["set"]), np.array(values)
+
+    def to_npz(self, out_path, t_start=None, t_end=None, channels=None):
+        timestamps, set_indices, values = self.time_slice(t_start, t_end, channels)
+        np.savez_compressed(out_path, t=timestamps, set=set_indices, values=values,
+                            channels=np.array(channels or self.channels))
+        return out_path
+
+    def to_csv(self, out_path, t_start=None, t_end=None, channels=None, chunk=100000):
+        """
+        Export as CSV in chunks, so large recordings never have to fit into memory.
+        """
+        start, end = self._range(t_start, t_end)
+        columns = self.channel_index(channels) if channels is not None else None
+        with open(out_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["t", "set"] + list(channels or self.channels))
+            for offset in range(start, end, chunk):
+                part = self.records[offset:min(offset + chunk, end)]
+                values = part["values"] if columns is None else part["values"][:, columns]
+                for t, set_index, row in zip(part["t"], part["set"], values):
+                    writer.writerow([repr(float(t)), int(set_index)] + [repr(float(v)) for v in row])
+        return out_path
@@ -0,0 +1,368 @@
+import collections
+import multiprocessing
+import os
+import queue
+import time
+import traceback
+from . import remote
+from . import Virtuos_tool
+
+# Nachrichten der Worker an den Controller
+MSG_READY = "ready"
+MSG_DONE = "done"
+MSG_FAILED = "failed"
+MSG_EXIT = "exit"
+
+
+def _start_instance(vz, index, port, server_name, virtuos_args):
+    """
+    Start one Virtuos instance inside a worker process.
+
+    Returns:
+        int: Process ID of the started Virtuos.
+    """
+    args = [arg.format(port=port, server=server_name, index=index) for arg in virtuos_args]
+    if vz.startVirtuosExe(virtuosArgs=args) != vz.V_SUCCD:
+        raise RuntimeError(f"Error starting ISG-virtuos instance {index} on port {port}")
+    return vz.prozessIDM.value
+
+
+def _connect_instance(vz, port, server_name, project):
+    """
+    Connect the worker to its Virtuos instance and load the project if none is open.
+    """
+    if vz.corbaInfo("127.0.0.1", str(port), server_name) != vz.V_SUCCD:
+        raise RuntimeError(f"setCorbaInfo failed for port {port}")
+    if vz.startConnectionCorba() != vz.V_SUCCD:
+        raise RuntimeError(f"Failed to connect to Corba server on port {port}")
+    if project and vz.isOpen() != vz.V_SUCCD and vz.getProject(project) != vz.V_SUCCD:
+        raise RuntimeError(f"Error loading ISG-virtuos project {project}")
+
+
+def _stop_instance(vz, pid, stop_virtuos=True):
+    """
+    Stop the Virtuos of a worker: stopVirtuos, then stopProcess, killProcess as last resort.
+    With stop_virtuos=False only the process (if any) is ended and the DLL unloaded.
+    """
+    if stop_virtuos:
+        try:
+            vz.stopVirtuosPrgm()
+            vz.stopConnect()
+        except Exception as e:
+            print(f"[WARN] Stopping Virtuos failed: {e}")
+    if pid and vz.stopProcess(pid) != vz.V_SUCCD:
+        print(f"[WARN] stopProcess({pid}) failed, killing the process.")
+        vz.killProcess(pid)
+    try:
+        vz.unloadDLL()
+    except Exception as e:
+        print(f"[WARN] {e}")
+
+
+def _worker_main(index, port, server_name, start_virtuos, virtuos_args, project, jobs, results):
+    """
+    Worker process: owns one Virtuos instance and one VirtuosZugriff, runs the jobs the
+    controller sends on its own queue until it receives None.
+    """
+    vz = remote.VirtuosZugriff()
+    pid = 0
+    try:
+        vz.virtuosDLL()
+        if start_virtuos:
+            pid = _start_instance(vz, index, port, server_name, virtuos_args)
+        _connect_instance(vz, port, server_name, project)
+    except Exception as e:
+        results.put((MSG_FAILED, index, None, f"{e}"))
+        # Nicht verbunden: ein fremdes, schon offenes Virtuos nicht anfassen, nur das eigene beenden
+        try:
+            _stop_instance(vz, pid, stop_virtuos=False)
+        except Exception as stop_error:
+            print(f"[WARN] Cleaning up Virtuos instance {index} failed: {stop_error}")
+        results.put((MSG_EXIT, index, None, pid))
+        return
+    results.put((MSG_READY, index, None, pid))
+    try:
+        while True:
+            job = jobs.get()
+            if job is None:
+                break
+            job_id, func, args, kwargs = job
+            try:
+                results.put((MSG_DONE, index, job_id, func(vz, *args, **kwargs)))
+            except Exception as e:
+                results.put((MSG_FAILED, index, job_id, f"{e}\n{traceback.format_exc()}"))
+    finally:
+        _stop_instance(vz, pid)
+        results.put((MSG_EXIT, index, None, pid))
+
+
+class FarmInstance:
+    def __init__(self, index, port):
+        self.index = index
+        self.port = port
+        self.process = None
+        self.jobs = None  # Auftragsqueue nur fuer diesen Worker
+        self.pid = 0  # Prozess-ID von Virtuos
+        self.ready = False
+        self.exited = False
+        self.job_id = None  # laufender Job
+
+
+class VirtuosFarm:
+    """
+    N Virtuos instances on distinct CORBA ports, each driven by its own worker process
+    with its own VirtuosZugriff. Submitted jobs wait in one work queue in the controller,
+    which hands the next job to whichever instance becomes free, so the controller always
+    knows which job runs where.
+
+    A job is a picklable module-level function called as func(vz, *args, **kwargs) in
+    the worker, e.g. param_sweep.sweep_point_job or read_block_job. Jobs of a worker
+    that dies are queued again (once).
+
+    The Virtuos processes are stopped with stopVirtuos/stopProcess by their workers;
+    workers that do not exit in time are terminated and their Virtuos killed with
+    killProcess from the controller.
+
+    Usage:
+        with VirtuosFarm(instances=4) as farm:
+            job_ids = [farm.submit(read_block_job, path) for path in block_paths]
+            for job_id, ok, result in farm.results(job_ids):
+                ...
+
+    With envVirtuosBackend=fake the workers use fake_virtuos.FakeVirtuosInterface, so the
+    farm runs on Linux without Virtuos.
+
+    Args:
+        instances (int): Number of Virtuos instances.
+        base_port (int): CORBA port of the first instance, the others count up.
+        server_name (str): CORBA server name.
+        start_virtuos (bool): Start a Virtuos per instance (startVirtuosExe) instead of
+            attaching to already running ones.
+        virtuos_args (list): Command line of each started Virtuos, {port}, {server} and
+            {index} are replaced. Default from envVirtuosFarmArgs.
+        project (str): Project loaded into instances without an open project.
+    """
+
+    def __init__(self, instances=2, base_port=54322, server_name="Visualization", start_virtuos=True,
+                 virtuos_args=None, project=Virtuos_tool.project_path, stop_timeout=10.0, max_retries=1):
+        self.instances = [FarmInstance(i, base_port + i) for i in range(instances)]
+        self.server_name = server_name
+        self.start_virtuos = start_virtuos
+        if virtuos_args is None:
+            virtuos_args = os.getenv("envVirtuosFarmArgs", "-startcorbaserver -corbaport {port}").split()
+        self.virtuos_args = list(virtuos_args)
+        self.project = project
+        self.stop_timeout = stop_timeout
+        self.max_retries = max_retries
+        # spawn: die DLL wird in jedem Worker neu geladen, nie per fork geteilt
+        self.context = multiprocessing.get_context("spawn")
+        self.messages = None
+        self.queue = collections.deque()  # wartende Job-IDs
+        self.pending = {}  # {job_id: (func, args, kwargs, retries)}
+        self.finished = {}  # {job_id: (ok, result)}
+        self.next_job_id = 0
+        self.started = False
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown()
+
+    @property
+    def alive(self):
+        return [inst for inst in self.instances if inst.ready and not inst.exited]
+
+    def start(self, timeout=120.0):
+        """
+        Start all workers and wait until their Virtuos instances are connected.
+
+        Returns:
+            int: Number of ready instances.
+        """
+        if self.started:
+            return len(self.alive)
+        self.messages = self.context.Queue()
+        for inst in self.instances:
+            inst.jobs = self.context.Queue()
+            inst.process = self.context.Process(
+                target=_worker_main,
+                args=(inst.index, inst.port, self.server_name, self.start_virtuos, self.virtuos_args,
+                      self.project, inst.jobs, self.messages),
+                daemon=True,
+            )
+            inst.process.start()
+        self.started = True
+
+        deadline = time.time() + timeout
+        while any(not inst.ready and not inst.exited for inst in self.instances) and time.time() < deadline:
+            self._poll(0.5)
+        for inst in self.instances:
+            if not inst.ready and not inst.exited:
+                print(f"[ERROR] Virtuos instance {inst.index} (port {inst.port}) did not come up in time.")
+                self._terminate(inst)
+        ready = len(self.alive)
+        print(f"[INFO] Virtuos farm: {ready}/{len(self.instances)} instances ready.")
+        if not ready:
+            self.shutdown()
+            raise RuntimeError("No Virtuos instance of the farm could be started")
+        return ready
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Queue a job func(vz, *args, **kwargs).
+
+        Returns:
+            int: Job ID.
+        """
+        if not self.started:
+            self.start()
+        job_id = self.next_job_id
+        self.next_job_id += 1
+        self.pending[job_id] = (func, args, kwargs, 0)
+        self.queue.append(job_id)
+        self._dispatch()
+        return job_id
+
+    def _dispatch(self):
+        for inst in self.alive:
+            if not self.queue:
+                return
+            if inst.job_id is None:
+                job_id = self.queue.popleft()
+                func, args, kwargs, _ = self.pending[job_id]
+                inst.job_id = job_id
+                inst.jobs.put((job_id, func, args, kwargs))
+
+    def map(self, func, items):
+        """
+        Run func(vz, item) for every item, results in the order of items.
+
+        Returns:
+            list: (ok, result) per item.
+        """
+        job_ids = [self.submit(func, item) for item in items]
+        results = {job_id: (ok, result) for job_id, ok, result in self.results(job_ids)}
+        return [results[job_id] for job_id in job_ids]
+
+    def results(self, job_ids=None, timeout=None):
+        """
+        Generator over finished jobs in completion order.
+
+        Yields:
+            tuple: (job_id, ok, result or error message)
+        """
+        waiting = set(self.pending if job_ids is None else job_ids)
+        deadline = None if timeout is None else time.time() + timeout
+        while waiting:
+            for job_id in [j for j in waiting if j in self.finished]:
+                waiting.discard(job_id)
+                ok, result = self.finished.pop(job_id)
+                yield job_id, ok, result
+            if not waiting:
+                break
+            if not self.alive:
+                for job_id in sorted(waiting):
+                    self.pending.pop(job_id, None)
+                    yield job_id, False, "No Virtuos instance left"
+                break
+            if deadline is not None and time.time() > deadline:
+                raise TimeoutError(f"{len(waiting)} farm jobs not finished in time")
+            self._poll(0.5)
+
+    def _poll(self, timeout):
+        try:
+            kind, index, job_id, payload = self.messages.get(timeout=timeout)
+        except queue.Empty:
+            self._check_workers()
+            self._dispatch()
+            return
+        inst = self.instances[index]
+        if kind == MSG_READY:
+            inst.ready = True
+            inst.pid = payload
+            print(f"[OK] Virtuos instance {index} connected on port {inst.port}.")
+        elif kind in (MSG_DONE, MSG_FAILED):
+            if job_id is None:
+                print(f"[ERROR] Virtuos instance {index}: {payload}")
+                return
+            inst.job_id = None
+            self.pending.pop(job_id, None)
+            self.finished[job_id] = (kind == MSG_DONE, payload)
+        elif kind == MSG_EXIT:
+            inst.exited = True
+            inst.pid = 0
+        self._dispatch()
+
+    def _check_workers(self):
+        for inst in self.instances:
+            if inst.exited or inst.process is None or inst.process.is_alive():
+                continue
+            if inst.process.exitcode == 0:
+                continue  # regulaer beendet, die Abmeldung steht noch in der Queue
+            # Worker ohne Abmeldung beendet: Virtuos abschiessen, laufenden Job neu einreihen
+            print(f"[WARN] Worker of Virtuos instance {inst.index} died (exit code {inst.process.exitcode}).")
+            inst.exited = True
+            self._kill_virtuos(inst)
+            job_id, inst.job_id = inst.job_id, None
+            if job_id is not None and job_id in self.pending:
+                func, args, kwargs, retries = self.pending[job_id]
+                if retries < self.max_retries:
+                    self.pending[job_id] = (func, args, kwargs, retries + 1)
+                    self.queue.appendleft(job_id)
+                else:
+                    self.pending.pop(job_id)
+                    self.finished[job_id] = (False, f"Worker of instance {inst.index} died")
+
+    def _kill_virtuos(self, inst):
+        if not inst.pid:
+            return
+        vz = remote.VirtuosZugriff()
+        try:
+            vz.virtuosDLL()
+            if vz.killProcess(inst.pid) == vz.V_SUCCD:
+                print(f"[OK] Killed Virtuos process {inst.pid} of instance {inst.index}.")
+            else:
+                print(f"[ERROR] killProcess({inst.pid}) failed for instance {inst.index}.")
+            vz.unloadDLL()
+        except Exception as e:
+            print(f"[ERROR] killProcess({inst.pid}) failed: {e}")
+        inst.pid = 0
+
+    def _terminate(self, inst):
+        if inst.process is not None and inst.process.is_alive():
+            inst.process.terminate()
+            inst.process.join(5)
+        inst.exited = True
+        self._kill_virtuos(inst)
+
+    def shutdown(self):
+        """
+        Stop all workers and their Virtuos processes. Queued jobs are dropped.
+        """
+        if not self.started:
+            return
+        self.queue.clear()
+        for inst in self.instances:
+            if not inst.exited:
+                inst.jobs.put(None)
+        deadline = time.time() + self.stop_timeout
+        while any(not inst.exited for inst in self.instances) and time.time() < deadline:
+            self._poll(0.2)
+        for inst in self.instances:
+            if not inst.exited:
+                print(f"[WARN] Worker of Virtuos instance {inst.index} did not stop, terminating.")
+                self._terminate(inst)
+            inst.process.join(1)
+            inst.jobs.close()
+        self.messages.close()
+        self.started = False
+        print("[OK] Virtuos farm stopped.")
+
+
+def read_block_job(vz, parameter_path):
+    """
+    Farm job for a per-Kanal refresh: (trafo_params, axis_params) of one block.
+    """
+    return Virtuos_tool.read_Value_Model_json(vz, parameter_path)
@@ -0,0 +1,190 @@
+import json
+import os
+import itertools
+from lib.utils.save_to_file import TEMP_DIR
+
+# Result files written by the generated scripts
+TEMP_DIR_JS = os.path.join(TEMP_DIR, "JS_Datei")
+
+_result_counter = itertools.count()
+
+# Shared helpers of every generated script. The script receives its whole job as one
+# JSON literal in `request`, reads/writes inside Virtuos and stores the outcome as JSON
+# under request.resultPath, so Python needs a single interpretJSCode call per block.
+_JS_HELPERS = r"""
+function readParameter(paramPath) {
+  var returnStatus = new VJSStatus();
+  var readValue = new VJSVariant();
+  VModelManipulationInterface.getParameterByHierarchicalName(paramPath, readValue, returnStatus);
+  if (returnStatus.hasSucceeded()) {
+    return String(readValue.getValue());
+  }
+  return null;
+}
+
+function writeResultFile(filePath, content) {
+  var returnStatus = new VJSStatus();
+  VFileSystemInterface.writeTextFile(filePath, content, returnStatus);
+  if (!returnStatus.hasSucceeded()) {
+    VLogInterface.emitErrorMessage("Failed to write " + filePath + " → " + returnStatus.createFormattedErrorMessage(), false);
+  }
+}
+
+function paramPath(name) {
+  return request.block + ".[" + name + "]";
+}
+"""
+
+_JS_READ = r"""
+var result = {};
+
+function readInto(name) {
+  var value = readParameter(paramPath(name));
+  if (value !== null) {
+    result[name] = value;
+    return true;
+  }
+  return false;
+}
+
+if (request.names !== null) {
+  for (var n = 0; n < request.names.length; n++) {
+    readInto(request.names[n]);
+  }
+} else {
+  readInto("KinID");
+  for (var i = 0; i < request.maxPar; i++) {
+    if (!readInto("par_" + i)) {
+      break;
+    }
+  }
+  for (var prefix in request.groups) {
+    var fields = request.groups[prefix];
+    for (var index = 1; index <= request.maxIndex; index++) {
+      for (var f = 0; f < fields.length; f++) {
+        readInto(prefix + "_" + index + "." + fields[f]);
+      }
+    }
+  }
+}
+
+writeResultFile(request.resultPath, JSON.stringify(result));
+"""
+
+_JS_WRITE = r"""
+var results = {};
+
+function setAndCheckParameter(paramPath, setValue) {
+  var returnStatus = new VJSStatus();
+  var readValue = new VJSVariant();
+  VModelManipulationInterface.setParameterByHierarchicalName(paramPath, setValue, returnStatus);
+  if (!returnStatus.hasSucceeded()) {
+    VLogInterface.emitErrorMessage("Failed: " + paramPath + " → " + returnStatus.createFormattedErrorMessage(), false);
+    return false;
+  }
+  VModelManipulationInterface.getParameterByHierarchicalName(paramPath, readValue, returnStatus);
+  if (returnStatus.hasSucceeded()) {
+    VLogInterface.emitInformationMessage("Set: " + paramPath + " = " + readValue.getValue(), false);
+    return true;
+  }
+  VLogInterface.emitErrorMessage("Failed: " + paramPath + " → " + returnStatus.createFormattedErrorMessage(), false);
+  return false;
+}
+
+for (var key in request.values) {
+  results[key] = setAndCheckParameter(paramPath(key), request.values[key]);
+}
+
+writeResultFile(request.resultPath, JSON.stringify(results));
+"""
+
+_JS_PROBE = r"""
+writeResultFile(request.resultPath, JSON.stringify({"ok": true}));
+"""
+
+
+def make_result_path(tag: str) -> str:
+    """
+    Unique result file path under Temp_Datei/JS_Datei. Forward slashes, so the
+    path can be used inside a JavaScript string on Windows as well.
+    """
+    os.makedirs(TEMP_DIR_JS, exist_ok=True)
+    filename = f"{tag}_{os.getpid()}_{next(_result_counter)}.json"
+    return os.path.join(TEMP_DIR_JS, filename).replace("\\", "/")
+
+
+def _request_literal(request: dict) -> str:
+    return "var request = " + json.dumps(request, ensure_ascii=False) + ";\n"
+
+
+def build_read_script(block_path: str, result_path: str, param_names=None, groups=None,
+                      max_par=9999, max_index=98) -> str:
+    """
+    Build a script that reads the parameters of one block and stores
+    {local_name: value} as JSON in result_path.
+
+    Args:
+        block_path (str): Block path, e.g. "[Block Diagram].[RobotController]".
+        result_path (str): File the script writes its result to.
+        param_names (list): Names to read. None probes KinID, par_i and the groups.
+        groups (dict): Axis field groups to probe, e.g. {"Axis": ["ratio", ...]}.
+    """
+    request = {
+        "op": "read",
+        "block": block_path,
+        "resultPath": result_path,
+        "names": list(param_names) if param_names is not None else None,
+        "groups": groups or {},
+        "maxPar": max_par,
+        "maxIndex": max_index,
+    }
+    return _request_literal(request) + _JS_HELPERS + _JS_READ
+
+
+def build_write_script(block_path: str, result_path: str, values: dict) -> str:
+    """
+    Build a script that sets every parameter in values with setAndCheckParameter
+    (see Temp_Datei/SetParamByName_Robot.js) and stores {local_name: bool} as JSON
+    in result_path.
+
+    Args:
+        block_path (str): Block path, e.g. "[Block Diagram].[RobotController]".
+        result_path (str): File the script writes its result to.
+        values (dict): {local_name: value}, e.g. {"par_5": "0", "Axis_1.s_max": "180"}.
+    """
+    request = {
+        "op": "write",
+        "block": block_path,
+        "resultPath": result_path,
+        "values": {name: str(value) for name, value in values.items()},
+    }
+    return _request_literal(request) + _JS_HELPERS + _JS_WRITE
+
+
+def build_probe_script(result_path: str) -> str:
+    """
+    Build a script that only writes {"ok": true} to result_path. Used once per
+    session to check that the Virtuos JS engine can write result files, before any
+    script touches the model.
+    """
+    request = {"op": "probe", "resultPath": result_path}
+    return _request_literal(request) + _JS_HELPERS + _JS_PROBE
+
+
+def load_result_file(result_path: str):
+    """
+    Parse and remove a result file. Returns None if the script did not produce one.
+    """
+    if not os.path.isfile(result_path):
+        return None
+    try:
+        with open(result_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"[ERROR] Invalid script result {result_path}: {e}")
+        return None
+    finally:
+        try:
+            os.remove(result_path)
+        except OSError:
+            pass
@@ -0,0 +1,144 @@
+import asyncio
+from . import Virtuos_tool
+from .async_virtuos import AsyncVirtuos
+
+
+class VirtuosSession:
+    """
+    One connected Virtuos for the whole process, shared by all NiceGUI pages.
+
+    The first page that connects pays for virtuosDLL() -> corbaInfo() ->
+    startConnectionCorba(); every later page borrows the same VirtuosZugriff and
+    AsyncVirtuos worker. Before a connection is handed out again it is checked
+    with isConnected/simStatus and reconnected if necessary. A watchdog task
+    repeats that check while at least one page holds a reference.
+
+    Usage (inside a page):
+        state = await virtuos_session.acquire(start_virtuos=False)
+        if state:
+            vz, avz = virtuos_session.vz, virtuos_session.avz
+        ...
+        virtuos_session.release()  # e.g. from ui.context.client.on_disconnect
+
+    At application exit, virtuos_session.shutdown() disconnects (app.on_shutdown in main.py).
+    Virtuos itself is only stopped if this session started it; an attached Virtuos keeps running.
+    """
+
+    def __init__(self, health_interval=10.0):
+        self.env = None
+        self.avz = None
+        self.refs = 0
+        self.connected = False
+        self.started_virtuos = False  # Virtuos von dieser Sitzung gestartet (acquire mit start_virtuos)
+        self.health_interval = health_interval
+        self._lock = None
+        self._watchdog = None
+
+    @property
+    def vz(self):
+        return self.env.vz if self.env is not None else None
+
+    def _get_lock(self):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    async def acquire(self, start_virtuos=False):
+        """
+        Borrow the shared connection, connecting first if nobody did yet.
+
+        Args:
+            start_virtuos (bool): Start Virtuos and load project_path
+                (connect_to_virtuos) instead of attaching to a running Virtuos.
+
+        Returns:
+            str: "shared" for an existing healthy connection, "reconnected",
+            "started", "open" or "loaded" for a new one, None if connecting failed.
+        """
+        async with self._get_lock():
+            if self.connected:
+                state = "shared"
+                if not await self.avz.call(self.env.is_healthy):
+                    state = await self._reconnect()
+                if state:
+                    self.refs += 1
+                    self._start_watchdog()
+                return state
+
+            if self.env is None:
+                self.env = Virtuos_tool.VirtuosEnv()
+                self.avz = AsyncVirtuos(self.env.vz)
+            if start_virtuos:
+                state = "started" if await self.avz.call(self.env.connect_to_virtuos) else None
+            else:
+                state = await self.avz.call(self.env.connect_to_open_virtuos)
+            if state:
+                self.connected = True
+                self.started_virtuos = state == "started"
+                self.refs += 1
+                self._start_watchdog()
+            return state
+
+    def release(self):
+        """
+        Give back a borrowed connection. When the last reference is returned the
+        watchdog stops; the connection stays open for the next page and is only
+        closed by shutdown().
+        """
+        self.refs = max(self.refs - 1, 0)
+        if self.refs == 0 and self._watchdog is not None:
+            self._watchdog.cancel()
+            self._watchdog = None
+
+    async def _reconnect(self):
+        print("[WARN] Virtuos connection lost, reconnecting...")
+        state = await self.avz.call(self.env.reconnect)
+        if state:
+            print(f"[OK] Virtuos reconnected ({state}).")
+            return "reconnected"
+        print("[ERROR] Virtuos reconnect failed.")
+        self.connected = False
+        return None
+
+    async def ensure_connected(self) -> bool:
+        """
+        Health check plus reconnect, e.g. before a long read/write job.
+        """
+        async with self._get_lock():
+            if not self.connected:
+                return False
+            if await self.avz.call(self.env.is_healthy):
+                return True
+            return await self._reconnect() is not None
+
+    def _start_watchdog(self):
+        if self._watchdog is None or self._watchdog.done():
+            self._watchdog = asyncio.ensure_future(self._watch())
+
+    async def _watch(self):
+        while self.connected and self.refs > 0:
+            await asyncio.sleep(self.health_interval)
+            await self.ensure_connected()
+
+    async def shutdown(self):
+        """
+        Disconnect and stop the worker, regardless of borrowed references.
+        Stops Virtuos only if the session started it.
+        """
+        async with self._get_lock():
+            if self._watchdog is not None:
+                self._watchdog.cancel()
+                self._watchdog = None
+            if self.env is not None and self.connected:
+                await self.avz.call(self.env.disconnect, self.started_virtuos)
+            if self.avz is not None:
+                self.avz.close()
+            self.env = None
+            self.avz = None
+            self.connected = False
+            self.started_virtuos = False
+            self.refs = 0
+
+
+# Gemeinsame Sitzung aller Seiten
+virtuos_session = VirtuosSession()
@@ -1,4 +1,4 @@
-from nicegui import ui
+from nicegui import app, ui
 
 #from lib.screens.nicegui_twincat_manual_test import show_twincat_manual_page
 from lib.screens.nicegui_virtuos_opcua import show_virtuos_server
@@ -7,6 +7,7 @@ from lib.screens.nicegui_twincat_auto import show_twincat_auto_page
 from lib.screens.nicegui_twincat_create_auto import show_twincat_create_auto_page
 from lib.screens.nicegui_twincat_adapter import twinCAT_adapter_operations
 from lib.screens.nicegui_virtuos_robot import  show_virtuos_robot
+from lib.services.virtuos_session import virtuos_session
 
 with ui.tabs().classes('w-full') as tabs:
 
@@ -38,4 +39,7 @@ with ui.tab_panels(tabs, value=virtuos_tab).classes('w-full'):
     with ui.tab_panel(twincat_tab_adapter):
         twinCAT_adapter_operations()
 
+# Gemeinsame Virtuos-Verbindung beim Beenden trennen
+app.on_shutdown(virtuos_session.shutdown)
+
 ui.run(native=True)
\ No newline at end of file
@@ -0,0 +1,86 @@
+import copy
+import os
+import socket
+import sys
+import pytest
+
+# Repository root on sys.path, also for the spawned farm workers
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from lib.services import client, remote, server, Virtuos_tool, virtuos_js  # noqa: E402
+from lib.services.param_schema_cache import ParamSchemaCache  # noqa: E402
+
+
+@pytest.fixture
+def fake_env(monkeypatch, tmp_path):
+    """
+    Fake backend (envVirtuosBackend=fake) with every file the services write redirected
+    to tmp_path, plus fresh module state of Virtuos_tool.
+    """
+    monkeypatch.setenv("envVirtuosBackend", "fake")
+    monkeypatch.setenv("envFakeLatency", "0")
+    monkeypatch.delenv("envFakeModel", raising=False)
+    monkeypatch.setattr(virtuos_js, "TEMP_DIR_JS", str(tmp_path / "JS_Datei"))
+    # eigener Schema-Cache und leere Snapshots je Test
+    monkeypatch.setattr(Virtuos_tool, "schema_cache", ParamSchemaCache(str(tmp_path / "schema.json")))
+    monkeypatch.setattr(Virtuos_tool, "param_snapshots", {})
+    monkeypatch.setattr(Virtuos_tool, "script_results_verified", None)
+    monkeypatch.setattr(Virtuos_tool, "bulk_read_mode", True)
+    monkeypatch.setattr(Virtuos_tool, "bulk_write_mode", True)
+    return tmp_path
+
+
+@pytest.fixture
+def vz(fake_env):
+    """
+    Connected VirtuosZugriff on the fake DLL with the default robot controller model.
+    """
+    vz = remote.VirtuosZugriff()
+    vz.virtuosDLL()
+    assert vz.startConnectionCorba() == vz.V_SUCCD
+    yield vz
+    vz.unloadDLL()
+
+
+KANAL_DATA = {
+    "Kanal_1": {"trafo_names": ["trafo[0].id", "trafo[0].param[0]"], "trafo_values": ["21", "0.5"],
+                "axis_names": ["Axis_1.s_max", "Axis_1.s_min", "Axis_2.ratio"],
+                "axis_values": ["180", "-180", "PI/180"]},
+    "Kanal_2": {"trafo_names": ["trafo[0].id"], "trafo_values": ["7"],
+                "axis_names": ["Axis_1.s_max"], "axis_values": ["90"]},
+}
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def opc_env(monkeypatch):
+    """
+    SERVER_IP/SERVER_PORT of a local test server on a free port (the .env does not override them).
+    """
+    monkeypatch.setenv("SERVER_IP", "127.0.0.1")
+    monkeypatch.setenv("SERVER_PORT", str(_free_port()))
+
+
+@pytest.fixture
+def opc_server(opc_env):
+    """
+    Running OPC UA server (OpcServerRegistry) with KANAL_DATA, JSON variables only.
+    """
+    registry = server.start_opc_server_multi_kanal(copy.deepcopy(KANAL_DATA), structured=False)
+    yield registry
+    server.stop_opc_server(registry)
+
+
+@pytest.fixture
+def opc_client(opc_server):
+    """
+    Encrypted client session on opc_server.
+    """
+    opc = client.connect_opcua_client("user1", "pass1")
+    yield opc
+    client.disconnect_opcua_client(opc)
@@ -0,0 +1,37 @@
+"""
+Batched parameter write through one generated JS script (Virtuos_tool.write_params_to_virtuos_batch).
+"""
+import os
+from lib.services import Virtuos_tool, virtuos_js
+
+BLOCK = "[Block Diagram].[RobotController]"
+
+
+def test_batch_write_in_one_script(vz):
+    assert Virtuos_tool._script_results_available(vz)
+    vz.vi.calls.clear()
+    results = Virtuos_tool.write_params_to_virtuos_batch(vz, BLOCK, ["par_0"], ["5"],
+                                                        ["Axis_1.v_max", "Axis_9.s_max"], ["450", "1"])
+    assert results == {"par_0": True, "Axis_1.v_max": True, "Axis_9.s_max": False}
+    assert vz.vi.calls["interpretJSCode"] == 1 and vz.vi.calls["setParameter"] == 0
+    assert vz.getParameterBlock_New(f"{BLOCK}.[par_0]") == "5"
+
+
+def test_batch_write_without_result_reads_back(vz, monkeypatch):
+    assert Virtuos_tool._script_results_available(vz)
+    run_script = vz.vi._run_script
+
+    def lose_result(code):
+        status = run_script(code)
+        for name in os.listdir(virtuos_js.TEMP_DIR_JS):
+            if name.startswith("write_"):
+                os.remove(os.path.join(virtuos_js.TEMP_DIR_JS, name))
+        return status
+
+    monkeypatch.setattr(vz.vi, "_run_script", lose_result)
+    vz.vi.calls.clear()
+    results = Virtuos_tool.write_params_to_virtuos_batch(vz, BLOCK, ["par_0"], ["5"],
+                                                        ["Axis_1.v_max", "Axis_9.s_max"], ["450", "1"])
+    assert results == {"par_0": True, "Axis_1.v_max": True, "Axis_9.s_max": False}
+    # nur der nicht vorhandene Parameter wird einzeln nachgeschrieben
+    assert vz.vi.calls["setParameter"] == 1
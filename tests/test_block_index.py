@@ -0,0 +1,39 @@
+"""
+Block map index (block_index.BlockIndex): parsing, cache and name lookup.
+"""
+import pytest
+from lib.services.block_index import BlockIndex
+
+NAMES = ["RobotController", "axisController", "Zcontroller", "Conveyor", "aController", "Sensor_1"]
+
+
+@pytest.fixture
+def map_path(tmp_path):
+    lines = ["//Model uuids"]
+    lines += [f"uuid_{i} = [Block Diagram].[Sub].[{name}];" for i, name in enumerate(NAMES)]
+    lines += ["//Port uuids", "p0 = [Block Diagram].[Sub].[RobotController].[Programs].[Main];"]
+    path = tmp_path / "Block Diagram.map"
+    path.write_text("\n".join(lines), encoding="utf-8")
+    return str(path)
+
+
+def reference_find(keyword):
+    # Filter der Seiten vor dem Index
+    return sorted(name for name in NAMES if keyword.lower() in name.lower())
+
+
+@pytest.mark.parametrize("keyword", ["Controller", "con", "C", "", "robotc", "missing"])
+def test_find_matches_plain_sorted_filter(map_path, tmp_path, keyword):
+    index = BlockIndex(map_path, cache_filename=str(tmp_path / "index.json")).load()
+    assert index.find(keyword) == reference_find(keyword)
+    assert index.find(keyword) == reference_find(keyword)  # memoisiert
+
+
+def test_cache_reused_until_map_changes(map_path, tmp_path):
+    cache = str(tmp_path / "index.json")
+    BlockIndex(map_path, cache_filename=cache).load()
+    index = BlockIndex(map_path, cache_filename=cache)
+    index._parse = lambda: pytest.fail("map parsed although the cache is valid")
+    index.load()
+    assert index.get_path("[RobotController]") == "[Block Diagram].[Sub].[RobotController]"
+    assert "[Block Diagram].[Sub].[RobotController]" in index.controller_paths
@@ -0,0 +1,26 @@
+"""
+Bulk parameter read through one generated JS script (Virtuos_tool.read_Value_Model_json, bulk=True).
+"""
+from lib.services import Virtuos_tool
+
+BLOCK = "[Block Diagram].[RobotController]"
+
+
+def test_bulk_read_matches_per_call_read(vz):
+    per_call = Virtuos_tool.read_Value_Model_json(vz, BLOCK, use_schema_cache=False, bulk=False)
+    calls_before = sum(vz.vi.calls.values())
+    bulk = Virtuos_tool.read_Value_Model_json(vz, BLOCK, use_schema_cache=False, bulk=True)
+    assert bulk == per_call
+    assert per_call[0]["trafo[0].id"] == "21"
+    assert per_call[1]["Axis_6.a_max"] == "1000"
+    # Probe-Skript + ein Leseskript statt eines Aufrufs je Parameter
+    assert sum(vz.vi.calls.values()) - calls_before == 2
+
+
+def test_bulk_mode_off_when_scripts_return_nothing(vz, monkeypatch):
+    monkeypatch.setattr(vz.vi, "_run_script", lambda code: vz.V_SUCCD)
+    trafo, axis = Virtuos_tool.read_Value_Model_json(vz, BLOCK, use_schema_cache=False)
+    assert trafo and axis
+    assert Virtuos_tool.script_results_verified is False
+    assert not Virtuos_tool.bulk_read_mode and not Virtuos_tool.bulk_write_mode
+    assert vz.vi.calls["interpretJSCode"] == 1  # nur das Probe-Skript
@@ -0,0 +1,86 @@
+"""
+Buffered change feed (change_feed.changed_values) and SignalRecorder.record_changes
+on the FIFO of the fake DLL.
+"""
+import threading
+import time
+import numpy as np
+from ctypes import c_int32, c_long, pointer
+from lib.services.change_feed import changed_values
+from lib.services.signal_recorder import SignalRecorder, SignalRecording
+
+BLOCK = "[Block Diagram].[RobotController]"
+AXIS_1, AXIS_2, AXIS_3 = (f"{BLOCK}.[Axis_{i}_Pos]" for i in (1, 2, 3))
+
+
+def every_step(model, step):
+    model.ports[AXIS_1]["value"] = float(step)
+    if step % 2 == 0:
+        model.ports[AXIS_2]["value"] = float(step)
+
+
+def collect_changes(vz, steps):
+    """
+    Run the feed in a thread, step the simulation while it waits for sets and
+    return everything it yielded.
+    """
+    vz.vi.model.step_hooks.append(every_step)
+    stop = threading.Event()
+    received = []
+
+    def consume():
+        for item in changed_values(vz, [AXIS_1, AXIS_2, AXIS_3], update_rate_ms=1, stop_event=stop):
+            received.append(item)
+
+    thread = threading.Thread(target=consume)
+    thread.start()
+    end = time.time() + 2
+    while not (vz.vi.buffered and vz.vi.cyclic_update) and time.time() < end:
+        time.sleep(0.001)
+    with vz.lock:  # alle Schritte landen in der FIFO, bevor das erste Set abgeholt wird
+        for _ in range(steps):
+            vz.vi.step()
+    while len(received) < steps and time.time() < end:
+        time.sleep(0.001)
+    stop.set()
+    thread.join()
+    return received
+
+
+def test_feed_yields_only_changed_ports(vz):
+    received = collect_changes(vz, 4)
+    assert [changes for _, changes in received] == [
+        {AXIS_1: 1.0, AXIS_2: 0.0, AXIS_3: 0.0},  # erstes Set: alles neu
+        {AXIS_1: 2.0, AXIS_2: 2.0},
+        {AXIS_1: 3.0},
+        {AXIS_1: 4.0, AXIS_2: 4.0},
+    ]
+    assert [set_index for set_index, _ in received] == [1, 2, 3, 4]
+    assert not vz.vi.buffered and not vz.vi.cyclic_update
+
+
+def test_fifo_drops_oldest_sets(vz):
+    vz.vi.model.step_hooks.append(every_step)
+    assert vz.setBufferedMode(True, 2) == vz.V_SUCCD
+    vz.vi.startCyclicUpdate(1)
+    for _ in range(3):
+        vz.vi.step()
+    remaining, fill = c_int32(0), c_long(0)
+    assert vz.vi.updateCurrentSet(pointer(remaining), pointer(fill)) == vz.V_SUCCD
+    assert (remaining.value, fill.value) == (1, 50)
+    _, value_ids = vz.readValueID(AXIS_1)
+    assert vz.readValue(value_ids) == (vz.V_SUCCD, [2.0])  # Set 1 ist herausgefallen
+    assert vz.vi.updateCurrentSet(pointer(remaining), pointer(fill)) == vz.V_SUCCD
+    assert vz.vi.updateCurrentSet(pointer(remaining), pointer(fill)) == vz.V_DAMGD  # FIFO leer
+    vz.vi.stopCyclicUpdate()
+
+
+def test_recorder_keeps_last_value_of_unchanged_ports(vz, tmp_path):
+    received = collect_changes(vz, 4)
+    path = str(tmp_path / "changes.vsig")
+    recorder = SignalRecorder(path, [AXIS_1, AXIS_2, AXIS_3])
+    recorder.record_changes(iter(received))
+    recorder.close()
+    _, set_indices, values = SignalRecording(path).time_slice()
+    assert list(set_indices) == [1, 2, 3, 4]
+    np.testing.assert_array_equal(values, [[1, 0, 0], [2, 2, 0], [3, 2, 0], [4, 4, 0]])
@@ -0,0 +1,68 @@
+"""
+CyclicUpdater and the vz.lock around DLL calls, on the fake backend.
+"""
+import threading
+import time
+from lib.services.cyclic_update import CyclicUpdater
+
+BLOCK = "[Block Diagram].[RobotController]"
+
+
+def wait_until(condition, timeout=2.0):
+    end = time.time() + timeout
+    while not condition():
+        if time.time() > end:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+def test_updater_samples_registered_ports(vz):
+    updater = CyclicUpdater(vz, update_rate_ms=1, capacity=16)
+    updater.register([f"{BLOCK}.[Axis_1_Pos]"])
+    assert updater.start() == vz.V_SUCCD
+    assert wait_until(lambda: updater.ring.count >= 3)
+    assert updater.stop() == vz.V_SUCCD
+    assert not updater.running and vz.continueUpdate == 0
+    timestamps, set_indices, values = updater.ring.snapshot()
+    assert values.shape[1] == 1 and list(set_indices) == sorted(set_indices)
+
+
+def test_hanging_thread_is_not_restarted(vz, monkeypatch):
+    updater = CyclicUpdater(vz, update_rate_ms=1)
+    release = threading.Event()
+    monkeypatch.setattr(updater, "update_once", lambda: release.wait() and vz.V_SUCCD)
+    assert updater.start() == vz.V_SUCCD
+    updater.stop(timeout=0.05)
+    assert updater.running
+    assert updater.start() == vz.V_DAMGD  # kein zweiter Thread neben dem alten
+    release.set()
+    assert wait_until(lambda: not updater.running)
+    assert updater.start() == vz.V_SUCCD
+    updater.stop()
+
+
+def test_failing_update_resets_state(vz, monkeypatch):
+    updater = CyclicUpdater(vz, update_rate_ms=1)
+
+    def fail():
+        raise RuntimeError("lost connection")
+
+    monkeypatch.setattr(updater, "update_once", fail)
+    assert updater.start() == vz.V_SUCCD
+    assert wait_until(lambda: not updater.running)
+    assert vz.continueUpdate == 0
+    assert not vz.vi.cyclic_update
+    assert updater.start() == vz.V_SUCCD  # Neustart nach dem Fehler moeglich
+    updater.stop()
+
+
+def test_dll_methods_wait_for_the_lock(vz):
+    done = threading.Event()
+    with vz.lock:
+        thread = threading.Thread(
+            target=lambda: (vz.getParameterBlock_New(f"{BLOCK}.[par_0]"), done.set()))
+        thread.start()
+        assert not done.wait(0.1)
+    assert done.wait(2.0)
+    thread.join()
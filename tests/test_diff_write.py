@@ -0,0 +1,40 @@
+"""
+Diff-aware write-back against the last read/write snapshot (Virtuos_tool.write_changed_params_to_virtuos).
+"""
+from lib.services import Virtuos_tool
+
+BLOCK = "[Block Diagram].[RobotController]"
+
+
+def write_changed(vz, trafo, axis):
+    return Virtuos_tool.write_changed_params_to_virtuos(
+        vz, BLOCK, list(trafo), list(trafo.values()), list(axis), list(axis.values()))
+
+
+def test_changed_write_sends_only_differences(vz):
+    trafo, axis = Virtuos_tool.read_Value_Model_json(vz, BLOCK, bulk=False)
+    axis = dict(axis, **{"Axis_1.v_max": "450"})
+    results, skipped = write_changed(vz, trafo, axis)
+    assert results == {"Axis_1.v_max": True}
+    assert skipped == len(trafo) + len(axis) - 1
+    assert vz.getParameterBlock_New(f"{BLOCK}.[Axis_1.v_max]") == "450"
+
+
+def test_equal_numbers_count_as_unchanged(vz):
+    trafo, axis = Virtuos_tool.read_Value_Model_json(vz, BLOCK, bulk=False)
+    axis = dict(axis, **{"Axis_1.v_max": "500.0"})  # gelesen als "500"
+    results, _ = write_changed(vz, trafo, axis)
+    assert results == {}
+
+
+def test_local_name_write_then_canonical_write_back(vz):
+    trafo, axis = Virtuos_tool.read_Value_Model_json(vz, BLOCK, bulk=False)
+    assert trafo["trafo[0].param[3]"] == "0"
+    # z.B. param_sweep: Virtuos-Namen par_3 / KinID
+    Virtuos_tool.write_params_to_virtuos_batch(vz, BLOCK, ["par_3", "KinID"], ["7", "22"], [], [])
+    assert vz.getParameterBlock_New(f"{BLOCK}.[par_3]") == "7"
+    # Rueckschreiben der alten OPC-UA-Werte unter den Lesenamen muss wirklich schreiben
+    results, _ = write_changed(vz, trafo, axis)
+    assert results == {"trafo[0].param[3]": True, "trafo[0].id": True}
+    assert vz.getParameterBlock_New(f"{BLOCK}.[par_3]") == "0"
+    assert vz.getParameterBlock_New(f"{BLOCK}.[KinID]") == "21"
@@ -0,0 +1,32 @@
+"""
+DLL signatures and the reused parameter buffers of VirtuosZugriff.
+"""
+import threading
+from lib.services import remote
+
+BLOCK = "[Block Diagram].[RobotController]"
+
+
+def test_signatures_are_well_formed_and_skipped_for_fake(vz):
+    for name, (argtypes, restype) in remote.DLL_SIGNATURES.items():
+        assert isinstance(argtypes, list), name
+        assert restype is not None, name
+    assert vz.declareSignatures() == 0
+
+
+def test_parameter_buffer_reused_per_thread(vz):
+    first = vz.parameterBuffer()
+    assert vz.parameterBuffer()[0] is first[0]
+    # groesserer Bedarf ersetzt den Puffer
+    assert len(vz.parameterBuffer(8192)[0]) == 8192
+    other = []
+    thread = threading.Thread(target=lambda: other.append(vz.parameterBuffer()[0]))
+    thread.start()
+    thread.join()
+    assert other[0] is not vz.parameterBuffer()[0]
+
+
+def test_long_parameter_value_read_back(vz):
+    value = "x" * 5000
+    assert vz.setParameterBlock(f"{BLOCK}.[par_0]", value) == vz.V_SUCCD
+    assert vz.getParameterBlock_New(f"{BLOCK}.[par_0]") == value
@@ -0,0 +1,45 @@
+"""
+The in-process fake of the Virtuos interface DLL (lib/services/fake_virtuos.py).
+Run the suite with: python -m pytest -q tests
+"""
+from lib.services import remote
+from lib.services.fake_virtuos import FakeBlockModel, FakeVirtuosInterface
+
+BLOCK = "[Block Diagram].[RobotController]"
+
+
+def test_backend_selected_by_env(vz):
+    assert isinstance(vz.vi, FakeVirtuosInterface)
+    assert vz.isConnected() == vz.V_SUCCD
+    assert vz.isOpen() == vz.V_SUCCD
+
+
+def test_parameters_round_trip(vz):
+    assert vz.getParameterBlock_New(f"{BLOCK}.[KinID]") == "21"
+    assert vz.setParameterBlock(f"{BLOCK}.[par_3]", "1.5") == vz.V_SUCCD
+    assert vz.getParameterBlock_New(f"{BLOCK}.[par_3]") == "1.5"
+    assert vz.setParameterBlock(f"{BLOCK}.[missing]", "1") == vz.V_DAMGD
+    assert vz.vi.calls["setParameter"] == 2
+
+
+def test_model_from_file(fake_env, monkeypatch):
+    model = FakeBlockModel.robot_controller("[Block Diagram].[Other]", axes=1, trafo_params=2)
+    path = fake_env / "model.json"
+    path.write_text('{"parameters": %s}' % __import__("json").dumps(model.parameters), encoding="utf-8")
+    monkeypatch.setenv("envFakeModel", str(path))
+    vz = remote.VirtuosZugriff()
+    vz.virtuosDLL()
+    assert vz.getParameterBlock_New("[Block Diagram].[Other].[par_1]") == "0"
+    assert vz.getParameterBlock_New(f"{BLOCK}.[KinID]") is None
+
+
+def test_simulation_steps_and_ports(vz):
+    assert vz.rampUpSim() == vz.V_SUCCD
+    for _ in range(3):
+        assert vz.simStep() == vz.V_SUCCD
+    assert vz.vi.step_count == 3
+    status, value_ids = vz.readValueID([f"{BLOCK}.[Axis_1_Pos]"])
+    assert status == vz.V_SUCCD
+    assert vz.writeValue(value_ids, [12.5]) == vz.V_SUCCD
+    status, values = vz.readValue(value_ids)
+    assert status == vz.V_SUCCD and values == [12.5]
@@ -0,0 +1,29 @@
+"""
+Forced-port tracking of VirtuosZugriff.writeValue (forcedValueIDs).
+"""
+BLOCK = "[Block Diagram].[RobotController]"
+PORTS = [f"{BLOCK}.[Axis_1_Pos]", f"{BLOCK}.[Axis_2_Pos]"]
+
+
+def test_ports_forced_once(vz):
+    _, value_ids = vz.readValueID(PORTS)
+    assert vz.writeValue(value_ids, [1.0, 2.0]) == vz.V_SUCCD
+    assert vz.writeValue(value_ids, [3.0, 4.0]) == vz.V_SUCCD
+    assert vz.vi.calls["setForced"] == len(PORTS)
+    assert vz.readValue(value_ids) == (vz.V_SUCCD, [3.0, 4.0])
+
+
+def test_forced_again_after_unforce_and_interface_change(vz):
+    _, value_ids = vz.readValueID(PORTS)
+    vz.writeValue(value_ids, [1.0, 2.0])
+    assert vz.unforcePorts() == vz.V_SUCCD
+    vz.writeValue(value_ids, [1.0, 2.0])
+    assert vz.vi.calls["setForced"] == 2 * len(PORTS)
+
+    vz.rampUpSim()
+    vz.writeValue(value_ids, [1.0, 2.0])  # alte ValueIDs: Schnittstelle geaendert
+    assert vz.forcedValueIDs == set()
+    _, value_ids = vz.readValueID(PORTS)
+    vz.vi.calls.clear()
+    assert vz.writeValue(value_ids, [5.0, 6.0]) == vz.V_SUCCD
+    assert vz.vi.calls["setForced"] == len(PORTS)
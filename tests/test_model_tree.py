@@ -0,0 +1,29 @@
+"""
+Parameter listing from the Virtuos model tree (VirtuosZugriff.listModelChildren, virtuos_model_tree=1).
+"""
+from lib.services import Virtuos_tool
+
+BLOCK = "[Block Diagram].[RobotController]"
+
+
+def test_list_model_children(vz):
+    status, names = vz.listModelChildren(BLOCK)
+    assert status == vz.V_SUCCD
+    assert {"KinID", "par_0", "par_31", "Axis_1.v_max", "Axis_6.a_max"} <= set(names)
+    assert vz.listModelChildren("[Block Diagram].[Missing]")[0] == vz.V_DAMGD
+
+
+def test_model_tree_read_matches_probing(vz, monkeypatch):
+    probed = Virtuos_tool.read_Value_Model_json(vz, BLOCK, use_schema_cache=False, bulk=False)
+    monkeypatch.setattr(Virtuos_tool, "model_tree_mode", True)
+    vz.vi.calls.clear()
+    listed = Virtuos_tool.read_Value_Model_json(vz, BLOCK, use_schema_cache=False, bulk=False)
+    assert listed == probed
+    # nur die vorhandenen Parameter werden gelesen, kein Probing
+    assert vz.vi.calls["getParameter"] == len(probed[0]) + len(probed[1])
+
+
+def test_missing_block_falls_back_to_probing(vz, monkeypatch):
+    monkeypatch.setattr(Virtuos_tool, "model_tree_mode", True)
+    assert Virtuos_tool._list_block_params(vz, "[Block Diagram].[Missing]") is None
+    assert Virtuos_tool.model_tree_mode
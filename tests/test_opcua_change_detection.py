@@ -0,0 +1,44 @@
+"""
+Skipping unchanged Kanal config writes (server.update_kanal_axis_config, content hashes).
+"""
+import json
+from lib.services import server
+from conftest import KANAL_DATA
+
+
+class Recorder:
+    def __init__(self):
+        self.values = []
+
+    def datachange_notification(self, node, val, data):
+        self.values.append(val)
+
+
+def test_unchanged_update_is_skipped(opc_server):
+    recorder = Recorder()
+    handles = opc_server.subscribe_data_change(recorder)
+    try:
+        assert server.update_all_kanal_configs(opc_server, KANAL_DATA) == []
+        changed = dict(KANAL_DATA, Kanal_2=dict(KANAL_DATA["Kanal_2"], axis_values=["95"]))
+        assert server.update_all_kanal_configs(opc_server, changed) == ["Kanal_2"]
+    finally:
+        opc_server.unsubscribe_data_change(handles)
+    assert len(recorder.values) == 1
+
+
+def test_client_write_with_other_formatting_counts_as_same(opc_server, opc_client):
+    node = opc_client.get_root_node().get_child(["0:Objects", "2:Kanal_2", "2:AxisConfigJSON"])
+    # client.py schreibt mit indent=2 und anderer Schluesselreihenfolge
+    node.set_value(json.dumps({"param_values": ["90"], "param_names": ["Axis_1.s_max"]}, indent=2))
+    assert not server.update_axis_config(opc_server, "Kanal_2", ["Axis_1.s_max"], ["90"])
+
+    node.set_value(json.dumps({"param_names": ["Axis_1.s_max"], "param_values": ["45"]}, indent=2))
+    # Inhalt hat sich durch den Client geaendert, der alte Stand wird wieder geschrieben
+    assert server.update_axis_config(opc_server, "Kanal_2", ["Axis_1.s_max"], ["90"])
+
+
+def test_content_hash_ignores_formatting():
+    compact = json.dumps({"param_names": ["a"], "param_values": ["1"]})
+    pretty = json.dumps({"param_values": ["1"], "param_names": ["a"]}, indent=2)
+    assert server.OpcServerRegistry.content_hash(compact) == server.OpcServerRegistry.content_hash(pretty)
+    assert server.OpcServerRegistry.content_hash("not json") != server.OpcServerRegistry.content_hash(compact)
@@ -0,0 +1,54 @@
+"""
+In-process change listener on the Kanal JSON variables (OpcServerRegistry.subscribe_data_change).
+"""
+import asyncio
+import json
+from lib.services import server
+from lib.services.opcua_tool import ConfigChangeHandler
+
+
+class Recorder:
+    def __init__(self):
+        self.changes = []
+
+    def datachange_notification(self, node, val, data):
+        self.changes.append((node.nodeid, json.loads(val)["param_values"]))
+
+
+def test_listener_sees_server_and_client_writes(opc_server, opc_client):
+    recorder = Recorder()
+    handles = opc_server.subscribe_data_change(recorder, ["Kanal_2"])
+    assert [(kanal, param_type) for kanal, param_type, _ in handles] == \
+        [("Kanal_2", "TrafoConfigJSON"), ("Kanal_2", "AxisConfigJSON")]
+    axis_var = opc_server.json_var("Kanal_2", "AxisConfigJSON")
+
+    server.update_axis_config(opc_server, "Kanal_2", ["Axis_1.s_max"], ["80"])
+    server.update_axis_config(opc_server, "Kanal_1", ["Axis_1.s_max"], ["80"])  # nicht abonniert
+    node = opc_client.get_root_node().get_child(["0:Objects", "2:Kanal_2", "2:AxisConfigJSON"])
+    node.set_value(json.dumps({"param_names": ["Axis_1.s_max"], "param_values": ["70"]}))
+    assert recorder.changes == [(axis_var.nodeid, ["80"]), (axis_var.nodeid, ["70"])]
+
+    opc_server.unsubscribe_data_change(handles)
+    server.update_axis_config(opc_server, "Kanal_2", ["Axis_1.s_max"], ["60"])
+    assert len(recorder.changes) == 2
+
+
+def test_config_change_handler_debounces(opc_server):
+    async def run():
+        applied = []
+
+        async def apply():
+            applied.append(opc_server.json_var("Kanal_2", "AxisConfigJSON").get_value())
+
+        handler = ConfigChangeHandler(apply, asyncio.get_running_loop(), delay_sec=0.05)
+        handles = opc_server.subscribe_data_change(handler, ["Kanal_2"])
+        try:
+            for value in ("1", "2", "3"):
+                await asyncio.to_thread(server.update_axis_config, opc_server, "Kanal_2", ["Axis_1.s_max"], [value])
+            await asyncio.sleep(0.2)
+        finally:
+            opc_server.unsubscribe_data_change(handles)
+        return applied
+
+    applied = asyncio.run(run())
+    assert len(applied) == 1 and json.loads(applied[0])["param_values"] == ["3"]
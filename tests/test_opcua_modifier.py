@@ -0,0 +1,30 @@
+"""
+ModifierTrail written and read as one batch, and the UpdateModifier method.
+"""
+from lib.services import client, server
+
+
+def test_server_side_write_and_read(opc_server):
+    assert server.read_modifier_info(opc_server)["modifier"] == "Unknown"
+    assert server.update_modifier_info(opc_server, "Server", "Kanal_1/Axis", "Update_AxisConfigJSON", "S1")
+    info = server.read_modifier_info(opc_server)
+    assert (info["modifier"], info["modified_node"], info["operation"], info["session_id"]) == \
+        ("Server", "Kanal_1/Axis", "Update_AxisConfigJSON", "S1")
+    assert info["modified_time"]
+
+
+def test_client_updates_trail_through_method(opc_server, opc_client):
+    assert client.update_modifier_info_via_client(opc_client, "TwinCAT", "Kanal_2/Trafo", "Sync", "C7")
+    _, _, _, method_node = client.get_modifier_nodes(opc_client)
+    assert method_node is not None
+    assert client.get_modifier_nodes(opc_client)[3] is method_node  # einmal je Client aufgeloest
+    info = client.read_modifier_info(opc_client)
+    assert info == server.read_modifier_info(opc_server)
+    assert (info["modifier"], info["session_id"]) == ("TwinCAT", "C7")
+
+
+def test_client_falls_back_to_batched_write(opc_server, opc_client, monkeypatch):
+    idx, modifier_node, field_nodes, _ = client.get_modifier_nodes(opc_client)
+    monkeypatch.setitem(client._modifier_nodes, opc_client, (idx, modifier_node, field_nodes, None))
+    assert client.update_modifier_info_via_client(opc_client, "OldServerPath", "Kanal_1", "Sync", "C8")
+    assert server.read_modifier_info(opc_server)["modifier"] == "OldServerPath"
@@ -0,0 +1,27 @@
+"""
+Node handles kept by server.OpcServerRegistry.
+"""
+import pytest
+from lib.services import server
+
+
+def test_handles_match_address_space(opc_server):
+    objects = opc_server.server.get_objects_node()
+    for kanal, kanal_node in opc_server.kanal_nodes.items():
+        assert objects.get_child([f"2:{kanal}"]).nodeid == kanal_node.nodeid
+        for param_type, json_var in opc_server.json_vars[kanal].items():
+            assert kanal_node.get_child([f"2:{param_type}"]).nodeid == json_var.nodeid
+    assert set(opc_server.modifier_vars) == set(server.MODIFIER_FIELDS)
+
+
+def test_read_helpers_use_registry(opc_server):
+    data = server.read_kanal_data_from_server_instance(opc_server, "Kanal_2")
+    assert data == {"trafo_names": ["trafo[0].id"], "trafo_values": ["7"],
+                    "axis_names": ["Axis_1.s_max"], "axis_values": ["90"]}
+    assert set(server.read_all_kanal_data_from_server_instance(opc_server)) == {"Kanal_1", "Kanal_2"}
+
+
+def test_unknown_kanal(opc_server):
+    with pytest.raises(KeyError, match="Kanal_9 has no AxisConfigJSON"):
+        opc_server.json_var("Kanal_9", "AxisConfigJSON")
+    assert server.read_kanal_data_from_server_instance(opc_server, "Kanal_9")["axis_names"] == []
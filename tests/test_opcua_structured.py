@@ -0,0 +1,66 @@
+"""
+Typed per-parameter OPC UA variables next to the JSON blobs (server.add_kanal_structure).
+"""
+import copy
+import json
+import math
+import time
+import pytest
+from opcua import ua
+from lib.services import server
+from lib.services.client import connect_opcua_client
+from conftest import KANAL_DATA
+
+
+@pytest.fixture
+def structured_server(opc_env):
+    registry = server.start_opc_server_multi_kanal(copy.deepcopy(KANAL_DATA), structured=True)
+    yield registry
+    server.stop_opc_server(registry)
+
+
+def axis_json(registry, kanal="Kanal_1"):
+    return json.loads(registry.json_var(kanal, "AxisConfigJSON").get_value())
+
+
+def test_variables_typed_by_value(structured_server):
+    nodes = structured_server.structured["Kanal_1"]["AxisConfigJSON"]
+    assert nodes["Axis_1.s_max"].get_value() == 180.0
+    assert nodes["Axis_1.s_max"].get_data_type_as_variant_type() == ua.VariantType.Double
+    assert nodes["Axis_2.ratio"].get_value() == "PI/180"
+    kanal = structured_server.kanal_nodes["Kanal_1"]
+    assert kanal.get_child(["2:Axis_1", "2:s_max"]).nodeid == nodes["Axis_1.s_max"].nodeid
+    trafo = structured_server.structured["Kanal_1"]["TrafoConfigJSON"]
+    assert kanal.get_child(["2:Trafo", "2:trafo[0].param[0]"]).nodeid == trafo["trafo[0].param[0]"].nodeid
+
+
+def test_json_update_reaches_variables(structured_server):
+    server.update_axis_config(structured_server, "Kanal_1", ["Axis_1.s_max", "Axis_1.s_min", "Axis_2.ratio"],
+                              ["170", "-180", "PI/90"])
+    nodes = structured_server.structured["Kanal_1"]["AxisConfigJSON"]
+    assert nodes["Axis_1.s_max"].get_value() == 170.0
+    assert nodes["Axis_2.ratio"].get_value() == "PI/90"
+
+
+def test_client_write_to_variable_reaches_json(structured_server):
+    opc = connect_opcua_client("user1", "pass1")
+    try:
+        node = opc.get_root_node().get_child(["0:Objects", "2:Kanal_1", "2:Axis_1", "2:s_max"])
+        node.set_value(ua.DataValue(ua.Variant(150.0, ua.VariantType.Double)))
+        end = time.time() + 2
+        while axis_json(structured_server)["param_values"][0] != "150" and time.time() < end:
+            time.sleep(0.01)
+    finally:
+        opc.disconnect()
+    assert axis_json(structured_server)["param_values"] == ["150", "-180", "PI/180"]
+
+
+def test_expression_marks_double_variable_bad(structured_server):
+    names = ["Axis_1.s_max", "Axis_1.s_min", "Axis_2.ratio"]
+    server.update_axis_config(structured_server, "Kanal_1", names, ["PI", "-180", "PI/180"])
+    node = structured_server.structured["Kanal_1"]["AxisConfigJSON"]["Axis_1.s_max"]
+    value = structured_server.server.iserver.aspace.get_attribute_value(node.nodeid, ua.AttributeIds.Value)
+    assert value.StatusCode.value == ua.StatusCodes.BadTypeMismatch and math.isnan(value.Value.Value)
+    assert axis_json(structured_server)["param_values"][0] == "PI"  # kein NaN zurueck ins JSON
+    server.update_axis_config(structured_server, "Kanal_1", names, ["120", "-180", "PI/180"])
+    assert node.get_value() == 120.0
@@ -0,0 +1,42 @@
+"""
+Parameter schema cache (param_schema_cache.ParamSchemaCache) and its use in read_Value_Model_json.
+"""
+import os
+from lib.services import Virtuos_tool
+from lib.services.param_schema_cache import ParamSchemaCache
+
+BLOCK = "[Block Diagram].[RobotController]"
+
+
+def test_schema_cache_limits_second_read(vz):
+    Virtuos_tool.read_Value_Model_json(vz, BLOCK, bulk=False)
+    names = Virtuos_tool.schema_cache.get(BLOCK)
+    vz.vi.calls.clear()
+    Virtuos_tool.read_Value_Model_json(vz, BLOCK, bulk=False)
+    assert vz.vi.calls["getParameter"] == len(names)
+
+
+def test_cache_survives_reload_and_drops_other_project(tmp_path):
+    project = tmp_path / "robot.vmod"
+    project.write_text("v1", encoding="utf-8")
+    cache_path = str(tmp_path / "schema.json")
+    cache = ParamSchemaCache(cache_path)
+    cache.bind_project(str(project))
+    cache.put(BLOCK, ["KinID", "par_0"])
+
+    reloaded = ParamSchemaCache(cache_path)
+    reloaded.bind_project(str(project))
+    assert reloaded.get(BLOCK) == ["KinID", "par_0"]
+
+    # neu gespeichertes Projekt: Eintraege verfallen
+    os.utime(project, (0, 0))
+    reloaded.bind_project(str(project))
+    assert reloaded.get(BLOCK) is None
+
+
+def test_failed_save_keeps_entry_in_memory(tmp_path):
+    blocker = tmp_path / "not_a_dir"
+    blocker.write_text("", encoding="utf-8")
+    cache = ParamSchemaCache(str(blocker / "schema.json"))
+    cache.put(BLOCK, ["par_0"])
+    assert cache.get(BLOCK) == ["par_0"]
@@ -0,0 +1,30 @@
+"""
+Resumable parameter sweeps (param_sweep.ParameterSweep).
+"""
+import os
+from lib.services.param_sweep import ParameterSweep, parameter_grid, point_id
+
+BLOCK = "[Block Diagram].[RobotController]"
+
+
+def test_point_id_ignores_order_and_number_format():
+    assert point_id({"par_0": 1, "Axis_1.v_max": "500"}) == point_id({"Axis_1.v_max": 500.0, "par_0": "1.0"})
+    assert point_id({"par_0": 1}) != point_id({"par_0": 2})
+
+
+def test_sweep_resumes_missing_points(vz, fake_env):
+    out_dir = str(fake_env / "sweep")
+    points = parameter_grid(par_0=[1, 2, 3])
+    ports = [f"{BLOCK}.[Axis_1_Pos]"]
+    sweep = ParameterSweep(vz, BLOCK, points, ports, steps=10, sample_every=5, out_dir=out_dir)
+    manifest = sweep.run()
+    assert [p["status"] for p in manifest["points"]] == ["done"] * 3
+    assert sweep.collect()["values"].shape == (9, 1)
+
+    lost = manifest["points"][1]
+    os.remove(os.path.join(out_dir, lost["file"]))
+    vz.vi.calls.clear()
+    resumed = ParameterSweep(vz, BLOCK, points, ports, steps=10, sample_every=5, out_dir=out_dir).run()
+    assert [p["status"] for p in resumed["points"]] == ["done"] * 3
+    assert vz.vi.calls["reset"] == 1  # nur der fehlende Punkt wurde neu gerechnet
+    assert os.path.isfile(os.path.join(out_dir, lost["file"]))
@@ -0,0 +1,46 @@
+"""
+Prepared bulk port access (port_io.PortSet).
+"""
+import numpy as np
+import pytest
+from lib.services.port_io import PortSet
+from lib.services.remote import VIODataType
+
+BLOCK = "[Block Diagram].[RobotController]"
+PORTS = [f"{BLOCK}.[Axis_1_Pos]", f"{BLOCK}.[Axis_2_Pos]"]
+
+
+def test_write_and_read_round_trip(vz):
+    ports = PortSet(vz, PORTS)
+    assert list(ports.write([1.5, -2.0])) == [vz.V_SUCCD] * 2
+    values, status = ports.read()
+    assert list(values) == [1.5, -2.0] and list(status) == [vz.V_SUCCD] * 2
+
+
+def test_mixed_types_and_missing_port(vz):
+    vz.vi.model.add_port(f"{BLOCK}.[Counter]", "INT32", 7)
+    ports = PortSet(vz, PORTS + [f"{BLOCK}.[Counter]", f"{BLOCK}.[NoSuchPort]"],
+                    [VIODataType.V_IO_TYPE_REAL64] * 2 + [VIODataType.V_IO_TYPE_INT32] * 2)
+    values, status = ports.read()
+    assert values[2] == 7 and np.isnan(values[3])
+    assert status[3] == vz.V_DAMGD
+
+
+def test_reprepares_after_interface_change(vz):
+    ports = PortSet(vz, PORTS)
+    ports.write([3.0, 4.0])
+    vz.rampUpSim()
+    vz.vi.calls.clear()
+    values, status = ports.read()
+    assert list(values) == [3.0, 4.0]
+    assert vz.vi.calls["getValueID"] == len(PORTS)
+
+
+@pytest.mark.parametrize("data_type", [VIODataType.V_IO_TYPE_INT64, VIODataType.V_IO_TYPE_UINT64])
+def test_64_bit_integer_ports_rejected(vz, data_type):
+    vz.vi.model.add_port(f"{BLOCK}.[Ticks]", data_type.name.replace("V_IO_TYPE_", ""), 2**53 + 1)
+    with pytest.raises(ValueError, match="64-bit"):
+        PortSet(vz, [f"{BLOCK}.[Ticks]"], data_type)
+    # readValue liefert den Wert exakt
+    _, value_ids = vz.readValueID(f"{BLOCK}.[Ticks]", data_type)
+    assert vz.readValue(value_ids, data_type) == (vz.V_SUCCD, [2**53 + 1])
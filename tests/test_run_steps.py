@@ -0,0 +1,41 @@
+"""
+Batched simulation stepping with port sampling (VirtuosZugriff.runSteps).
+"""
+import numpy as np
+from lib.services.port_io import PortSet
+
+BLOCK = "[Block Diagram].[RobotController]"
+PORTS = [f"{BLOCK}.[Axis_1_Pos]", f"{BLOCK}.[Axis_2_Pos]"]
+
+
+def ramp(model, step):
+    model.ports[PORTS[0]]["value"] = float(step)
+    model.ports[PORTS[1]]["value"] = -float(step)
+
+
+def test_samples_every_kth_step(vz):
+    vz.vi.model.step_hooks.append(ramp)
+    status, samples = vz.runSteps(10, PORTS, everyK=3)
+    assert status == vz.V_SUCCD
+    np.testing.assert_array_equal(samples, [[3, -3], [6, -6], [9, -9]])
+    assert vz.vi.calls["step"] == 10
+
+
+def test_port_set_reused_and_solver_names(vz):
+    vz.vi.model.step_hooks.append(ramp)
+    vz.runSteps(2, PORTS)
+    vz.vi.calls.clear()
+    status, samples = vz.runSteps(2, PORTS, solverNames=["Solver_1"])
+    assert status == vz.V_SUCCD and samples.shape == (2, 2)
+    assert vz.vi.calls["getValueID"] == 0  # PortSet aus stepPortSets
+    ports = PortSet(vz, PORTS)
+    assert vz.runSteps(1, ports)[1].tolist() == [[5.0, -5.0]]
+
+
+def test_failed_step_ends_with_last_sample(vz, monkeypatch):
+    vz.vi.model.step_hooks.append(ramp)
+    step = vz.vi.step
+    monkeypatch.setattr(vz.vi, "step", lambda: step() if vz.vi.step_count < 4 else vz.V_DAMGD)
+    status, samples = vz.runSteps(10, PORTS, everyK=2)
+    assert status == vz.V_DAMGD
+    np.testing.assert_array_equal(samples[:, 0], [2, 4])
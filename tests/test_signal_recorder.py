@@ -0,0 +1,56 @@
+"""
+Memory-mapped signal recording (signal_recorder.SignalRecorder / SignalRecording).
+"""
+import csv
+import time
+import numpy as np
+from lib.services.cyclic_update import CyclicUpdater
+from lib.services.signal_recorder import SignalRecorder, SignalRecording
+
+BLOCK = "[Block Diagram].[RobotController]"
+
+
+def test_recording_round_trip_over_chunks(tmp_path):
+    path = str(tmp_path / "run.vsig")
+    recorder = SignalRecorder(path, ["a", "b"], chunk_records=4)
+    for i in range(10):
+        recorder.append(100.0 + i, i, [i, -i])
+    recorder.close()
+    recording = SignalRecording(path)
+    assert len(recording) == 10 and recording.channels == ["a", "b"]
+    timestamps, set_indices, values = recording.time_slice(103.0, 105.0, ["b"])
+    assert list(set_indices) == [3, 4, 5]
+    assert values[:, 0].tolist() == [-3, -4, -5]
+
+    csv_path = recording.to_csv(str(tmp_path / "run.csv"), channels=["a"], chunk=3)
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["t", "set", "a"] and len(rows) == 11
+
+
+def test_interrupted_recording_stays_readable(tmp_path):
+    path = str(tmp_path / "crash.vsig")
+    recorder = SignalRecorder(path, ["a"], chunk_records=4)
+    for i in range(6):
+        recorder.append(float(i), i, [i])
+    recorder._release_mapping()  # kein close(): Datei nicht gekuerzt
+    recorder._file.close()
+    _, set_indices, _ = SignalRecording(path).time_slice()
+    assert list(set_indices) == list(range(6))
+
+
+def test_recorder_as_updater_sink(vz, tmp_path):
+    updater = CyclicUpdater(vz, update_rate_ms=1)
+    updater.register([f"{BLOCK}.[Axis_1_Pos]", f"{BLOCK}.[Axis_2_Pos]"])
+    recorder = SignalRecorder.for_updater(updater, str(tmp_path / "sink.vsig"))
+    updater.start()
+    end = time.time() + 2
+    while recorder.count < 5 and time.time() < end:
+        time.sleep(0.005)
+    updater.stop()
+    recorder.close()
+    assert updater.sinks == []
+    recording = SignalRecording(str(tmp_path / "sink.vsig"))
+    assert len(recording) >= 5
+    assert recording.header["types"] == ["V_IO_TYPE_REAL64"] * 2
+    assert np.all(np.diff(recording.time_slice()[1]) > 0)
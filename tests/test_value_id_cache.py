@@ -0,0 +1,31 @@
+"""
+ValueID cache of VirtuosZugriff.resolveValueIDs.
+"""
+BLOCK = "[Block Diagram].[RobotController]"
+PORTS = [f"{BLOCK}.[Axis_1_Pos]", f"{BLOCK}.[Axis_2_Pos]"]
+
+
+def test_each_port_resolved_once(vz):
+    status, _, _ = vz.resolveValueIDs(PORTS)
+    assert status == vz.V_SUCCD
+    status, _, _ = vz.resolveValueIDs(PORTS)
+    assert status == vz.V_SUCCD
+    assert vz.vi.calls["getValueID"] == len(PORTS)
+
+
+def test_unknown_port_is_reported_and_not_cached(vz):
+    status, _, port_status = vz.resolveValueIDs([PORTS[0], f"{BLOCK}.[NoSuchPort]"])
+    assert status == vz.V_DAMGD
+    assert port_status == [vz.V_SUCCD, vz.V_DAMGD]
+    assert len(vz.valueIDCache) == 1
+
+
+def test_interface_change_drops_cached_ids(vz):
+    _, value_ids = vz.readValueID(PORTS)
+    assert vz.rampUpSim() == vz.V_SUCCD
+    status, values = vz.readValue(value_ids)
+    assert status == vz.V_DAMGD and values == [None, None]
+    assert vz.valueIDCache == {}
+    _, value_ids = vz.readValueID(PORTS)
+    status, values = vz.readValue(value_ids)
+    assert status == vz.V_SUCCD and None not in values
@@ -0,0 +1,55 @@
+"""
+VirtuosFarm on the fake backend: parallel reads and cleanup of a worker that cannot connect.
+"""
+import json
+import queue
+from lib.services import remote, Virtuos_tool, virtuos_farm
+from lib.services.fake_virtuos import FakeBlockModel
+from lib.services.param_schema_cache import ParamSchemaCache
+from lib.services.virtuos_farm import VirtuosFarm, read_block_job
+
+
+def _read_block_with_cache(vz, cache_path, block_path):
+    # Farm-Job: alle Worker teilen sich eine Cache-Datei wie Temp_Datei im Betrieb
+    if Virtuos_tool.schema_cache.filepath != cache_path:
+        Virtuos_tool.schema_cache = ParamSchemaCache(cache_path)
+    return read_block_job(vz, block_path)
+
+
+def test_farm_reads_blocks_in_parallel(fake_env, monkeypatch):
+    parameters = {}
+    blocks = [f"[Block Diagram].[RC{i}]" for i in range(24)]
+    for block in blocks:
+        parameters.update(FakeBlockModel.robot_controller(block, axes=2, trafo_params=4).parameters)
+    model_path = fake_env / "model.json"
+    model_path.write_text(json.dumps({"parameters": parameters}), encoding="utf-8")
+    monkeypatch.setenv("envFakeModel", str(model_path))
+    cache_path = str(fake_env / "shared_schema.json")
+
+    with VirtuosFarm(instances=4, start_virtuos=False) as farm:
+        assert farm.start() == 4
+        job_ids = [farm.submit(_read_block_with_cache, cache_path, block) for block in blocks]
+        finished = list(farm.results(job_ids))
+    failed = [result for _, ok, result in finished if not ok]
+    assert failed == []
+    assert len(finished) == len(blocks)
+    for _, _, (trafo, axis) in finished:
+        assert trafo["trafo[0].id"] == "21" and "Axis_2.v_max" in axis
+
+
+def test_worker_stops_its_virtuos_when_connect_fails(fake_env, monkeypatch):
+    stopped = []
+    monkeypatch.setattr(remote.VirtuosZugriff, "corbaInfo", lambda self, *args: self.V_DAMGD)
+    monkeypatch.setattr(remote.VirtuosZugriff, "stopProcess",
+                        lambda self, pid: stopped.append(pid) or self.V_SUCCD)
+    results = queue.Queue()
+    virtuos_farm._worker_main(0, 54322, "Visualization", True, ["-startcorbaserver"], None,
+                              queue.Queue(), results)
+
+    failed = results.get_nowait()
+    exit_msg = results.get_nowait()
+    assert failed[0] == virtuos_farm.MSG_FAILED and "setCorbaInfo" in failed[3]
+    assert exit_msg[0] == virtuos_farm.MSG_EXIT
+    # die echte PID wird gemeldet und der gestartete Prozess beendet
+    assert exit_msg[3] != 0
+    assert stopped == [exit_msg[3]]
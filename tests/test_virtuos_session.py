@@ -0,0 +1,59 @@
+"""
+The shared Virtuos session of the NiceGUI pages (lib/services/virtuos_session.py).
+"""
+import asyncio
+from lib.services.virtuos_session import VirtuosSession
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_pages_share_one_connection(fake_env):
+    async def scenario():
+        session = VirtuosSession(health_interval=0.01)
+        assert await session.acquire() == "open"
+        fake = session.vz.vi
+        assert await session.acquire() == "shared"
+        assert session.refs == 2
+        assert fake.calls["startConnection"] == 1
+        session.release()
+        assert session._watchdog is not None
+        session.release()
+        assert session.refs == 0 and session._watchdog is None
+        await session.shutdown()
+    run(scenario())
+
+
+def test_shutdown_leaves_attached_virtuos_running(fake_env):
+    async def scenario():
+        session = VirtuosSession()
+        assert await session.acquire(start_virtuos=False) == "open"
+        fake = session.vz.vi
+        await session.shutdown()
+        assert fake.calls["stopVirtuos"] == 0
+        assert fake.calls["stopConnection"] == 1 and fake.calls["detachDLL"] == 1
+        assert session.vz is None and not session.connected
+    run(scenario())
+
+
+def test_shutdown_stops_virtuos_the_session_started(fake_env):
+    async def scenario():
+        session = VirtuosSession()
+        assert await session.acquire(start_virtuos=True) == "started"
+        fake = session.vz.vi
+        await session.shutdown()
+        assert fake.calls["stopVirtuos"] == 1
+    run(scenario())
+
+
+def test_reconnect_does_not_load_a_project(fake_env):
+    async def scenario():
+        session = VirtuosSession()
+        await session.acquire()
+        fake = session.vz.vi
+        fake.connected_ = False  # Verbindung verloren
+        assert await session.ensure_connected()
+        assert fake.calls["loadProject"] == 0
+        await session.shutdown()
+    run(scenario())